@@ -9,6 +9,7 @@ from multiprocessing.pool import ThreadPool
 from functools import partial
 
 from aim.sdk.run import Run
+from aim.storage import runpacks
 from aim.storage.rockscontainer import RocksContainer
 
 if TYPE_CHECKING:
@@ -46,17 +47,21 @@ def run_flushes_and_compactions(repo: 'Repo', runs_to_skip: set):
 
     meta_containers = [os.path.join(meta_dbs_path, db) for db in meta_dbs_names]
     for _ in tqdm.tqdm(
-        pool.imap_unordered(partial(optimize_container, extra_options={'compaction': True}), meta_containers),
+        pool.imap_unordered(partial(optimize_container, extra_options={'compaction': True, 'profile': 'meta'}),
+                            meta_containers),
         desc='Optimizing metadata',
         total=len(meta_containers)
     ):
         pass
 
-    optimize_container(meta_index_container_path, extra_options={'compaction': True})
+    optimize_container(meta_index_container_path, extra_options={'compaction': True, 'profile': 'index'})
 
     seq_containers = [os.path.join(seq_dbs_path, db) for db in seq_dbs_names]
+    seq_packs_path = os.path.join(repo.path, 'seqs', runpacks.PACKS_DIR, 'chunks')
+    if os.path.exists(seq_packs_path):
+        seq_containers.extend(os.path.join(seq_packs_path, db) for db in os.listdir(seq_packs_path))
     for _ in tqdm.tqdm(
-        pool.imap_unordered(partial(optimize_container, extra_options={}), seq_containers),
+        pool.imap_unordered(partial(optimize_container, extra_options={'profile': 'seqs'}), seq_containers),
         desc='Optimizing sequence data',
         total=len(seq_containers)
     ):
@@ -2,6 +2,7 @@ import click
 import os
 
 from aim.sdk.repo import Repo
+from aim.storage import runpacks
 
 
 @click.group()
@@ -53,3 +54,21 @@ def remove_runs(ctx, hashes):
     else:
         click.echo('Something went wrong while deleting runs. Remaining runs are:', err=True)
         click.secho('\t'.join(remaining_runs), fg='yellow')
+
+
+@runs.command(name='consolidate')
+@click.argument('hashes', nargs=-1, type=str)
+@click.option('--skip-compaction', required=False, is_flag=True, default=False)
+@click.pass_context
+def consolidate_runs(ctx, hashes, skip_compaction):
+    """Move the sequences of finalized runs into a few shared containers."""
+    repo_path = ctx.obj['repo']
+    if not Repo.exists(repo_path):
+        click.echo(f'\'{repo_path}\' is not a valid aim repo.')
+        exit(1)
+    repo = Repo.from_path(repo_path)
+    result = runpacks.consolidate_runs(repo.path, hashes or None, compaction=not skip_compaction)
+    click.echo(f'Consolidated {len(result["consolidated"])} runs.')
+    if result['skipped'] and hashes:
+        click.echo('Skipped the following runs in progress:')
+        click.secho('\t'.join(result['skipped']), fg='yellow')
@@ -12,11 +12,11 @@ Message = Union[rpc_messages.ResourceRequest, rpc_messages.ResourceResponse]
 
 def pack_stream(tree: Iterator[Tuple[bytes, bytes]]) -> bytes:
     for key, val in tree:
-        if not isinstance(val, BLOB):
-            yield struct.pack('I', len(key)) + key + struct.pack('?', False) + struct.pack('I', len(val)) + val
-        else:
+        is_blob = isinstance(val, BLOB)
+        if is_blob:
             val = val.load()
-            yield struct.pack('I', len(key)) + key + struct.pack('?', True) + struct.pack('I', len(val)) + val
+        # join the parts in a single copy, BLOB values might be large
+        yield b''.join((struct.pack('I', len(key)), key, struct.pack('?', is_blob), struct.pack('I', len(val)), val))
 
 
 def unpack_stream(stream: Iterator[Message]) -> Tuple[bytes, bytes]:
@@ -3,6 +3,8 @@ import os
 AIM_ENABLE_TRACKING_THREAD = '__AIM_ENABLE_TRACKING_THREAD__'
 AIM_REPO_NAME = '__AIM_REPO_NAME__'
 AIM_RUN_INDEXING_TIMEOUT = '__AIM_RUN_INDEXING_TIMEOUT_SECONDS__'
+AIM_RUN_WRITE_BATCH_INTERVAL = '__AIM_RUN_WRITE_BATCH_INTERVAL_SECONDS__'
+AIM_RUN_SUMMARY_FLUSH_INTERVAL = '__AIM_RUN_SUMMARY_FLUSH_INTERVAL_SECONDS__'
 
 
 def get_aim_repo_name():
@@ -0,0 +1,214 @@
+"""Narrowing down the runs to evaluate the query on.
+
+The query is evaluated on every run of the repo, which requires opening the
+meta tree of each of them. The planner extracts the conditions on the run
+from the top-level conjuncts of the query, and finds the runs which may
+satisfy all of them:
+ - the conditions on the structured fields, e.g. `run.archived == False` or
+   `'baseline' in run.tags`, are queried from the structured DB;
+ - the conditions on the run params, e.g. `run.hparams.lr == 0.001` or
+   `run['hparams']['batch_size'] in [32, 64]`, are looked up in the params index.
+The query is then evaluated only on these runs, as well as on the runs not
+covered by the structured DB or the params index (e.g. the runs in progress
+and the ones tracked with older versions).
+"""
+import ast
+
+from functools import lru_cache
+from typing import Any, Container, List, NamedTuple, Optional, Set, Tuple, TYPE_CHECKING
+
+from aim.storage.params_index import ParamsIndex
+from aim.storage.types import AimObjectPath
+
+if TYPE_CHECKING:
+    from aim.sdk.repo import Repo
+
+
+# The attributes of `RunView` resolved before the run params.
+# `metrics` resolves to the param of that name if the run has one, hence its
+# conditions are not looked up in the params index either.
+_RUN_VIEW_ATTRIBUTES = frozenset((
+    'db', 'hash', 'structured_run_cls', 'meta_run_tree', 'meta_run_attrs_tree', 'metrics', 'get',
+    'finalized_at', 'end_time'
+))
+
+_OPERATORS = {
+    ast.Eq: '==',
+    ast.NotEq: '!=',
+    ast.Lt: '<',
+    ast.LtE: '<=',
+    ast.Gt: '>',
+    ast.GtE: '>=',
+    ast.In: 'in',
+    ast.NotIn: 'not in',
+}
+# `value <op> param` is the same as `param <reversed op> value`
+_REVERSED_OPERATORS = {
+    '==': '==',
+    '!=': '!=',
+    '<': '>',
+    '<=': '>=',
+    '>': '<',
+    '>=': '<=',
+    'in': 'contains',
+    'not in': 'not contains',
+}
+
+
+class RunCondition(NamedTuple):
+    path: AimObjectPath
+    op: str
+    value: Any
+    # whether the first key of the path is accessed as an attribute, e.g. `run.hparams`
+    attribute: bool
+
+
+class RunCandidates:
+    """The runs the query has to be evaluated on.
+
+    Args:
+        matching (:obj:`set`): The indexed runs which may satisfy the query conditions.
+        indexed (:obj:`set`): All the runs covered by the index (the structured DB or the params index).
+    """
+    def __init__(self, matching: Set[str], indexed: Set[str]):
+        self.matching = matching
+        self.indexed = indexed
+
+    def __contains__(self, run_hash: str) -> bool:
+        return run_hash in self.matching or run_hash not in self.indexed
+
+    def __and__(self, other: 'RunCandidates') -> 'RunCandidates':
+        indexed = self.indexed | other.indexed
+        matching = {run_hash for run_hash in indexed if run_hash in self and run_hash in other}
+        return RunCandidates(matching, indexed)
+
+
+def _iter_conjuncts(node: ast.AST):
+    if isinstance(node, ast.BoolOp) and isinstance(node.op, ast.And):
+        for value in node.values:
+            yield from _iter_conjuncts(value)
+    else:
+        yield node
+
+
+def _get_param_path(node: ast.AST) -> Optional[Tuple[AimObjectPath, bool]]:
+    # Resolves chains like `run.hparams['lr']` and `metric.run.hparams.lr`
+    path = []
+    attribute = False
+    while True:
+        if isinstance(node, ast.Attribute):
+            if node.attr == 'run' and isinstance(node.value, ast.Name) and node.value.id != 'run':
+                break
+            path.append(node.attr)
+            attribute = True
+            node = node.value
+        elif isinstance(node, ast.Subscript):
+            key_node = node.slice
+            if isinstance(key_node, getattr(ast, 'Index', ())):
+                key_node = key_node.value
+            is_literal, key = _get_literal(key_node)
+            # `run['hparams', 'lr']` is the same as `run['hparams']['lr']`
+            keys = key if isinstance(key, tuple) else (key,)
+            if not is_literal or not all(isinstance(k, (str, int)) and not isinstance(k, bool) for k in keys):
+                return None
+            path.extend(reversed(keys))
+            attribute = False
+            node = node.value
+        elif isinstance(node, ast.Name) and node.id == 'run':
+            break
+        else:
+            return None
+    if not path:
+        return None
+    return tuple(reversed(path)), attribute
+
+
+def _get_literal(node: ast.AST) -> Tuple[bool, Any]:
+    try:
+        return True, ast.literal_eval(node)
+    except (ValueError, SyntaxError, TypeError):
+        return False, None
+
+
+def _get_condition(left: ast.AST, op: ast.cmpop, right: ast.AST) -> Optional[RunCondition]:
+    op = _OPERATORS.get(type(op))
+    if op is None:
+        return None
+    param = _get_param_path(left)
+    is_literal, value = _get_literal(right)
+    if param is None or not is_literal:
+        param = _get_param_path(right)
+        is_literal, value = _get_literal(left)
+        if param is None or not is_literal:
+            return None
+        op = _REVERSED_OPERATORS[op]
+    path, attribute = param
+    return RunCondition(path, op, value, attribute)
+
+
+@lru_cache(maxsize=100)
+def extract_run_conditions(expr: str) -> Tuple[RunCondition, ...]:
+    """Extract the conditions on the run from the top-level conjuncts of the query expression."""
+    try:
+        tree = ast.parse(expr, mode='eval')
+    except SyntaxError:
+        return ()
+    conditions = []
+    for conjunct in _iter_conjuncts(tree.body):
+        if not isinstance(conjunct, ast.Compare):
+            continue
+        # chained comparisons, e.g. `0.1 < run.hparams.lr < 0.5`, are split into pairs
+        operands = [conjunct.left, *conjunct.comparators]
+        for left, op, right in zip(operands, conjunct.ops, operands[1:]):
+            condition = _get_condition(left, op, right)
+            if condition is not None:
+                conditions.append(condition)
+    return tuple(conditions)
+
+
+def _get_structured_candidates(repo: 'Repo', conditions: List[RunCondition]) -> Optional[RunCandidates]:
+    db = repo.structured_db
+    matching = db.filter_run_hashes([(condition.path[0], condition.op, condition.value) for condition in conditions])
+    if matching is None:
+        return None
+    return RunCandidates(matching, db.run_hashes())
+
+
+def _get_params_candidates(repo: 'Repo', conditions: List[RunCondition]) -> Optional[RunCandidates]:
+    index = ParamsIndex(repo.meta_tree.subtree('params_index'))
+    matching = None
+    for condition in conditions:
+        runs = index.find_runs(condition.path, condition.op, condition.value)
+        if runs is not None:
+            matching = runs if matching is None else matching & runs
+    if matching is None:
+        return None
+    # the index records of the runs in progress might be outdated
+    indexed = index.indexed_runs() - set(repo._list_runs_in_progress())
+    return RunCandidates(matching, indexed)
+
+
+def get_run_candidates(repo: 'Repo', expr: str) -> Optional[Container[str]]:
+    """Get the hashes of the runs which may satisfy the query expression, None if all of them may."""
+    if repo.is_remote_repo:
+        return None
+    structured_fields = set(repo.structured_db.run_cls().fields())
+    structured_conditions = []
+    params_conditions = []
+    for condition in extract_run_conditions(expr):
+        if not condition.attribute:
+            params_conditions.append(condition)
+        elif condition.path[0] in structured_fields or condition.path[0] == 'hash':
+            if len(condition.path) == 1:
+                structured_conditions.append(condition)
+        elif condition.path[0] not in _RUN_VIEW_ATTRIBUTES:
+            params_conditions.append(condition)
+
+    candidates = None
+    if structured_conditions:
+        candidates = _get_structured_candidates(repo, structured_conditions)
+    if params_conditions:
+        params_candidates = _get_params_candidates(repo, params_conditions)
+        if params_candidates is not None:
+            candidates = params_candidates if candidates is None else candidates & params_candidates
+    return candidates
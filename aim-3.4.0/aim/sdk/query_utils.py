@@ -3,7 +3,9 @@ import datetime
 from typing import Any, Union
 from typing import TYPE_CHECKING
 
+from aim.storage.context import Context
 from aim.storage.proxy import AimObjectProxy
+from aim.storage.sequence_summary import SequenceSummary
 from aim.storage.structured.entities import StructuredObject
 from aim.storage.treeview import TreeView
 from aim.storage.types import AimObject, AimObjectKey, AimObjectPath, SafeNone
@@ -12,6 +14,29 @@ if TYPE_CHECKING:
     from aim.sdk.run import Run
 
 
+class SequenceSummariesView:
+    """The summaries of the run sequences, accessed by sequence name and, optionally, context.
+
+    A run param named `metrics` takes precedence over the summaries, so the queries
+    written before the summaries were introduced keep resolving `run.metrics` to the param.
+
+    Examples:
+        >>> run.metrics['loss'].last < 0.1
+        >>> run.metrics['accuracy', {'subset': 'val'}].max > 0.9
+    """
+
+    def __init__(self, run: 'Run'):
+        self._run = run
+
+    def __getitem__(self, key) -> Union[SequenceSummary, SafeNone]:
+        if isinstance(key, tuple):
+            name, context = key
+        else:
+            name, context = key, {}
+        summary = self._run.get_sequence_summary(name, Context(context))
+        return summary if summary is not None else SafeNone()
+
+
 class RunView:
 
     def __init__(self, run: 'Run'):
@@ -20,6 +45,20 @@ class RunView:
         self.structured_run_cls: type(StructuredObject) = self.db.run_cls()
         self.meta_run_tree: TreeView = run.meta_run_tree
         self.meta_run_attrs_tree: TreeView = run.meta_run_attrs_tree
+        self._summaries = SequenceSummariesView(run)
+        self._has_metrics_param = None
+
+    @property
+    def metrics(self):
+        if self._has_metrics_param is None:
+            try:
+                self.meta_run_attrs_tree.collect('metrics')
+                self._has_metrics_param = True
+            except KeyError:
+                self._has_metrics_param = False
+        if self._has_metrics_param:
+            return self['metrics']
+        return self._summaries
 
     def __getattr__(self, item):
         if item in ['finalized_at', 'end_time']:
@@ -82,6 +121,19 @@ class SequenceView:
         self.name = name
         self.run = run_view
         self._context = context
+        self._summary = None
+
+    def __getattr__(self, item):
+        # the sequence summary fields, e.g. `metric.last`
+        if item in SequenceSummary._fields:
+            return getattr(self.summary, item)
+        raise AttributeError(item)
+
+    @property
+    def summary(self) -> Union[SequenceSummary, SafeNone]:
+        if self._summary is None:
+            self._summary = self.run._summaries[self.name, self._context]
+        return self._summary
 
     @property
     def context(self):
@@ -2,10 +2,11 @@ import os
 import shutil
 import logging
 from enum import Enum
+from pathlib import Path
 
 from packaging import version
 from collections import defaultdict
-from typing import Dict, Tuple, Iterator, NamedTuple, Optional, List
+from typing import Container as CollectionContainer, Dict, Tuple, Iterator, NamedTuple, Optional, List
 from weakref import WeakValueDictionary
 
 from aim.ext.sshfs.utils import mount_remote_repo, unmount_remote_repo
@@ -22,8 +23,11 @@ from aim.sdk.sequence import Sequence
 from aim.sdk.data_version import DATA_VERSION
 
 from aim.storage.container import Container
-from aim.storage.rockscontainer import RocksContainer
+from aim.storage.rockscontainer import RocksContainer, notify_shards_changed
 from aim.storage.union import RocksUnionContainer
+from aim.storage.runpacks import get_run_container_path, unpack_run, delete_packed_run
+from aim.storage.params_index import ParamsIndex
+from aim.storage.encoding import encode_path
 from aim.storage.treeviewproxy import ProxyTree
 
 from aim.storage.structured.db import DB
@@ -32,6 +36,28 @@ from aim.storage.structured.proxy import StructuredRunProxy
 logger = logging.getLogger(__name__)
 
 
+def _get_files_state(*paths: str) -> Tuple:
+    state = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            state.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            state.append(None)
+    return tuple(state)
+
+
+def _get_dir_state(path: str) -> Tuple:
+    # The appends to the WAL and the SST files do not change the directory
+    # modification time, so the files are checked as well
+    try:
+        with os.scandir(path) as it:
+            files = sorted(entry.path for entry in it)
+    except FileNotFoundError:
+        return ()
+    return _get_files_state(path, *files)
+
+
 class ContainerConfig(NamedTuple):
     name: str
     sub: Optional[str]
@@ -246,11 +272,12 @@ class Repo:
         container = self.container_pool.get(container_config)
         if container is None:
             path = os.path.join(self.path, name)
+            profile = Path(name).parts[0]
             if from_union:
-                container = RocksUnionContainer(path, read_only=read_only)
+                container = RocksUnionContainer(path, read_only=read_only, profile=profile)
                 self.persistent_pool[container_config] = container
             else:
-                container = RocksContainer(path, read_only=read_only)
+                container = RocksContainer(path, read_only=read_only, profile=profile)
             self.container_pool[container_config] = container
 
         return container
@@ -271,7 +298,7 @@ class Repo:
         container = self.container_pool.get(container_config)
         if container is None:
             path = os.path.join(self.path, name)
-            container = RocksContainer(path, read_only=False, timeout=timeout)
+            container = RocksContainer(path, read_only=False, profile='index', timeout=timeout)
             self.container_pool[container_config] = container
 
         return container
@@ -307,10 +334,12 @@ class Repo:
                     path = name
                 else:
                     assert sub is not None
-                    path = os.path.join(name, 'chunks', sub)
+                    # finalized runs might be consolidated into packs
+                    path = get_run_container_path(self.path, name, sub)
                 container = self._get_container(path, read_only=True, from_union=from_union)
             else:
                 assert sub is not None
+                self._restore_packed_run(name, sub)
                 path = os.path.join(name, 'chunks', sub)
                 container = self._get_container(path, read_only=False, from_union=False)
 
@@ -319,6 +348,17 @@ class Repo:
 
         return container_view
 
+    def _restore_packed_run(self, name: str, run_hash: str):
+        # The run container shadows the pack, so the records of the resumed
+        # run have to be moved back from the pack before writing.
+        path = get_run_container_path(self.path, name, run_hash)
+        if path == os.path.join(name, 'chunks', run_hash):
+            return
+        pack = self._get_container(path, read_only=True)
+        if next(pack.keys(encode_path((name, 'chunks', run_hash))), None) is None:
+            return
+        unpack_run(self.path, run_hash, name=name)
+
     def request_props(self, hash_: str, read_only: bool):
         if self.is_remote_repo:
             assert self._client is not None
@@ -340,17 +380,24 @@ class Repo:
 
         return _props
 
-    def iter_runs(self) -> Iterator['Run']:
+    def iter_runs(self, run_hashes: Optional[CollectionContainer[str]] = None) -> Iterator['Run']:
         """Iterate over Repo runs.
 
+        Args:
+            run_hashes (:obj:`Container[str]`, optional): If specified, only the runs with these hashes are iterated.
+
         Yields:
             next :obj:`Run` in readonly mode .
         """
         self.meta_tree.preload()
         for run_name in self.meta_tree.subtree('chunks').keys():
+            if run_hashes is not None and run_name not in run_hashes:
+                continue
             yield Run(run_name, repo=self, read_only=True)
 
-    def iter_runs_from_cache(self, offset: str = None) -> Iterator['Run']:
+    def iter_runs_from_cache(self,
+                             offset: str = None,
+                             run_hashes: Optional[CollectionContainer[str]] = None) -> Iterator['Run']:
         db = self.structured_db
         cache = db.caches.get('runs_cache')
         if cache:
@@ -360,6 +407,8 @@ class Repo:
             except ValueError:
                 offset_idx = 0
             for run_name in run_names[offset_idx:]:
+                if run_hashes is not None and run_name not in run_hashes:
+                    continue
                 yield Run(run_name, repo=self, read_only=True)
         else:
             raise StopIteration
@@ -605,6 +654,34 @@ class Repo:
         except KeyError:
             return {}
 
+    def get_generation(self) -> Tuple:
+        """Returns the token of the current state of the repo data.
+
+        The token changes whenever runs are created, finalized or deleted, the index
+        or the structured data is updated, or the runs in progress track new data.
+        Only the file stats are checked, so it is much cheaper than reading the data.
+        """
+        db_path = os.path.join(self.path, DB._DB_NAME)
+        state = [
+            _get_files_state(db_path, f'{db_path}-journal', f'{db_path}-wal'),
+            _get_dir_state(os.path.join(self.path, 'meta', 'index')),
+        ]
+        for name in ('meta', 'seqs'):
+            state.append(_get_files_state(os.path.join(self.path, name, 'chunks'),
+                                          os.path.join(self.path, name, 'progress')))
+            progress_dir = os.path.join(self.path, name, 'progress')
+            if not os.path.exists(progress_dir):
+                continue
+            for run_hash in sorted(os.listdir(progress_dir)):
+                state.append(_get_dir_state(os.path.join(self.path, name, 'chunks', run_hash)))
+        return tuple(state)
+
+    def _list_runs_in_progress(self) -> List[str]:
+        progress_dir = os.path.join(self.path, 'meta', 'progress')
+        if not os.path.exists(progress_dir):
+            return []
+        return os.listdir(progress_dir)
+
     def _prepare_runs_cache(self):
         db = self.structured_db
         cache_name = 'runs_cache'
@@ -619,6 +696,12 @@ class Repo:
 
             # remove data from index container
             index_tree = self._get_index_container('meta', timeout=0).tree()
+            try:
+                params = index_tree.subtree(('meta', 'chunks', run_hash, 'attrs')).collect()
+            except KeyError:
+                pass
+            else:
+                ParamsIndex(index_tree.subtree(('meta', 'params_index'))).remove_run(run_hash, params)
             del index_tree.subtree(('meta', 'chunks'))[run_hash]
 
             # delete rocksdb containers data
@@ -628,6 +711,8 @@ class Repo:
                 shutil.rmtree(meta_path, ignore_errors=True)
                 seqs_path = os.path.join(self.path, 'seqs', sub_dir, run_hash)
                 shutil.rmtree(seqs_path, ignore_errors=True)
+            delete_packed_run(self.path, run_hash)
+            notify_shards_changed()
 
     def close(self):
         if self._resources is None:
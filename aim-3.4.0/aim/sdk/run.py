@@ -3,7 +3,10 @@ import logging
 import os
 import datetime
 import json
+import threading
+import time
 import pytz
+import weakref
 
 from collections import defaultdict
 from copy import deepcopy
@@ -14,9 +17,18 @@ from aim.sdk.sequence_collection import SingleRunSequenceCollection
 from aim.sdk.utils import generate_run_hash, get_object_typename, check_types_compatibility
 from aim.sdk.num_utils import convert_to_py_number, is_number
 from aim.sdk.types import AimObject
-from aim.sdk.configs import AIM_ENABLE_TRACKING_THREAD, AIM_RUN_INDEXING_TIMEOUT
+from aim.sdk.configs import (
+    AIM_ENABLE_TRACKING_THREAD,
+    AIM_RUN_INDEXING_TIMEOUT,
+    AIM_RUN_WRITE_BATCH_INTERVAL,
+    AIM_RUN_SUMMARY_FLUSH_INTERVAL,
+)
 
 from aim.storage.hashing import hash_auto
+from aim.storage.blockarrayview import BlockArrayView, BlockArrayWriter
+from aim.storage.pyramid import PyramidView, PyramidWriter
+from aim.storage.params_index import ParamsIndex
+from aim.storage.sequence_summary import SequenceStats, SequenceSummary, summarize_sequence
 from aim.storage.context import Context, SequenceDescriptor
 from aim.storage.treeview import TreeView
 from aim.storage import treeutils
@@ -24,7 +36,7 @@ from aim.storage import treeutils
 from aim.ext.resource import ResourceTracker, DEFAULT_SYSTEM_TRACKING_INT
 from aim.ext.cleanup import AutoClean
 
-from typing import Any, Dict, Iterator, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 from typing import TYPE_CHECKING
 
 
@@ -39,6 +51,7 @@ if TYPE_CHECKING:
     from aim.sdk.sequences.text_sequence import Texts
     from aim.sdk.sequence_collection import SequenceCollection
     from aim.sdk.repo import Repo
+    from aim.storage.rockscontainer import RocksContainer
 
 
 logger = logging.getLogger(__name__)
@@ -60,21 +73,75 @@ class RunAutoClean(AutoClean['Run']):
         self.hash = instance.hash
         self.meta_run_tree = instance.meta_run_tree
         self.repo = instance.repo
+        self.sequence_info = instance.sequence_info
+        self.write_containers = instance._write_containers
         self._system_resource_tracker = instance._system_resource_tracker
+        self._summaries_flusher = instance._summaries_flusher
+
+    def flush_sequences(self):
+        """
+        Write the in-memory blocks of the sequences to the storage.
+        """
+        for seq_info in self.sequence_info.values():
+            if seq_info.block_writer is not None:
+                seq_info.block_writer.flush()
+
+    def update_sequence_pyramids(self):
+        """
+        Write the pending buckets of the sequences to their downsampling pyramids.
+        """
+        for seq_info in self.sequence_info.values():
+            if seq_info.pyramid_writer is not None:
+                seq_info.pyramid_writer.update(force=True)
+
+    def flush_sequence_summaries(self):
+        """
+        Write the pending summaries of the sequences (last value, last step, etc.) to the run meta tree.
+        """
+        # sequences can be added by the resource tracker thread meanwhile
+        for seq_info in list(self.sequence_info.values()):
+            with seq_info.summary_lock:
+                if seq_info.pending_summary is None:
+                    continue
+                for key, value in seq_info.pending_summary.items():
+                    self.meta_run_tree[seq_info.meta_path + (key,)] = value
+                self.meta_run_tree[seq_info.summary_path] = seq_info.stats.encode()
+                seq_info.pending_summary = None
 
     def finalize_run(self):
         """
         Finalize the run by indexing all the data.
         """
+        self.flush_sequences()
+        self.update_sequence_pyramids()
+        self.flush_sequence_summaries()
         self.meta_run_tree['end_time'] = datetime.datetime.now(pytz.utc).timestamp()
+        # the index is built from the committed records
+        for container in self.write_containers:
+            container.flush_writes()
+            # free the content of the BLOBs overwritten or deleted while tracking
+            if container.dedup_blobs:
+                container.collect_blob_garbage()
         try:
             timeout = os.getenv(AIM_RUN_INDEXING_TIMEOUT, 2 * 60)
             index = self.repo._get_index_tree('meta', timeout=timeout).view(b'')
             logger.debug(f'Indexing Run {self.hash}...')
+            self.remove_indexed_params(index)
             self.meta_run_tree.finalize(index=index)
         except TimeoutError:
             logger.warning(f'Cannot index Run {self.hash}. Index is locked.')
 
+    def remove_indexed_params(self, index: TreeView):
+        """
+        Remove the params index records of the previous finalization of the resumed run.
+        The params could have changed since then, so the records are written anew.
+        """
+        try:
+            params = index.subtree(('meta', 'chunks', self.hash, 'attrs')).collect()
+        except KeyError:
+            return
+        ParamsIndex(index.subtree(('meta', 'params_index'))).remove_run(self.hash, params)
+
     def finalize_system_tracker(self):
         """
         Stop the system resource tracker before closing the run.
@@ -83,6 +150,13 @@ class RunAutoClean(AutoClean['Run']):
             logger.debug('Stopping resource tracker')
             self._system_resource_tracker.stop()
 
+    def finalize_summaries_flusher(self):
+        """
+        Stop the periodic flush of the sequence summaries before closing the run.
+        """
+        if self._summaries_flusher is not None:
+            self._summaries_flusher.stop()
+
     def _close(self) -> None:
         """
         Close the `Run` instance resources and trigger indexing.
@@ -91,6 +165,7 @@ class RunAutoClean(AutoClean['Run']):
             logger.debug(f'Run {self.hash} is read-only, skipping cleanup')
             return
         self.finalize_system_tracker()
+        self.finalize_summaries_flusher()
         self.finalize_run()
 
 
@@ -205,6 +280,53 @@ class SequenceInfo:
         self.val_view = None
         self.epoch_view = None
         self.time_view = None
+        self.block_writer = None
+        self.pyramid_writer = None
+        self.record_max_length = None
+        # the path of sequence meta in the run meta tree
+        self.meta_path = None
+        # the path of sequence summary in the run meta tree, see `aim.storage.sequence_summary`
+        self.summary_path = None
+        self.stats: Optional[SequenceStats] = None
+        # summaries not written to the run meta tree yet
+        self.pending_summary: Optional[Dict[str, Any]] = None
+        self.summary_lock = threading.Lock()
+
+
+class SummariesFlusher:
+    """Periodically writes the pending sequence summaries of the run.
+
+    The summaries are written by the `track` calls as well, but would be
+    stale indefinitely once the tracking stops, e.g. while the model is
+    evaluated or the training is stuck.
+    """
+    def __init__(self, flush, interval: float):
+        self._flush_func = weakref.WeakMethod(flush)
+        self.interval = interval
+
+        self._th_flusher = threading.Thread(target=self._flusher, daemon=True)
+        self._shutdown = False
+
+    def start(self):
+        self._th_flusher.start()
+
+    def stop(self):
+        self._shutdown = True
+
+    def _flusher(self):
+        time_counter = 0
+        while not self._shutdown:
+            time.sleep(0.1)
+            time_counter += 0.1
+            if time_counter < self.interval:
+                continue
+            time_counter = 0
+            flush = self._flush_func()
+            if flush is None:
+                # the run is gone
+                break
+            flush()
+            del flush
 
 
 class Run(StructuredRunMixin):
@@ -262,13 +384,38 @@ class Run(StructuredRunMixin):
 
         self.meta_attrs_tree: TreeView = self.meta_tree.subtree('attrs')
         self.meta_run_attrs_tree: TreeView = self.meta_run_tree.subtree('attrs')
+        self._params_index = ParamsIndex(self.meta_tree.subtree('params_index'))
 
         self.series_run_tree: TreeView = self.repo.request_tree(
             'seqs', self.hash, read_only=read_only
         ).subtree('seqs').subtree('chunks').subtree(self.hash)
 
+        # The writes of a `track` call are committed in a single batch per
+        # container. The metadata writes (last values, steps) can be batched
+        # over an interval of calls as well.
+        self._write_containers: List['RocksContainer'] = []
+        self._write_batch_interval = float(os.getenv(AIM_RUN_WRITE_BATCH_INTERVAL, 0))
+        if self.track_in_thread:
+            # the pending writes are bound to the tracking thread
+            self._write_batch_interval = 0
+        self._last_writes_flush = time.time()
+        # The sequence summaries are kept in memory and written periodically,
+        # so the readers of the run in progress see them at most that stale.
+        self._summary_flush_interval = float(os.getenv(AIM_RUN_SUMMARY_FLUSH_INTERVAL, 5))
+        self._last_summaries_flush = time.time()
+        # serializes the `track` calls with the periodic flush of the summaries
+        self._track_lock = threading.Lock()
+        if not read_only and not self.repo.is_remote_repo:
+            self._write_containers = [
+                self.repo.request('seqs', self.hash, read_only=False),
+                self.repo.request('meta', self.hash, read_only=False, from_union=True),
+            ]
+
         self._system_resource_tracker: ResourceTracker = None
         self._prepare_resource_tracker(system_tracking_interval)
+        self._summaries_flusher: SummariesFlusher = None
+        if self._write_containers:
+            self._summaries_flusher = SummariesFlusher(self._flush_stale_summaries, self._summary_flush_interval)
 
         if not read_only:
             try:
@@ -276,12 +423,17 @@ class Run(StructuredRunMixin):
             except (KeyError, StopIteration):
                 # no run params are set. use empty dict
                 self[...] = {}
+            if not self._params_index.is_indexed(self.hash):
+                # the run was tracked with an older version
+                self._params_index.add_run(self.hash, self._collect(..., strict=False))
             self.meta_run_tree['end_time'] = None
             self.props
         if experiment:
             self.experiment = experiment
 
         self._resources = RunAutoClean(self)
+        if self._summaries_flusher is not None:
+            self._summaries_flusher.start()
 
     def __repr__(self) -> str:
         return f'<Run#{hash(self)} name={self.hash} repo={self.repo}>'
@@ -308,8 +460,10 @@ class Run(StructuredRunMixin):
             >>> run[...] = params
             >>> run['hparams'] = {'batch_size': 42}
         """
+        self._update_params_index(key, val)
         self.meta_run_attrs_tree[key] = val
         self.meta_attrs_tree[key] = val
+        self._flush_writes()
 
     def __getitem__(self, key):
         """Get run meta-parameter by key.
@@ -350,8 +504,20 @@ class Run(StructuredRunMixin):
         Args:
             key: meta-parameter path
         """
+        self._update_params_index(key, None)
         del self.meta_attrs_tree[key]
         del self.meta_run_attrs_tree[key]
+        self._flush_writes()
+
+    def _update_params_index(self, key, val: Any):
+        if key == Ellipsis:
+            path = ()
+        elif isinstance(key, (tuple, list)):
+            path = tuple(key)
+        else:
+            path = (key,)
+        old_val = self.get(path or ..., strict=False)
+        self._params_index.update(self.hash, path, old_val, val)
 
     def track(
         self,
@@ -396,6 +562,53 @@ class Run(StructuredRunMixin):
         epoch: int = None,
         *,
         context: AimObject = None,
+    ):
+        with self._track_lock:
+            for container in self._write_containers:
+                container.buffer_writes()
+            try:
+                self._track_record(value, track_time, name, step, epoch, context=context)
+                now = time.time()
+                if now - self._last_summaries_flush >= self._summary_flush_interval:
+                    self._resources.flush_sequence_summaries()
+                    self._last_summaries_flush = now
+            finally:
+                self._flush_writes(force=False)
+
+    def _flush_stale_summaries(self):
+        # Called by the summaries flusher thread. The summaries are skipped while
+        # the metadata writes of the last `track` calls are batched (see
+        # `AIM_RUN_WRITE_BATCH_INTERVAL`), as the batch would overwrite them
+        # with the older values once written.
+        with self._track_lock:
+            if time.time() - self._last_summaries_flush < self._summary_flush_interval:
+                return
+            if any(container.writes_buffered for container in self._write_containers):
+                return
+            self._resources.flush_sequence_summaries()
+            self._last_summaries_flush = time.time()
+
+    def _flush_writes(self, force: bool = True):
+        if not self._write_containers:
+            return
+        seqs_container, meta_container = self._write_containers
+        # sequence blocks are read back by the block writers, so their
+        # writes are never deferred past the `track` call
+        seqs_container.flush_writes()
+        now = time.time()
+        if force or now - self._last_writes_flush >= self._write_batch_interval:
+            meta_container.flush_writes()
+            self._last_writes_flush = now
+
+    def _track_record(
+        self,
+        value,
+        track_time: float,
+        name: str,
+        step: int = None,
+        epoch: int = None,
+        *,
+        context: AimObject = None,
     ):
         if context is None:
             context = {}
@@ -420,20 +633,47 @@ class Run(StructuredRunMixin):
 
         seq_info = self.sequence_info[sequence.selector]
         if not seq_info.initialized:
-            seq_info.val_view = self.series_run_tree.subtree(sequence.selector).array('val').allocate()
-            seq_info.epoch_view = self.series_run_tree.subtree(sequence.selector).array('epoch').allocate()
-            seq_info.time_view = self.series_run_tree.subtree(sequence.selector).array('time').allocate()
+            seq_tree = self.series_run_tree.subtree(sequence.selector)
+            blocks_tree = seq_tree.subtree('blocks')
+            if BlockArrayView.exists(blocks_tree):
+                blocks_view = BlockArrayView(blocks_tree, 'val')
+                seq_info.count = len(blocks_view)
+                seq_info.pyramid_writer = PyramidWriter(seq_tree.subtree('pyramid'))
+                seq_info.block_writer = BlockArrayWriter(blocks_tree, pyramid_writer=seq_info.pyramid_writer)
+                last_summarized_step = PyramidView(seq_tree.subtree('pyramid')).last_step()
+                if last_summarized_step is None or last_summarized_step < blocks_view.last_idx():
+                    # the sequence was tracked before the pyramids were introduced,
+                    # or the run was interrupted before its pyramid was updated
+                    seq_info.pyramid_writer.rebuild(BlockArrayView.iter_raw_blocks(blocks_tree))
+            else:
+                val_view = seq_tree.array('val')
+                seq_info.count = len(val_view)
+                if seq_info.count == 0 and dtype in ('float', 'int'):
+                    # new numeric sequences are stored in packed blocks
+                    seq_info.pyramid_writer = PyramidWriter(seq_tree.subtree('pyramid'))
+                    seq_info.block_writer = BlockArrayWriter(blocks_tree, pyramid_writer=seq_info.pyramid_writer)
+                else:
+                    # the rest are stored one key per step
+                    seq_info.val_view = val_view.allocate()
+                    seq_info.epoch_view = seq_tree.array('epoch').allocate()
+                    seq_info.time_view = seq_tree.array('time').allocate()
 
-            seq_info.count = len(seq_info.val_view)
             seq_info.sequence_dtype = self.meta_run_tree.get(('traces', ctx.idx, name, 'dtype'), None)
             if seq_info.count != 0 and seq_info.sequence_dtype is None:  # continue tracking on old sequence
                 seq_info.sequence_dtype = 'float'
+            seq_info.meta_path = ('traces', ctx.idx, name)
+            seq_info.summary_path = ('sequence_summaries', ctx.idx, name)
+            if seq_info.count == 0:
+                seq_info.stats = SequenceStats(dtype)
+            else:
+                seq_info.stats = self._load_sequence_stats(seq_tree, seq_info)
             seq_info.initialized = True
 
         if seq_info.sequence_dtype is not None:
             def update_trace_dtype(new_dtype):
                 self.meta_tree['traces_types', new_dtype, ctx.idx, name] = 1
                 seq_info.sequence_dtype = self.meta_run_tree['traces', ctx.idx, name, 'dtype'] = new_dtype
+                seq_info.stats.dtype = new_dtype
 
             compatible = check_types_compatibility(dtype, seq_info.sequence_dtype, update_trace_dtype)
             if not compatible:
@@ -441,23 +681,47 @@ class Run(StructuredRunMixin):
 
         step = step or seq_info.count
 
-        if seq_info.count == 0:
-            self.meta_tree['traces_types', dtype, ctx.idx, name] = 1
-            seq_info.sequence_dtype = self.meta_run_tree['traces', ctx.idx, name, 'dtype'] = dtype
-            self.meta_run_tree['traces', ctx.idx, name, 'first_step'] = step
-
-        self.meta_run_tree['traces', ctx.idx, name, 'last'] = val
-        self.meta_run_tree['traces', ctx.idx, name, 'last_step'] = step
+        summary = {'last': val, 'last_step': step}
         if isinstance(val, (tuple, list)):
-            record_max_length = self.meta_run_tree.get(('traces', ctx.idx, name, 'record_max_length'), 0)
-            self.meta_run_tree['traces', ctx.idx, name, 'record_max_length'] = max(record_max_length, len(val))
+            if seq_info.record_max_length is None:
+                seq_info.record_max_length = self.meta_run_tree.get(seq_info.meta_path + ('record_max_length',), 0)
+            seq_info.record_max_length = max(seq_info.record_max_length, len(val))
+            summary['record_max_length'] = seq_info.record_max_length
+
+        with seq_info.summary_lock:
+            seq_info.stats.add(step, val)
+            if seq_info.count == 0:
+                self.meta_tree['traces_types', dtype, ctx.idx, name] = 1
+                seq_info.sequence_dtype = self.meta_run_tree['traces', ctx.idx, name, 'dtype'] = dtype
+                self.meta_run_tree['traces', ctx.idx, name, 'first_step'] = step
+                # the summary of a new sequence is written right away
+                for key, summary_val in summary.items():
+                    self.meta_run_tree[seq_info.meta_path + (key,)] = summary_val
+                self.meta_run_tree[seq_info.summary_path] = seq_info.stats.encode()
+                seq_info.pending_summary = None
+            else:
+                seq_info.pending_summary = summary
 
-        # TODO perform assignments in an atomic way
-        seq_info.val_view[step] = val
-        seq_info.epoch_view[step] = epoch
-        seq_info.time_view[step] = track_time
+        if seq_info.block_writer is not None:
+            seq_info.block_writer.track(step, val, epoch, track_time)
+            seq_info.pyramid_writer.update()
+        else:
+            seq_info.val_view[step] = val
+            seq_info.epoch_view[step] = epoch
+            seq_info.time_view[step] = track_time
         seq_info.count = seq_info.count + 1
 
+    def _load_sequence_stats(self, seq_tree: TreeView, seq_info: SequenceInfo) -> SequenceStats:
+        try:
+            stats = SequenceStats.decode(self.meta_run_tree[seq_info.summary_path])
+        except KeyError:
+            stats = None
+        if stats is None or stats.count < seq_info.count:
+            # the sequence was tracked before the summaries were introduced,
+            # or the run was interrupted before its summaries were written
+            stats = summarize_sequence(seq_tree, seq_info.sequence_dtype)
+        return stats
+
     @property
     def props(self):
         if self._props is None:
@@ -609,6 +873,39 @@ class Run(StructuredRunMixin):
         """
         return self._get_sequence('texts', name, context)
 
+    def get_sequence_summary(
+            self,
+            name: str,
+            context: Context
+    ) -> Optional[SequenceSummary]:
+        """Retrieve the summary of the sequence by it's name and context.
+
+        The summary is read from the run metadata, without loading the sequence records.
+
+        Args:
+             name (str): Tracked sequence name.
+             context (:obj:`Context`): Tracking context.
+
+        Returns:
+            :obj:`SequenceSummary` with the sequence dtype, number of records, first and last steps,
+            and the last, min, max and mean values of the numeric sequences. `None` if the sequence does not exist.
+        """
+        seq_info = self.sequence_info.get((context.idx, name))
+        if seq_info is not None and seq_info.stats is not None:
+            with seq_info.summary_lock:
+                return seq_info.stats.summary()
+        try:
+            return SequenceStats.decode(self.meta_run_tree['sequence_summaries', context.idx, name]).summary()
+        except KeyError:
+            pass
+        try:
+            trace_meta = self.meta_run_tree['traces', context.idx, name]
+        except KeyError:
+            return None
+        # the sequence was tracked with an older version
+        dtype = trace_meta.get('dtype', 'float')
+        return summarize_sequence(self.series_run_tree.subtree((context.idx, name)), dtype).summary()
+
     def _get_sequence_dtype(
             self,
             sequence_name: str,
@@ -723,6 +1020,7 @@ class Run(StructuredRunMixin):
         if self._resources is None:
             return
 
+        self._resources.finalize_summaries_flusher()
         self._resources.finalize_run()
 
     def dataframe(
@@ -1,6 +1,7 @@
 from typing import Generic, Union, Tuple, List, TypeVar, Dict
 
 from aim.storage.arrayview import ArrayView
+from aim.storage.blockarrayview import BlockArrayView
 from aim.storage.context import Context
 from aim.storage.hashing import hash_auto
 
@@ -42,6 +43,8 @@ class Sequence(Generic[T]):
 
         self._sequence_meta_tree = None
         self._series_tree = run.series_run_tree.subtree((context.idx, name))
+        self._blocks_tree = self._series_tree.subtree('blocks')
+        self._is_block_layout: bool = None
 
         self._hash: int = None
 
@@ -74,13 +77,22 @@ class Sequence(Generic[T]):
             self._hash = self._calc_hash()
         return self._hash
 
+    def _array_view(self, column: str) -> ArrayView:
+        # Numeric sequences are stored in packed blocks; the rest of the sequences
+        # (and the ones tracked with older versions) are stored one key per step.
+        if self._is_block_layout is None:
+            self._is_block_layout = BlockArrayView.exists(self._blocks_tree)
+        if self._is_block_layout:
+            return BlockArrayView(self._blocks_tree, column)
+        return self._series_tree.array(column)
+
     @property
     def values(self) -> ArrayView[T]:
         """Tracked values array as :obj:`ArrayView`.
 
             :getter: Returns values ArrayView.
         """
-        return self._series_tree.array('val')
+        return self._array_view('val')
 
     @property
     def indices(self) -> List[int]:
@@ -97,7 +109,7 @@ class Sequence(Generic[T]):
 
             :getter: Returns epochs ArrayView.
         """
-        return self._series_tree.array('epoch')
+        return self._array_view('epoch')
 
     @property
     def timestamps(self) -> ArrayView[float]:
@@ -105,7 +117,7 @@ class Sequence(Generic[T]):
 
             :getter: Returns timestamps ArrayView.
         """
-        return self._series_tree.array('time')
+        return self._array_view('time')
 
     @property
     def _meta_tree(self):
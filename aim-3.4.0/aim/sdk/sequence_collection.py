@@ -5,6 +5,7 @@ import logging
 
 from aim.sdk.sequence import Sequence
 from aim.sdk.query_utils import RunView, SequenceView
+from aim.sdk.query_planner import get_run_candidates
 from aim.storage.query import RestrictedPythonQuery
 
 
@@ -148,7 +149,9 @@ class QuerySequenceCollection(SequenceCollection):
 
     def iter_runs(self) -> Iterator['SequenceCollection']:
         """"""
-        for run in self.repo.iter_runs():
+        # the sequences are checked only for the runs which may satisfy the query
+        candidates = get_run_candidates(self.repo, RestrictedPythonQuery(self.query).expr)
+        for run in self.repo.iter_runs(run_hashes=candidates):
             yield SingleRunSequenceCollection(run, self.seq_cls, self.query)
 
     def iter(self) -> Iterator[Sequence]:
@@ -194,10 +197,11 @@ class QueryRunSequenceCollection(SequenceCollection):
 
     def iter_runs(self) -> Iterator['SequenceCollection']:
         """"""
+        candidates = get_run_candidates(self.repo, self.query.expr)
         if self.paginated:
-            runs_iterator = self.repo.iter_runs_from_cache(offset=self.offset)
+            runs_iterator = self.repo.iter_runs_from_cache(offset=self.offset, run_hashes=candidates)
         else:
-            runs_iterator = self.repo.iter_runs()
+            runs_iterator = self.repo.iter_runs(run_hashes=candidates)
         for run in runs_iterator:
             run_view = RunView(run)
             match = self.query.check(run=run_view)
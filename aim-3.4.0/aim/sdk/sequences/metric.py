@@ -3,12 +3,15 @@ import json
 
 from aim.sdk.sequence import Sequence
 from aim.storage import treeutils
+from aim.storage.blockarrayview import BlockArrayView
+from aim.storage.pyramid import PyramidView
 
-from typing import Union, Tuple
+from typing import Optional, Union, Tuple
 from typing import TYPE_CHECKING
 
 
 if TYPE_CHECKING:
+    import numpy as np
     from pandas import DataFrame
 
 
@@ -24,6 +27,26 @@ class Metric(Sequence):
     def sequence_name(cls) -> str:
         return 'metric'
 
+    def pyramid_level(self, num_buckets: int) -> Optional['np.ndarray']:
+        """Get the coarsest level of the metric downsampling pyramid with at least `num_buckets` buckets.
+
+        Each bucket summarizes the records of a range of steps with their count, sum,
+        and the records holding the min and the max value; see :obj:`aim.storage.pyramid`.
+
+        Returns None if there is no such level, or if the pyramid does not summarize
+        all the tracked records yet (e.g. the metric was tracked with older versions,
+        or the run is in progress), so the raw data has to be used instead.
+        """
+        if not BlockArrayView.exists(self._blocks_tree):
+            return None
+        pyramid = PyramidView(self._series_tree.subtree('pyramid'))
+        buckets = pyramid.select_level(num_buckets)
+        if buckets is None:
+            return None
+        if buckets['last_step'].max() < BlockArrayView(self._blocks_tree, 'val').last_idx():
+            return None
+        return buckets
+
     def dataframe(
         self,
         include_name: bool = False,
@@ -1,9 +1,11 @@
+from collections import Counter, defaultdict
 from cryptography.fernet import Fernet
-from typing import Iterator, List, Optional, Dict
+from typing import Iterator, List, Optional, Dict, Tuple, Union
 from typing import TYPE_CHECKING
 
 from aim.storage.encoding import encode_path, decode_path
 from aim.storage.types import BLOB
+from aim.storage.treeutils import encode_tree
 from aim.sdk.repo import ContainerConfig
 
 if TYPE_CHECKING:
@@ -46,14 +48,18 @@ class URIService:
         return result
 
     def request_batch(self, uri_batch: List[str]) -> Iterator[Dict[str, bytes]]:
-        for uri in uri_batch:
-            run_name, sub_name, resource_path = self.decode_uri(self.repo, uri)
-            container = self._get_container(run_name, sub_name)
-            resource_path = decode_path(bytes.fromhex(resource_path))
-
-            # TODO: [MV] change to some other implementation of view when available
-            #  which won't collect in case of custom objects
-            data = container.tree().subtree(resource_path).collect()
+        data_by_uri = {}
+        for (run_name, sub_name), resources in self._group_by_container(uri_batch).items():
+            tree = self._get_container(run_name, sub_name).tree()
+            values = tree.multi_get([resource_path for _, resource_path in resources])
+            for (uri, resource_path), data in zip(resources, values):
+                if data is None:
+                    # TODO: [MV] change to some other implementation of view when available
+                    #  which won't collect in case of custom objects
+                    data = tree.subtree(resource_path).collect()
+                data_by_uri[uri] = data
+
+        for uri, data in self._pop_in_order(uri_batch, data_by_uri):
             if isinstance(data, BLOB):
                 data = data.load()
             yield {uri: data}
@@ -61,6 +67,49 @@ class URIService:
         # clear container pool
         self.container_persistent_pool.clear()
 
+    def request_batch_encoded(self, uri_batch: List[str]) -> Iterator[Tuple[bytes, Union[bytes, BLOB]]]:
+        """Yields the encoded `{uri: data}` trees for the URIs of the batch.
+
+        Unlike :obj:`request_batch`, BLOB resources are not decoded: they are
+        yielded as lazy BLOBs holding the stored encoding, so that the stored
+        buffer can be streamed as is, without copies.
+        """
+        data_by_uri = {}
+        for (run_name, sub_name), resources in self._group_by_container(uri_batch).items():
+            container = self._get_container(run_name, sub_name)
+            values = container.multi_get([encode_path(resource_path) for _, resource_path in resources])
+            for (uri, resource_path), data in zip(resources, values):
+                if not isinstance(data, BLOB):
+                    data = container.tree().subtree(resource_path).collect()
+                data_by_uri[uri] = data
+
+        for uri, data in self._pop_in_order(uri_batch, data_by_uri):
+            if isinstance(data, BLOB):
+                yield encode_path((uri,)), data
+            else:
+                yield from encode_tree({uri: data})
+
+        # clear container pool
+        self.container_persistent_pool.clear()
+
+    def _group_by_container(self, uri_batch: List[str]) -> Dict[Tuple[str, str], list]:
+        # group the resources by container, so that they are read in a single batch per container
+        resources_by_container = defaultdict(list)
+        for uri in uri_batch:
+            run_name, sub_name, resource_path = self.decode_uri(self.repo, uri)
+            resource_path = decode_path(bytes.fromhex(resource_path))
+            resources_by_container[run_name, sub_name].append((uri, tuple(resource_path)))
+        return resources_by_container
+
+    @staticmethod
+    def _pop_in_order(uri_batch: List[str], data_by_uri: dict):
+        # BLOBs keep the loaded data, so the references are dropped once the
+        # resource is yielded for the last time
+        refs = Counter(uri_batch)
+        for uri in uri_batch:
+            refs[uri] -= 1
+            yield uri, data_by_uri[uri] if refs[uri] else data_by_uri.pop(uri)
+
     def _get_container(self, run_name: str, sub_name: str):
         config = ContainerConfig(run_name, sub_name, read_only=True)
         container = self.container_persistent_pool.get(config)
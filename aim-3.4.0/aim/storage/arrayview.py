@@ -1,7 +1,10 @@
 import numpy as np
 from itertools import islice
 
-from typing import Any, Generic, Iterator, List, TYPE_CHECKING, Tuple, TypeVar, Union
+from typing import Any, Generic, Iterator, List, Optional, TYPE_CHECKING, Tuple, TypeVar, Union
+
+from aim.storage.container import Container
+
 if TYPE_CHECKING:
     from .treeview import TreeView
 
@@ -73,6 +76,13 @@ class ArrayView(Generic[T]):
     ) -> T:
         ...
 
+    def take(self, indices: Union[List[int], np.ndarray]) -> np.ndarray:
+        """Get values for the given sparse indices at once.
+
+        Missing values are returned as :obj:`None`.
+        """
+        ...
+
     # TODO implement append
 
     def __setitem__(
@@ -186,7 +196,6 @@ class TreeArrayView(ArrayView[T]):
         for k, v in self.items_slice(_slice, slice_by):
             yield v
 
-    # TODO [AT]: improve performance (move to cython?)
     def items_slice(self, _slice: slice, slice_by: str = 'step') -> Iterator[Tuple[int, T]]:
         start, stop, step = _slice.start, _slice.stop, _slice.step
         if start < 0 or stop < 0 or step < 0:
@@ -199,27 +208,10 @@ class TreeArrayView(ArrayView[T]):
         if slice_by == 'index':
             yield from islice(self.items(), start, stop, step)
         elif slice_by == 'step':
-            items_ = self.items()
-
-            # TODO [AT]: tidy-up the rest of the method
-            # find fist item which has index matching the slice
-            for idx, val in items_:
-                if idx >= start:
-                    if idx == start:
-                        yield idx, val
-                    break
-
-            if step == 1:
-                for idx, val in items_:
-                    if stop is not None and idx >= stop:
-                        break
-                    yield idx, val
-            else:
-                for idx, val in items_:
-                    if stop is not None and idx >= stop:
-                        break
-                    if (idx - start) % step == 0:
-                        yield idx, val
+            for idx in self.tree.keys_in_range(start, stop, step):
+                # sparse arrays may have no item for some of the steps
+                if (idx - start) % step == 0:
+                    yield idx, self.tree[idx]
 
     def values_in_range(self, start, stop, count=None) -> Iterator[T]:
         for k, v in self.items_in_range(start, stop, count):
@@ -229,15 +221,19 @@ class TreeArrayView(ArrayView[T]):
         if stop <= start or start < 0 or stop < 0:
             return
 
-        items_ = self.items()
-        items_in_range = []
-        for idx, val in items_:
-            if start <= idx < stop:
-                items_in_range.append((idx, val))
-            if idx >= stop:
-                break
-        step = (len(items_in_range) // count or 1) if count else 1
-        yield from islice(items_in_range, 0, len(items_in_range), step)
+        step = 1
+        if count:
+            # narrow the range down to the actual items, then sample `count`
+            # items evenly over it, reading only the sampled ones
+            first_idx = next(self.tree.keys_in_range(start, stop), None)
+            if first_idx is None:
+                return
+            start = first_idx
+            stop = min(stop, self.max_idx() + 1)
+            step = (stop - start) // count or 1
+
+        for idx in self.tree.keys_in_range(start, stop, step):
+            yield idx, self.tree[idx]
 
     def __len__(self) -> int:
         # TODO lazier
@@ -258,6 +254,13 @@ class TreeArrayView(ArrayView[T]):
             raise NotImplementedError
         return self.tree[idx]
 
+    def take(self, indices: Union[List[int], np.ndarray]) -> np.ndarray:
+        if isinstance(indices, np.ndarray):
+            indices = indices.tolist()
+        values = np.empty(len(indices), dtype=object)
+        values[:] = self.tree.multi_get(indices)
+        return values
+
     # TODO implement append
 
     def __setitem__(
@@ -283,19 +286,34 @@ class TreeArrayView(ArrayView[T]):
     def values_list(self) -> List[T]:
         return list(self.values())
 
+    def _native_sparse_numpy(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        # Arrays of numbers stored in a container are decoded natively,
+        # straight from the encoded records into numpy buffers
+        container = getattr(self.tree, 'container', None)
+        if not isinstance(container, Container):
+            return None
+        from aim.storage.treeutils import decode_sparse_numpy
+        return decode_sparse_numpy(container.items(), dtype=self.dtype)
+
     def sparse_numpy(self) -> Tuple[np.ndarray, np.ndarray]:
-        # TODO URGENT implement using cython
+        sparse_arrays = self._native_sparse_numpy()
+        if sparse_arrays is not None:
+            return sparse_arrays
         indices_list, values_list = self.sparse_list()
         indices_array = np.array(indices_list, dtype=np.intp)
         values_array = np.array(values_list, dtype=self.dtype)
         return indices_array, values_array
 
     def indices_numpy(self) -> np.ndarray:
-        # TODO URGENT implement using cython
+        sparse_arrays = self._native_sparse_numpy()
+        if sparse_arrays is not None:
+            return sparse_arrays[0]
         return np.array(self.indices_list(), dtype=np.intp)
 
     def values_numpy(self) -> np.ndarray:
-        # TODO URGENT implement using cython
+        sparse_arrays = self._native_sparse_numpy()
+        if sparse_arrays is not None:
+            return sparse_arrays[1]
         return np.array(self.values_list(), dtype=self.dtype)
 
     def tolist(self) -> List[T]:
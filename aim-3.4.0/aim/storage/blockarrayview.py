@@ -0,0 +1,392 @@
+import time
+import numpy as np
+
+from typing import Any, Dict, Iterator, List, Optional, TYPE_CHECKING, Tuple, Union
+
+from aim.storage.arrayview import ArrayView
+
+if TYPE_CHECKING:
+    from aim.storage.pyramid import PyramidWriter
+    from aim.storage.treeview import TreeView
+
+
+# Number of consecutive steps packed into a single block.
+# Block `k` holds the records for steps in `[k * BLOCK_SIZE, (k + 1) * BLOCK_SIZE)`.
+BLOCK_SIZE = 1024
+
+# The partially filled block is re-written at most once per `BLOCK_FLUSH_INTERVAL`
+# seconds, so that readers of in-progress runs see reasonably fresh data.
+BLOCK_FLUSH_INTERVAL = 5.0
+
+# Column names of the block layout. `step` column holds sparse indices and is
+# stored for every block along with the data columns.
+STEP_COLUMN = 'step'
+DATA_COLUMNS = ('val', 'epoch', 'time')
+
+_INT64 = b'q'
+_FLOAT64 = b'd'
+_NUMPY_DTYPES = {
+    _INT64: np.dtype('<i8'),
+    _FLOAT64: np.dtype('<f8'),
+}
+# `None` values of integer columns (e.g. missing epochs) are stored as INT64_MIN
+_INT64_NONE = np.iinfo(np.int64).min
+
+
+def encode_column(values: List[Any]) -> bytes:
+    """Pack the column values into a buffer.
+
+    The first byte of the buffer encodes the column type; the rest is the
+    little-endian packed `int64` / `float64` array.
+    Integer columns may hold `None`-s, floating-point ones store them as NaN.
+    """
+    if all(val is None or isinstance(val, int) for val in values):
+        array = np.array([_INT64_NONE if val is None else val for val in values],
+                         dtype=_NUMPY_DTYPES[_INT64])
+        return _INT64 + array.tobytes()
+    array = np.array([np.nan if val is None else val for val in values],
+                     dtype=_NUMPY_DTYPES[_FLOAT64])
+    return _FLOAT64 + array.tobytes()
+
+
+def decode_column(buffer: bytes) -> np.ndarray:
+    """Unpack the column from a buffer as a read-only numpy array."""
+    return np.frombuffer(buffer, dtype=_NUMPY_DTYPES[buffer[:1]], offset=1)
+
+
+def column_to_numpy(array: np.ndarray) -> np.ndarray:
+    """Replace the `None`-sentinels of integer column with `None` objects."""
+    if array.dtype.kind == 'i':
+        mask = array == _INT64_NONE
+        if mask.any():
+            array = array.astype(object)
+            array[mask] = None
+    return array
+
+
+def column_to_list(array: np.ndarray) -> List[Any]:
+    return column_to_numpy(array).tolist()
+
+
+class BlockArrayView(ArrayView[Any]):
+    """Array of numeric elements stored in the packed block layout.
+
+    Each block is stored in a single key per column. Block columns are
+    physically grouped by the column name, so reading a whole column is a
+    single range-scan over the container:
+    `{
+        ('step', 0): b'q...', ('step', 1): b'q...',
+        ('val', 0): b'd...', ('val', 1): b'd...',
+        ...
+    }`
+
+    Args:
+        tree (:obj:`TreeView`): the sequence `blocks` subtree.
+        column (:obj:`str`): name of the data column to view.
+    """
+
+    def __init__(
+        self,
+        tree: 'TreeView',
+        column: str,
+        dtype: Any = None
+    ):
+        self.tree = tree
+        self.column = column
+        self.dtype = dtype
+
+    @classmethod
+    def exists(cls, tree: 'TreeView') -> bool:
+        """Check if the sequence `blocks` subtree holds any data."""
+        try:
+            tree.subtree(STEP_COLUMN).first()
+        except (KeyError, StopIteration):
+            return False
+        return True
+
+    def allocate(self):
+        return self
+
+    @classmethod
+    def iter_raw_blocks(cls, tree: 'TreeView') -> Iterator[Tuple]:
+        """Iterate over the `(block_idx, steps, *data columns)` blocks, see `DATA_COLUMNS`."""
+        iterators = [tree.subtree(column).items() for column in (STEP_COLUMN, *DATA_COLUMNS)]
+        for items in zip(*iterators):
+            block_idx = items[0][0]
+            assert all(column_block_idx == block_idx for column_block_idx, _ in items)
+            yield (block_idx, *(decode_column(column) for _, column in items))
+
+    def _iter_blocks(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        steps_it = self.tree.subtree(STEP_COLUMN).items()
+        column_it = self.tree.subtree(self.column).items()
+        for (block_idx, steps), (column_block_idx, column) in zip(steps_it, column_it):
+            assert block_idx == column_block_idx
+            yield decode_column(steps), decode_column(column)
+
+    def _load_block(self, block_idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        steps = self.tree[(STEP_COLUMN, block_idx)]
+        column = self.tree[(self.column, block_idx)]
+        return decode_column(steps), decode_column(column)
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from self.values()
+
+    def keys(self) -> Iterator[int]:
+        for steps, _ in self._iter_blocks():
+            yield from steps.tolist()
+
+    def indices(self) -> Iterator[int]:
+        yield from self.keys()
+
+    def values(self) -> Iterator[Any]:
+        for _, column in self._iter_blocks():
+            yield from column_to_list(column)
+
+    def items(self) -> Iterator[Tuple[int, Any]]:
+        for steps, column in self._iter_blocks():
+            yield from zip(steps.tolist(), column_to_list(column))
+
+    def values_slice(self, _slice: slice, slice_by: str = 'step') -> Iterator[Any]:
+        for k, v in self.items_slice(_slice, slice_by):
+            yield v
+
+    def items_slice(self, _slice: slice, slice_by: str = 'step') -> Iterator[Tuple[int, Any]]:
+        start, stop, step = _slice.start, _slice.stop, _slice.step
+        if start < 0 or stop < 0 or step < 0:
+            raise NotImplementedError('Negative index slices are not supported')
+        if step == 0:
+            raise ValueError('slice step cannot be zero')
+        if stop <= start:
+            return
+
+        steps, column = self._sparse_arrays()
+        if slice_by == 'index':
+            steps, column = steps[start:stop:step], column[start:stop:step]
+        elif slice_by == 'step':
+            mask = (steps >= start) & (steps < stop) & ((steps - start) % step == 0)
+            steps, column = steps[mask], column[mask]
+        yield from zip(steps.tolist(), column_to_list(column))
+
+    def values_in_range(self, start, stop, count=None) -> Iterator[Any]:
+        for k, v in self.items_in_range(start, stop, count):
+            yield v
+
+    def items_in_range(self, start, stop, count=None) -> Iterator[Tuple[int, Any]]:
+        if stop <= start or start < 0 or stop < 0:
+            return
+
+        steps, column = self._sparse_arrays()
+        lo, hi = np.searchsorted(steps, (start, stop))
+        step = ((hi - lo) // count or 1) if count else 1
+        yield from zip(steps[lo:hi:step].tolist(), column_to_list(column[lo:hi:step]))
+
+    def __len__(self) -> int:
+        try:
+            last_idx = self.last_idx()
+        except KeyError:
+            return 0
+        return last_idx + 1
+
+    def __bool__(self) -> bool:
+        return bool(len(self))
+
+    def __getitem__(
+        self,
+        idx: Union[int, slice]
+    ) -> Any:
+        if isinstance(idx, slice):
+            raise NotImplementedError
+        steps, column = self._load_block(idx // BLOCK_SIZE)
+        pos = np.searchsorted(steps, idx)
+        if pos == len(steps) or steps[pos] != idx:
+            raise KeyError(idx)
+        return column_to_list(column[pos:pos + 1])[0]
+
+    def take(self, indices: Union[List[int], np.ndarray]) -> np.ndarray:
+        indices = np.asarray(indices, dtype=np.int64)
+        values = np.full(len(indices), None, dtype=object)
+        block_indices = indices // BLOCK_SIZE
+        requested_blocks = np.unique(block_indices).tolist()
+        # all the requested blocks are read in a single batch
+        paths = [(column, block_idx) for block_idx in requested_blocks for column in (STEP_COLUMN, self.column)]
+        encoded_blocks = self.tree.multi_get(paths)
+        for i, block_idx in enumerate(requested_blocks):
+            steps, column = encoded_blocks[2 * i], encoded_blocks[2 * i + 1]
+            if steps is None or column is None:
+                continue
+            steps, column = decode_column(steps), column_to_numpy(decode_column(column))
+            mask = block_indices == block_idx
+            requested = indices[mask]
+            pos = np.searchsorted(steps, requested).clip(max=len(steps) - 1)
+            found = steps[pos] == requested
+            block_values = np.full(len(requested), None, dtype=object)
+            block_values[found] = column[pos[found]]
+            values[mask] = block_values
+        return values
+
+    def __setitem__(
+        self,
+        idx: int,
+        val: Any
+    ):
+        # Blocks are written as a whole by `BlockArrayWriter`
+        raise NotImplementedError
+
+    def _sparse_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        steps_list = []
+        column_list = []
+        for steps, column in self._iter_blocks():
+            steps_list.append(steps)
+            column_list.append(column)
+        if not steps_list:
+            return np.array([], dtype=np.intp), np.array([], dtype=self.dtype)
+        return np.concatenate(steps_list), np.concatenate(column_list)
+
+    def sparse_list(self) -> Tuple[List[int], List[Any]]:
+        steps, column = self._sparse_arrays()
+        return steps.tolist(), column_to_list(column)
+
+    def indices_list(self) -> List[int]:
+        return list(self.indices())
+
+    def values_list(self) -> List[Any]:
+        return list(self.values())
+
+    def sparse_numpy(self) -> Tuple[np.ndarray, np.ndarray]:
+        steps, column = self._sparse_arrays()
+        values = column_to_numpy(column)
+        if self.dtype is not None:
+            values = values.astype(self.dtype)
+        return steps.astype(np.intp), values
+
+    def indices_numpy(self) -> np.ndarray:
+        return self.sparse_numpy()[0]
+
+    def values_numpy(self) -> np.ndarray:
+        return self.sparse_numpy()[1]
+
+    def tolist(self) -> List[Any]:
+        steps, column = self.sparse_list()
+        arr = [None] * (steps[-1] + 1 if steps else 0)
+        for step, val in zip(steps, column):
+            arr[step] = val
+        return arr
+
+    def first(self) -> Tuple[int, Any]:
+        idx = self.min_idx()
+        return idx, self[idx]
+
+    def first_idx(self) -> int:
+        return self.min_idx()
+
+    def first_value(self) -> Any:
+        return self[self.min_idx()]
+
+    def last(self) -> Tuple[int, Any]:
+        idx = self.max_idx()
+        return idx, self[idx]
+
+    def last_idx(self) -> int:
+        return self.max_idx()
+
+    def last_value(self) -> Any:
+        return self[self.max_idx()]
+
+    def min_idx(self) -> int:
+        try:
+            block_idx = self.tree.subtree(STEP_COLUMN).first()
+        except StopIteration:
+            raise KeyError
+        steps = decode_column(self.tree[(STEP_COLUMN, block_idx)])
+        return int(steps[0])
+
+    def max_idx(self) -> int:
+        try:
+            block_idx = self.tree.subtree(STEP_COLUMN).last()
+        except StopIteration:
+            raise KeyError
+        steps = decode_column(self.tree[(STEP_COLUMN, block_idx)])
+        return int(steps[-1])
+
+
+class BlockArrayWriter:
+    """Write buffer for the packed block layout of a numeric sequence.
+
+    The records of the block being written are kept in memory. The block is
+    written to the `tree` when tracking moves to another block, when the
+    `flush_interval` has passed since the last write, or on explicit `flush()`
+    (e.g. when the run is closed).
+
+    Args:
+        tree (:obj:`TreeView`): the sequence `blocks` subtree.
+        pyramid_writer (:obj:`PyramidWriter`, optional): the writer of the sequence pyramid,
+            receives the blocks being written.
+    """
+
+    def __init__(
+        self,
+        tree: 'TreeView',
+        block_size: int = BLOCK_SIZE,
+        flush_interval: float = BLOCK_FLUSH_INTERVAL,
+        pyramid_writer: Optional['PyramidWriter'] = None
+    ):
+        self.tree = tree
+        self.block_size = block_size
+        self.flush_interval = flush_interval
+        self.pyramid_writer = pyramid_writer
+
+        self._block_idx: Optional[int] = None
+        self._records: Dict[int, Tuple[Any, ...]] = {}
+        self._dirty = False
+        self._last_flush = 0.0
+
+    def track(
+        self,
+        step: int,
+        val: Any,
+        epoch: Optional[int],
+        timestamp: float
+    ):
+        block_idx = step // self.block_size
+        if block_idx != self._block_idx:
+            self.flush()
+            self._load(block_idx)
+
+        self._records[step] = (val, epoch, timestamp)
+        self._dirty = True
+
+        block_is_full = step == (block_idx + 1) * self.block_size - 1
+        if block_is_full or time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def _load(self, block_idx: int):
+        # The block may already be (partially) written, for example when
+        # resuming tracking or tracking steps out of order
+        self._block_idx = block_idx
+        self._records = {}
+        try:
+            steps = decode_column(self.tree[(STEP_COLUMN, block_idx)])
+            columns = [column_to_list(decode_column(self.tree[(column, block_idx)]))
+                       for column in DATA_COLUMNS]
+        except KeyError:
+            return
+        for step, record in zip(steps.tolist(), zip(*columns)):
+            self._records[step] = record
+
+    def flush(self):
+        """Write the block being tracked to the tree."""
+        self._last_flush = time.time()
+        if not self._dirty:
+            return
+
+        steps = sorted(self._records.keys())
+        records = [self._records[step] for step in steps]
+        encoded_steps = encode_column(steps)
+        encoded_columns = [encode_column(list(values)) for values in zip(*records)]
+        self.tree[(STEP_COLUMN, self._block_idx)] = encoded_steps
+        for column, encoded_column in zip(DATA_COLUMNS, encoded_columns):
+            self.tree[(column, self._block_idx)] = encoded_column
+        if self.pyramid_writer is not None:
+            self.pyramid_writer.add_block(self._block_idx, decode_column(encoded_steps),
+                                          *map(decode_column, encoded_columns))
+        self._dirty = False
@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Iterator, Tuple, Union
+from typing import Iterator, List, Optional, Tuple, Union
 
 from typing import TYPE_CHECKING
 
@@ -71,6 +71,15 @@ class Container:
         """Returns the value by the given `key`."""
         ...
 
+    @abstractmethod
+    def multi_get(self, keys: List[ContainerKey]) -> List[Optional[ContainerValue]]:
+        """Returns the values for the given `keys` in a single batched lookup.
+
+        The values are returned in the same order as the `keys`, with
+        :obj:`None` for the keys that are not found.
+        """
+        ...
+
     @abstractmethod
     def set(self, key: ContainerKey, value: ContainerValue, *, store_batch=None):
         """Set a value for given key, optionally store in a batch.
@@ -1,13 +1,13 @@
 from aim.storage import encoding as E
 from aim.storage.encoding.encoding import decode
 from aim.storage.object import CustomObject
-from aim.storage.types import AimObject, AimObjectKey, AimObjectPath
-from aim.storage.utils import ArrayFlag, CustomObjectFlagType
+from aim.storage.types import AimObject, AimObjectKey, AimObjectPath, BLOB
+from aim.storage.utils import ArrayFlag, ArrayFlagType, CustomObjectFlagType, ObjectFlagType
 from aim.storage.container import Container
 from aim.storage import treeutils
 from aim.storage.arrayview import TreeArrayView
 
-from typing import Iterator, Tuple, Union
+from typing import Any, Iterator, List, Tuple, Union
 
 from aim.storage.treeview import TreeView
 
@@ -73,6 +73,24 @@ class ContainerTreeView(TreeView):
         except KeyError:
             raise KeyError('No key {} is present.'.format(path))
 
+    def multi_get(
+        self,
+        paths: List[Union[AimObjectKey, AimObjectPath]],
+        default: Any = None
+    ) -> List[AimObject]:
+        encoded_paths = [E.encode_path(path) for path in paths]
+        values = []
+        for path, encoded_val in zip(paths, self.container.multi_get(encoded_paths)):
+            if encoded_val is None:
+                values.append(default)
+                continue
+            val = decode(encoded_val)
+            if isinstance(val, (ArrayFlagType, ObjectFlagType, CustomObjectFlagType)):
+                # The path holds a subtree rather than a single value
+                val = self.get(path, default)
+            values.append(val)
+        return values
+
     def __delitem__(
         self,
         path: Union[AimObjectKey, AimObjectPath]
@@ -97,13 +115,31 @@ class ContainerTreeView(TreeView):
 
         batch = self.container.batch()
         encoded_path = E.encode_path(path)
-        self.container.delete_range(encoded_path, encoded_path + b'\xff',
-                                    store_batch=batch)
-        for key, val in treeutils.encode_tree(value, strict=strict):
-            self.container.set(encoded_path + key, val,
+        # Dicts don't have a record of their own path, so the old value is
+        # removed explicitly. Other values overwrite the record of the path.
+        if isinstance(value, dict) or self._may_have_subtree(encoded_path):
+            self.container.delete_range(encoded_path, encoded_path + b'\xff',
+                                        store_batch=batch)
+        for key, val in treeutils.encode_tree(value, strict=strict, prefix=encoded_path):
+            self.container.set(key, val,
                                store_batch=batch)
         self.container.commit(batch)
 
+    def _may_have_subtree(
+        self,
+        encoded_path: bytes
+    ) -> bool:
+        # A path holding a primitive value has no records nested under it,
+        # so overwriting the value doesn't need a (costly) range deletion.
+        # Non-empty dicts have no record of their own, hence a missing
+        # record is not conclusive.
+        encoded_val = self.container.get(encoded_path)
+        if encoded_val is None:
+            return True
+        if isinstance(encoded_val, BLOB):
+            return False
+        return isinstance(decode(encoded_val), (ArrayFlagType, ObjectFlagType, CustomObjectFlagType))
+
     def keys(
         self,
         path: Union[AimObjectKey, AimObjectPath] = (),
@@ -130,6 +166,30 @@ class ContainerTreeView(TreeView):
             assert p.endswith(b'\xfe')
             path = p[:-1] + b'\xff'
 
+    def keys_in_range(
+        self,
+        start: int,
+        stop: int,
+        step: int = 1
+    ) -> Iterator[int]:
+        # Integer keys are encoded in big-endian, so the order of encoded keys
+        # matches the numeric one. Seek straight to each of the targets instead
+        # of iterating over the keys in between.
+        encoded_stop = E.encode_path(stop)
+        target = start
+        walker = self.container.walk()
+        try:
+            next(walker)
+            while target < stop:
+                key = walker.send(E.encode_path(target))
+                if key is None or key >= encoded_stop:
+                    return
+                idx = E.decode_path(key)[0]
+                yield idx
+                target = start + ((idx - start) // step + 1) * step
+        except StopIteration:
+            return
+
     def items(
         self,
         path: Union[AimObjectKey, AimObjectPath] = ()
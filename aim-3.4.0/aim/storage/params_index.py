@@ -0,0 +1,192 @@
+"""Secondary index of the run params.
+
+The index maps the flattened param paths and their values to the hashes of
+the runs having them, and keeps the list of the indexed runs:
+`{
+    ('values', '["hparams", "lr"]', 'nbf50624dd2f1a9fc', 'a3c5f1e'): 1,
+    ('values', '["hparams", "optimizer"]', 'sadam', 'a3c5f1e'): 1,
+    ...
+    ('runs', 'a3c5f1e'): 1,
+}`
+
+Numbers (including booleans) are keyed by the order-preserving encoding of
+their float64 value, strings are keyed by themselves; the rest of the values
+(None, lists, blobs, etc.) are not indexed. The float64 keys are not exact for
+big integers, so the runs found by the index are the candidates to check
+the condition on, rather than the final result.
+
+Each run writes its index records to its own meta container, so the index of
+the repo is the union of them, same as the `attrs` of the meta tree.
+"""
+import json
+import math
+import operator
+import struct
+
+from typing import Any, Iterator, Optional, Set, Tuple, TYPE_CHECKING
+
+from aim.storage import treeutils
+from aim.storage.types import AimObject, AimObjectPath
+
+if TYPE_CHECKING:
+    from aim.storage.treeview import TreeView
+
+
+_SIGN_BIT = 1 << 63
+_UINT64_MASK = (1 << 64) - 1
+# Integers up to 2^53 are exactly representable in float64
+_MAX_EXACT_FLOAT = 2 ** 53
+
+_NUMBER_KEY_PREFIX = 'n'
+_STRING_KEY_PREFIX = 's'
+
+_RANGE_OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+# The float64 keys of numbers are compared non-strictly, so that the
+# big integers rounded to the same key as the bound are not missed.
+_NON_STRICT_OPERATORS = {
+    '<': operator.le,
+    '<=': operator.le,
+    '>': operator.ge,
+    '>=': operator.ge,
+}
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (bool, int, float))
+
+
+def encode_index_value(value: Any) -> Optional[str]:
+    """Encode the param value as an index key, None if the value is not indexed."""
+    if isinstance(value, str):
+        return _STRING_KEY_PREFIX + value
+    if not _is_number(value):
+        return None
+    try:
+        # adding 0.0 turns -0.0 into 0.0
+        value = float(value) + 0.0
+    except OverflowError:
+        value = math.inf if value > 0 else -math.inf
+    if math.isnan(value):
+        return None
+    bits, = struct.unpack('>Q', struct.pack('>d', value))
+    bits = bits ^ _UINT64_MASK if bits & _SIGN_BIT else bits | _SIGN_BIT
+    return f'{_NUMBER_KEY_PREFIX}{bits:016x}'
+
+
+def decode_index_value(key: str) -> Any:
+    if key.startswith(_STRING_KEY_PREFIX):
+        return key[1:]
+    bits = int(key[1:], 16)
+    bits = bits ^ _SIGN_BIT if bits & _SIGN_BIT else bits ^ _UINT64_MASK
+    value, = struct.unpack('>d', struct.pack('>Q', bits))
+    return value
+
+
+def encode_param_path(path: AimObjectPath) -> str:
+    return json.dumps(list(path))
+
+
+def iter_index_keys(params: AimObject, path: AimObjectPath = ()) -> Iterator[Tuple[str, str]]:
+    """Iterate over the `(param path, value)` index keys of the `params` set at the `path`."""
+    for leaf_path, value in treeutils.unfold_tree(params, path=path, unfold_array=False):
+        value_key = encode_index_value(value)
+        if leaf_path and value_key is not None:
+            yield encode_param_path(leaf_path), value_key
+
+
+class ParamsIndex:
+    """Secondary index of the run params.
+
+    Args:
+        tree (:obj:`TreeView`): the `params_index` subtree of the meta tree.
+    """
+
+    def __init__(self, tree: 'TreeView'):
+        self.tree = tree
+        self._indexed_runs: Optional[Set[str]] = None
+
+    def is_indexed(self, run_hash: str) -> bool:
+        try:
+            return bool(self.tree['runs', run_hash])
+        except KeyError:
+            return False
+
+    def add_run(self, run_hash: str, params: AimObject):
+        """Index all the params of the run."""
+        self.update(run_hash, (), None, params)
+        self.tree['runs', run_hash] = 1
+
+    def remove_run(self, run_hash: str, params: AimObject):
+        """Remove the run, given its indexed params, from the index."""
+        self.update(run_hash, (), params, None)
+        del self.tree['runs', run_hash]
+
+    def update(self, run_hash: str, path: AimObjectPath, old_params: AimObject, new_params: AimObject):
+        """Replace the index records of the run params at the `path`."""
+        old_keys = set(iter_index_keys(old_params, path)) if old_params is not None else set()
+        new_keys = set(iter_index_keys(new_params, path)) if new_params is not None else set()
+        for param_key, value_key in old_keys - new_keys:
+            del self.tree['values', param_key, value_key, run_hash]
+        for param_key, value_key in new_keys - old_keys:
+            self.tree['values', param_key, value_key, run_hash] = 1
+
+    def indexed_runs(self) -> Set[str]:
+        if self._indexed_runs is None:
+            self._indexed_runs = set(self.tree.subtree('runs').keys())
+        return self._indexed_runs
+
+    def _runs_with_value(self, param_key: str, value_key: str) -> Set[str]:
+        return set(self.tree.subtree(('values', param_key, value_key)).keys())
+
+    def find_runs(self, path: AimObjectPath, op: str, value: Any) -> Optional[Set[str]]:
+        """Find the indexed runs which may satisfy the `param <op> value` condition.
+
+        Args:
+            path (:obj:`tuple`): The param path.
+            op (:obj:`str`): One of `==`, `!=`, `<`, `<=`, `>`, `>=` and `in`.
+            value: The value to compare the param with; a collection of values for `in`.
+
+        Returns:
+            The hashes of the candidate runs, or None if the condition cannot be answered by the index.
+        """
+        param_key = encode_param_path(path)
+        if op == 'in':
+            if not isinstance(value, (list, tuple, set, frozenset)):
+                return None
+            value_keys = [encode_index_value(item) for item in value]
+            if None in value_keys:
+                return None
+            runs = set()
+            for value_key in value_keys:
+                runs |= self._runs_with_value(param_key, value_key)
+            return runs
+
+        value_key = encode_index_value(value)
+        if value_key is None:
+            return None
+        if op == '==':
+            return self._runs_with_value(param_key, value_key)
+        if op == '!=':
+            # the runs having the value for sure are excluded
+            if _is_number(value) and not abs(value) < _MAX_EXACT_FLOAT:
+                return None
+            return self.indexed_runs() - self._runs_with_value(param_key, value_key)
+        if op not in _RANGE_OPERATORS:
+            return None
+
+        # numbers are compared only to numbers and strings to strings
+        if _is_number(value):
+            compare = _NON_STRICT_OPERATORS[op]
+            value = decode_index_value(value_key)
+        else:
+            compare = _RANGE_OPERATORS[op]
+        runs = set()
+        for key in self.tree.subtree(('values', param_key)).keys():
+            if key[0] == value_key[0] and compare(decode_index_value(key), value):
+                runs |= self._runs_with_value(param_key, key)
+        return runs
@@ -1,7 +1,7 @@
 from aim.storage.container import Container
 from aim.storage.containertreeview import ContainerTreeView
 
-from typing import Iterator, Tuple
+from typing import Iterator, List, Optional, Tuple
 
 
 class PrefixView(Container):
@@ -91,6 +91,18 @@ class PrefixView(Container):
         path = self.absolute_path(key)
         return self.container[path]
 
+    def multi_get(
+        self,
+        keys: List[bytes]
+    ) -> List[Optional[bytes]]:
+        """Returns the values for the given `keys` in a single batched lookup.
+
+        The values are returned in the same order as the `keys`, with
+        :obj:`None` for the keys that are not found.
+        """
+        paths = [self.absolute_path(key) for key in keys]
+        return self.container.multi_get(paths)
+
     def set(
         self,
         key: bytes,
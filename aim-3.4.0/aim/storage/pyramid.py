@@ -0,0 +1,274 @@
+import time
+import numpy as np
+
+from typing import Dict, Iterable, Optional, TYPE_CHECKING, Tuple
+
+from aim.storage.blockarrayview import _INT64_NONE, column_to_numpy
+
+if TYPE_CHECKING:
+    from aim.storage.treeview import TreeView
+
+
+# Level `k` of the pyramid splits the steps into buckets of
+# `PYRAMID_BASE_WIDTH * PYRAMID_FACTOR ** k` steps. The base width divides the
+# block size, so the buckets of the first level are computed from a single block.
+PYRAMID_BASE_WIDTH = 64
+PYRAMID_FACTOR = 4
+
+# Number of consecutive buckets of a level stored in a single key.
+# Chunk `c` of a level holds the buckets `[c * PYRAMID_CHUNK_SIZE, (c + 1) * PYRAMID_CHUNK_SIZE)`.
+PYRAMID_CHUNK_SIZE = 1024
+
+# The pyramid of a sequence being tracked is updated at most once per `PYRAMID_UPDATE_INTERVAL` seconds.
+PYRAMID_UPDATE_INTERVAL = 5.0
+
+# A bucket holds the number of records and non-NaN values, their sum, and the
+# records with the min and the max value (the first ones, if there are several).
+PYRAMID_DTYPE = np.dtype([
+    ('bucket', '<i8'),
+    ('count', '<i8'),
+    ('value_count', '<i8'),
+    ('sum', '<f8'),
+    ('min', '<f8'),
+    ('min_step', '<i8'),
+    ('min_epoch', '<i8'),
+    ('min_time', '<f8'),
+    ('max', '<f8'),
+    ('max_step', '<i8'),
+    ('max_epoch', '<i8'),
+    ('max_time', '<f8'),
+    ('last_step', '<i8'),
+])
+
+_EXTREMA = (('min', np.fmin), ('max', np.fmax))
+_RECORD_FIELDS = ('step', 'epoch', 'time')
+
+
+def bucket_width(level: int) -> int:
+    return PYRAMID_BASE_WIDTH * PYRAMID_FACTOR ** level
+
+
+def bucket_means(buckets: np.ndarray) -> np.ndarray:
+    """Mean of the non-NaN values of the buckets; NaN for the buckets of NaNs only."""
+    means = np.full(len(buckets), np.nan)
+    np.divide(buckets['sum'], buckets['value_count'], out=means, where=buckets['value_count'] > 0)
+    return means
+
+
+def bucket_extrema(buckets: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Steps, values, epochs and timestamps of the records holding the min and the max value of the buckets.
+
+    The records are ordered by step; the ones holding both the min and the max are returned once.
+    """
+    def records(field: str) -> np.ndarray:
+        return np.concatenate((buckets[f'min{field}'], buckets[f'max{field}']))
+
+    steps, positions = np.unique(records('_step'), return_index=True)
+    return (steps,
+            records('')[positions],
+            column_to_numpy(records('_epoch')[positions]),
+            records('_time')[positions])
+
+
+def records_to_buckets(steps: np.ndarray,
+                       values: np.ndarray,
+                       epochs: np.ndarray,
+                       timestamps: np.ndarray) -> np.ndarray:
+    """Single-record buckets of the raw records of the packed block layout."""
+    values = values.astype(np.float64)
+    if epochs.dtype.kind == 'f':
+        epochs = np.where(np.isnan(epochs), _INT64_NONE, epochs)
+    is_value = ~np.isnan(values)
+
+    buckets = np.empty(len(steps), dtype=PYRAMID_DTYPE)
+    buckets['bucket'] = steps
+    buckets['count'] = 1
+    buckets['value_count'] = is_value
+    buckets['sum'] = np.where(is_value, values, 0)
+    for stat, _ in _EXTREMA:
+        buckets[stat] = values
+        buckets[f'{stat}_step'] = steps
+        buckets[f'{stat}_epoch'] = epochs
+        buckets[f'{stat}_time'] = timestamps
+    buckets['last_step'] = steps
+    return buckets
+
+
+def merge_buckets(buckets: np.ndarray, parents: np.ndarray) -> np.ndarray:
+    """Merge the consecutive buckets having the same `parents` bucket index."""
+    starts = np.flatnonzero(np.diff(parents, prepend=parents[0] - 1))
+    groups = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(buckets))))
+
+    merged = np.empty(len(starts), dtype=PYRAMID_DTYPE)
+    merged['bucket'] = parents[starts]
+    for field in ('count', 'value_count', 'sum'):
+        merged[field] = np.add.reduceat(buckets[field], starts)
+    merged['last_step'] = np.maximum.reduceat(buckets['last_step'], starts)
+    for stat, reduce in _EXTREMA:
+        # fmin/fmax skip the NaN values; the buckets of NaNs only keep their first record
+        merged[stat] = reduce.reduceat(buckets[stat], starts)
+        positions = starts.copy()
+        matches = np.flatnonzero(buckets[stat] == merged[stat][groups])
+        matched_groups, first = np.unique(groups[matches], return_index=True)
+        positions[matched_groups] = matches[first]
+        for field in _RECORD_FIELDS:
+            merged[f'{stat}_{field}'] = buckets[f'{stat}_{field}'][positions]
+    return merged
+
+
+def decode_buckets(buffer: bytes) -> np.ndarray:
+    return np.frombuffer(buffer, dtype=PYRAMID_DTYPE)
+
+
+class PyramidView:
+    """Multi-resolution summary of a numeric sequence.
+
+    The buckets of each level are stored in chunks, one key per chunk:
+    `{
+        (0, 0): b'...', (0, 1): b'...',
+        (1, 0): b'...',
+        ...
+    }`
+    The top level is the first one with a single bucket. The buckets of a
+    level are structured numpy arrays of the `PYRAMID_DTYPE`.
+
+    Args:
+        tree (:obj:`TreeView`): the sequence `pyramid` subtree.
+    """
+
+    def __init__(self, tree: 'TreeView'):
+        self.tree = tree
+
+    def num_levels(self) -> int:
+        try:
+            return self.tree.last() + 1
+        except (KeyError, StopIteration):
+            return 0
+
+    def level(self, level: int) -> np.ndarray:
+        chunks = [decode_buckets(buffer) for _, buffer in self.tree.subtree(level).items()]
+        if not chunks:
+            return np.empty(0, dtype=PYRAMID_DTYPE)
+        return np.concatenate(chunks)
+
+    def last_step(self) -> Optional[int]:
+        """The last step summarized by the pyramid, None if the pyramid is empty."""
+        num_levels = self.num_levels()
+        if not num_levels:
+            return None
+        return int(self.level(num_levels - 1)['last_step'].max())
+
+    def select_level(self, num_buckets: int) -> Optional[np.ndarray]:
+        """Buckets of the coarsest level having at least `num_buckets` of them.
+
+        The levels are read starting from the top one, so the amount of data read
+        is proportional to `num_buckets`, rather than to the length of the sequence.
+        Returns None if even the first level is too coarse.
+        """
+        for level in reversed(range(self.num_levels())):
+            buckets = self.level(level)
+            if len(buckets) >= num_buckets:
+                return buckets
+        return None
+
+
+class PyramidWriter:
+    """Keeps the pyramid of a sequence up to date with its blocks.
+
+    The first level buckets of the blocks written by :obj:`BlockArrayWriter`
+    are kept in memory, and merged into the pyramid along with the upper
+    levels on `update()`. A chunk is read before it is rewritten, but the
+    chunks written during the update are passed on in memory rather than
+    read back, as the writes might be buffered by the container.
+
+    Args:
+        tree (:obj:`TreeView`): the sequence `pyramid` subtree.
+    """
+
+    def __init__(
+        self,
+        tree: 'TreeView',
+        update_interval: float = PYRAMID_UPDATE_INTERVAL
+    ):
+        self.tree = tree
+        self.update_interval = update_interval
+
+        self._num_levels: Optional[int] = None
+        self._pending: Dict[int, np.ndarray] = {}
+        self._last_update = time.time()
+
+    def add_block(
+        self,
+        block_idx: int,
+        steps: np.ndarray,
+        values: np.ndarray,
+        epochs: np.ndarray,
+        timestamps: np.ndarray
+    ):
+        """Summarize the records of the block. The block may be added again once it is re-written."""
+        if not len(steps):
+            return
+        buckets = records_to_buckets(steps, values, epochs, timestamps)
+        self._pending[block_idx] = merge_buckets(buckets, steps // PYRAMID_BASE_WIDTH)
+
+    def rebuild(self, blocks: Iterable):
+        """Summarize all the `(block_idx, steps, values, epochs, timestamps)` blocks of the sequence."""
+        for block in blocks:
+            self.add_block(*block)
+        self.update(force=True)
+
+    def update(self, force: bool = False):
+        """Write the pending buckets to the pyramid, if the `update_interval` has passed since the last update."""
+        now = time.time()
+        if not force and now - self._last_update < self.update_interval:
+            return
+        self._last_update = now
+        if not self._pending:
+            return
+        if self._num_levels is None:
+            self._num_levels = PyramidView(self.tree).num_levels()
+
+        buckets = np.concatenate([self._pending[block_idx] for block_idx in sorted(self._pending)])
+        self._pending = {}
+        level = 0
+        while True:
+            chunks = self._write_buckets(level, buckets)
+            if level + 1 < self._num_levels:
+                # only the parents of the updated buckets are changed
+                children = np.concatenate([chunks[chunk_idx] for chunk_idx in sorted(chunks)])
+                children = children[np.isin(children['bucket'] // PYRAMID_FACTOR,
+                                            buckets['bucket'] // PYRAMID_FACTOR)]
+            else:
+                children = self._read_level(level, chunks)
+                if len(children) <= 1:
+                    self._num_levels = level + 1
+                    return
+                self._num_levels = level + 2
+            buckets = merge_buckets(children, children['bucket'] // PYRAMID_FACTOR)
+            level += 1
+
+    def _read_chunk(self, level: int, chunk_idx: int) -> np.ndarray:
+        try:
+            return decode_buckets(self.tree[(level, chunk_idx)])
+        except KeyError:
+            return np.empty(0, dtype=PYRAMID_DTYPE)
+
+    def _read_level(self, level: int, written_chunks: Dict[int, np.ndarray]) -> np.ndarray:
+        chunks = dict(written_chunks)
+        for chunk_idx, buffer in self.tree.subtree(level).items():
+            if chunk_idx not in chunks:
+                chunks[chunk_idx] = decode_buckets(buffer)
+        return np.concatenate([chunks[chunk_idx] for chunk_idx in sorted(chunks)])
+
+    def _write_buckets(self, level: int, buckets: np.ndarray) -> Dict[int, np.ndarray]:
+        # The buckets replace the ones with the same index; returns the updated chunks
+        chunk_indices = buckets['bucket'] // PYRAMID_CHUNK_SIZE
+        chunks = {}
+        for chunk_idx in np.unique(chunk_indices).tolist():
+            updated = buckets[chunk_indices == chunk_idx]
+            chunk = self._read_chunk(level, chunk_idx)
+            chunk = np.concatenate((chunk[~np.isin(chunk['bucket'], updated['bucket'])], updated))
+            chunk = chunk[np.argsort(chunk['bucket'], kind='stable')]
+            self.tree[(level, chunk_idx)] = chunk.tobytes()
+            chunks[chunk_idx] = chunk
+        return chunks
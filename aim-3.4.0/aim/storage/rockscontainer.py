@@ -1,17 +1,20 @@
+import hashlib
 import logging
 import os
+import threading
 from pathlib import Path
 from filelock import FileLock
 
 import aimrocks
 
-from typing import Iterator, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 
 from aim.ext.cleanup import AutoClean
 from aim.ext.exception_resistant import exception_resistant
 from aim.storage.types import BLOB, BLOBLoader
 from aim.storage.container import Container, ContainerKey, ContainerValue
 from aim.storage.prefixview import PrefixView
+from aim.storage.rocksprofile import get_db_options, is_blob_dedup_enabled
 from aim.storage.containertreeview import ContainerTreeView
 from aim.storage.treeview import TreeView
 
@@ -21,6 +24,42 @@ logger = logging.getLogger(__name__)
 BLOB_SENTINEL = b''
 BLOB_DOMAIN = b'BLOBS\xfe'
 
+# Content-addressed BLOBs are stored once per container under their digest.
+# The record in `BLOB_DOMAIN` holds the reference to the digest instead of the
+# content, and a `BLOB_REFS_DOMAIN + digest + key` record is kept per
+# reference, so that the content can be garbage collected once it is no more
+# referenced.
+BLOB_CAS_DOMAIN = b'BLOBCAS\xfe'
+BLOB_REFS_DOMAIN = b'BLOBREFS\xfe'
+BLOB_REF_MARKER = b'\xffBLOBREF\xfe'
+BLOB_DIGEST_SIZE = 32
+
+
+# The number of the runs started, finalized or deleted by this process. The
+# union DBs of the process recheck their shards once it changes, without
+# waiting for the shards check interval.
+_local_shards_changes = 0
+
+
+def notify_shards_changed():
+    global _local_shards_changes
+    _local_shards_changes += 1
+
+
+def get_local_shards_changes() -> int:
+    return _local_shards_changes
+
+
+def blob_digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=BLOB_DIGEST_SIZE).digest()
+
+
+def parse_blob_ref(value: bytes) -> Optional[bytes]:
+    """Returns the digest if the `BLOB_DOMAIN` record is a reference."""
+    if len(value) == len(BLOB_REF_MARKER) + BLOB_DIGEST_SIZE and value.startswith(BLOB_REF_MARKER):
+        return value[len(BLOB_REF_MARKER):]
+    return None
+
 
 class RocksAutoClean(AutoClean):
     PRIORITY = 60
@@ -35,6 +74,7 @@ class RocksAutoClean(AutoClean):
         super().__init__(instance)
         self._lock = None
         self._db = None
+        self._write_buffer = None
 
     def _close(self):
         """
@@ -43,6 +83,9 @@ class RocksAutoClean(AutoClean):
         """
         if self._lock is not None:
             if self._db is not None:
+                if self._write_buffer is not None:
+                    self._db.write(self._write_buffer)
+                    self._write_buffer = None
                 self._db.flush()
                 self._db.flush_wal()
             self._lock.release()
@@ -60,6 +103,8 @@ class RocksContainer(Container):
         path: str,
         read_only: bool = False,
         wait_if_busy: bool = False,
+        profile: str = None,
+        dedup_blobs: bool = None,
         **extra_options
     ) -> None:
         self._resources: RocksAutoClean = None
@@ -85,15 +130,19 @@ class RocksContainer(Container):
             max_bytes_for_level_base=512 * 1024 * 1024,  # 512MB
             max_bytes_for_level_multiplier=8,
         )
+        # shared block cache, bloom filters and table options for `meta` / `seqs` containers
+        self._db_opts.update(get_db_options(profile))
         self._extra_opts = extra_options
+        # content-addressed BLOB writes; the references are resolved on reads regardless
+        self.dedup_blobs = is_blob_dedup_enabled() if dedup_blobs is None else dedup_blobs
         # opts.allow_concurrent_memtable_write = False
         # opts.memtable_factory = aimrocks.VectorMemtableFactory()
-        # opts.table_factory = aimrocks.PlainTableFactory()
-        # opts.table_factory = aimrocks.BlockBasedTableFactory(block_cache=aimrocks.LRUCache(67108864))
         # opts.write_buffer_size = 67108864
         # opts.arena_block_size = 67108864
 
         self._wait_if_busy = wait_if_busy  # TODO implement
+        self._write_buffer_owner: Optional[int] = None
+        self._write_buffer_lock = threading.Lock()
         self._lock_path: Optional[Path] = None
         self._progress_path: Optional[Path] = None
 
@@ -114,6 +163,13 @@ class RocksContainer(Container):
     def _db(self, value):
         self._resources._db = value
 
+    @property
+    def _write_buffer(self) -> Optional[aimrocks.WriteBatch]:
+        # the pending writes are visible to the thread which started buffering only
+        if self._write_buffer_owner != threading.get_ident():
+            return None
+        return self._resources._write_buffer
+
     @property
     def _lock(self):
         return self._resources._lock
@@ -150,6 +206,7 @@ class RocksContainer(Container):
             progress_dir.mkdir(parents=True, exist_ok=True)
             self._progress_path = progress_dir / self.path.name
             self._progress_path.touch(exist_ok=True)
+            notify_shards_changed()
         return db
 
     def finalize(self, *, index: Container):
@@ -162,6 +219,9 @@ class RocksContainer(Container):
             return
 
         for k, v in self.items():
+            # the content of the BLOBs is indexed through the BLOB records referring to it
+            if k.startswith((BLOB_CAS_DOMAIN, BLOB_REFS_DOMAIN)):
+                continue
             index[k] = v
 
         self._db.flush()
@@ -169,6 +229,7 @@ class RocksContainer(Container):
 
         self._progress_path.unlink()
         self._progress_path = None
+        notify_shards_changed()
 
     def close(self):
         """Close all the resources."""
@@ -228,6 +289,26 @@ class RocksContainer(Container):
             return self._get_blob(key)
         return value
 
+    def multi_get(
+        self,
+        keys: List[ContainerKey]
+    ) -> List[Optional[ContainerValue]]:
+        """Returns the values for the given `keys` in a single batched lookup.
+
+        The values are returned in the same order as the `keys`, with
+        :obj:`None` for the keys that are not found.
+        """
+        if not keys:
+            return []
+        values = self.db.multi_get(keys)
+        result = []
+        for key in keys:
+            value = values.get(key)
+            if value == BLOB_SENTINEL:
+                value = self._get_blob(key)
+            result.append(value)
+        return result
+
     def _get_blob_loader(
         self,
         key: ContainerKey
@@ -235,6 +316,9 @@ class RocksContainer(Container):
         def loader() -> bytes:
             data = self[BLOB_DOMAIN + key]
             assert isinstance(data, bytes)
+            digest = parse_blob_ref(data)
+            if digest is not None:
+                data = self[BLOB_CAS_DOMAIN + digest]
             return data
         return loader
 
@@ -260,10 +344,67 @@ class RocksContainer(Container):
         *,
         target: aimrocks.WriteBatch
     ):
+        data = bytes(value)
+        if not self.dedup_blobs:
+            self._put(key=BLOB_DOMAIN + key,
+                      value=data,
+                      target=target)
+            return
+        digest = blob_digest(data)
+        if not self._has_blob_refs(digest):
+            self._put(key=BLOB_CAS_DOMAIN + digest, value=data, target=target)
+        self._put(key=BLOB_REFS_DOMAIN + digest + key, value=b'', target=target)
         self._put(key=BLOB_DOMAIN + key,
-                  value=bytes(value),
+                  value=BLOB_REF_MARKER + digest,
                   target=target)
 
+    def _has_blob_refs(self, digest: bytes) -> bool:
+        # The content is stored as long as there are references to it, so
+        # checking the (small) reference records avoids reading the content.
+        prefix = BLOB_REFS_DOMAIN + digest
+        it = self.db.iterkeys()
+        it.seek(prefix)
+        try:
+            return next(it).startswith(prefix)
+        except StopIteration:
+            return False
+
+    def collect_blob_garbage(self) -> int:
+        """Removes the content-addressed BLOBs which are no more referenced.
+
+        Deleting or overwriting a BLOB record leaves its reference record
+        behind, so the references are validated against the `BLOB_DOMAIN`
+        records here.
+
+        Returns:
+            The number of removed BLOBs.
+        """
+        refs_by_digest = {}
+        it = self.db.iterkeys()
+        it.seek(BLOB_REFS_DOMAIN)
+        for ref_key in it:
+            if not ref_key.startswith(BLOB_REFS_DOMAIN):
+                break
+            ref = ref_key[len(BLOB_REFS_DOMAIN):]
+            refs_by_digest.setdefault(ref[:BLOB_DIGEST_SIZE], []).append(ref[BLOB_DIGEST_SIZE:])
+
+        removed = 0
+        batch = self.batch()
+        for digest, keys in refs_by_digest.items():
+            values = self.db.multi_get([BLOB_DOMAIN + key for key in keys])
+            alive = False
+            for key in keys:
+                value = values.get(BLOB_DOMAIN + key)
+                if value is not None and parse_blob_ref(value) == digest:
+                    alive = True
+                else:
+                    self._delete(BLOB_REFS_DOMAIN + digest + key, target=batch)
+            if not alive:
+                self._delete(BLOB_CAS_DOMAIN + digest, target=batch)
+                removed += 1
+        self.commit(batch)
+        return removed
+
     def _delete(
         self,
         key: ContainerKey,
@@ -542,8 +683,14 @@ class RocksContainer(Container):
         The operations :obj:`RocksContainer.set`, :obj:`RocksContainer.delete`,
         :obj:`RocksContainer.delete_range` are supported.
 
+        If the writes are buffered (see :obj:`RocksContainer.buffer_writes`),
+        the write buffer is returned instead.
+
         See more at :obj:`RocksContainer.commit`
         """
+        write_buffer = self._write_buffer
+        if write_buffer is not None:
+            return write_buffer
         return aimrocks.WriteBatch()
 
     def commit(
@@ -553,9 +700,44 @@ class RocksContainer(Container):
         """Execute the accumulated write operations in the given `batch`.
 
         The `RocksContainer` features atomic writes for batches.
+        Committing the write buffer is deferred until it's flushed.
         """
+        if batch is self._write_buffer:
+            return
         self.writable_db.write(batch)
 
+    def buffer_writes(self):
+        """Start collecting the writes of the current thread into a single batch.
+
+        The writes are executed atomically by :obj:`RocksContainer.flush_writes`
+        or when the container is closed. Reads do not see the pending writes.
+        The writes of the other threads are executed immediately.
+        """
+        with self._write_buffer_lock:
+            if self._resources._write_buffer is not None:
+                # already buffered, possibly by another thread
+                return
+            self._write_buffer_owner = threading.get_ident()
+            self._resources._write_buffer = aimrocks.WriteBatch()
+
+    @property
+    def writes_buffered(self) -> bool:
+        """Whether the writes of any thread are being collected into a batch."""
+        return self._resources._write_buffer is not None
+
+    def flush_writes(self):
+        """Execute the writes collected since :obj:`RocksContainer.buffer_writes`
+        and stop buffering.
+        """
+        write_buffer = self._write_buffer
+        if write_buffer is None:
+            return
+        with self._write_buffer_lock:
+            self._resources._write_buffer = None
+            self._write_buffer_owner = None
+        if write_buffer.count():
+            self.writable_db.write(write_buffer)
+
     def next_key(
         self,
         prefix: ContainerKey = b''
@@ -592,7 +774,10 @@ class RocksContainer(Container):
         it = self.db.iteritems()
         it.seek(prefix + b'\x00')
 
-        key, value = next(it)
+        try:
+            key, value = next(it)
+        except StopIteration:
+            raise KeyError
 
         if not key.startswith(prefix):
             raise KeyError
@@ -632,7 +817,11 @@ class RocksContainer(Container):
         it = self.db.iteritems()
         it.seek_for_prev(prefix + b'\xff')
 
-        key, value = it.get()
+        try:
+            key, value = it.get()
+        except ValueError:
+            # the iterator is invalid, i.e. there is no key before `prefix`
+            raise KeyError
 
         if value == BLOB_SENTINEL:
             value = self._get_blob(key)
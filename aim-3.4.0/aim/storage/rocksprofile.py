@@ -0,0 +1,128 @@
+"""RocksDB options shared by the containers of the repo.
+
+All the containers opened in a process share a single LRU block cache, so
+that the total memory spent on cached data blocks is bounded by a single
+budget regardless of the number of runs. The budget can
+be set via `__AIM_ROCKS_BLOCK_CACHE_SIZE__` environment variable (in bytes).
+
+Table and compression options are picked per container profile, which is
+the name of the repo storage the container belongs to (`meta` or `seqs`),
+or `index` for the index container of the runs metadata.
+
+The number of run containers kept open by a union container is limited by
+`__AIM_ROCKS_MAX_OPEN_DBS__` environment variable.
+
+Content-addressed storage of BLOBs is enabled by setting
+`__AIM_ROCKS_BLOB_DEDUP__` environment variable to `1`. The BLOBs are
+deduplicated within a container, i.e. within a run, and across the runs
+only once they are packed. The content no longer referenced is removed
+when the run is finalized and when the packs are consolidated.
+"""
+import os
+import aimrocks
+
+from typing import Dict, Optional
+
+AIM_ROCKS_BLOCK_CACHE_SIZE = '__AIM_ROCKS_BLOCK_CACHE_SIZE__'
+DEFAULT_BLOCK_CACHE_SIZE = 256 * 1024 * 1024  # 256MB
+
+AIM_ROCKS_MAX_OPEN_DBS = '__AIM_ROCKS_MAX_OPEN_DBS__'
+DEFAULT_MAX_OPEN_DBS = 1000
+
+AIM_ROCKS_BLOB_DEDUP = '__AIM_ROCKS_BLOB_DEDUP__'
+
+# `meta` containers hold run params and sequence summaries which are read
+# with point lookups and short scans, so smaller blocks are preferred.
+# `seqs` containers hold the sequence records, read mostly with range scans
+# over a whole sequence or a batch of blocks.
+# Both use bloom filters to skip the SST files that do not contain the key,
+# which is the common case for point lookups over a union of run containers.
+TABLE_OPTIONS: Dict[str, dict] = {
+    'meta': dict(
+        block_size=4 * 1024,  # 4KB
+        bloom_bits_per_key=10,
+    ),
+    'seqs': dict(
+        block_size=16 * 1024,  # 16KB
+        bloom_bits_per_key=10,
+    ),
+}
+# the index holds the same kind of records as the `meta` containers
+TABLE_OPTIONS['index'] = TABLE_OPTIONS['meta']
+
+# Run params and summaries are small, highly repetitive records (same keys,
+# similar values across runs), which benefit from zstd with a dictionary
+# trained per SST file. Sequence records are read in bulk and compressed with
+# lz4, which is cheaper to decompress. The index is written once per run
+# and read by every query, so a higher zstd level pays off there.
+# RocksDB stores a block uncompressed if compression saves less than 1/8
+# of its size, so BLOBs holding already compressed media (PNG, JPEG, MP3)
+# are kept as is without paying the decompression on reads.
+COMPRESSION_OPTIONS: Dict[str, dict] = {
+    'meta': dict(
+        compression='zstd_compression',
+        compression_opts=dict(level=3, max_dict_bytes=16 * 1024, zstd_max_train_bytes=100 * 16 * 1024),
+    ),
+    'index': dict(
+        compression='zstd_compression',
+        compression_opts=dict(level=6, max_dict_bytes=16 * 1024, zstd_max_train_bytes=100 * 16 * 1024),
+    ),
+    'seqs': dict(
+        compression='lz4_compression',
+    ),
+}
+
+_block_cache: Optional[aimrocks.LRUCache] = None
+_table_factories: Dict[str, aimrocks.BlockBasedTableFactory] = {}
+
+
+def get_block_cache_size() -> int:
+    return int(os.environ.get(AIM_ROCKS_BLOCK_CACHE_SIZE, DEFAULT_BLOCK_CACHE_SIZE))
+
+
+def get_max_open_dbs() -> int:
+    return int(os.environ.get(AIM_ROCKS_MAX_OPEN_DBS, DEFAULT_MAX_OPEN_DBS))
+
+
+def is_blob_dedup_enabled() -> bool:
+    return os.environ.get(AIM_ROCKS_BLOB_DEDUP, '0') == '1'
+
+
+def get_block_cache() -> aimrocks.LRUCache:
+    """Returns the block cache shared by all the containers in the process."""
+    global _block_cache
+    if _block_cache is None:
+        _block_cache = aimrocks.LRUCache(get_block_cache_size())
+    return _block_cache
+
+
+def get_table_factory(profile: str) -> aimrocks.BlockBasedTableFactory:
+    factory = _table_factories.get(profile)
+    if factory is None:
+        options = TABLE_OPTIONS[profile]
+        factory = aimrocks.BlockBasedTableFactory(
+            block_cache=get_block_cache(),
+            block_size=options['block_size'],
+            filter_policy=aimrocks.BloomFilterPolicy(options['bloom_bits_per_key']),
+            whole_key_filtering=True,
+        )
+        _table_factories[profile] = factory
+    return factory
+
+
+def get_compression_options(profile: str) -> dict:
+    options = COMPRESSION_OPTIONS[profile]
+    result = dict(compression=getattr(aimrocks.CompressionType, options['compression']))
+    if 'compression_opts' in options:
+        result['compression_opts'] = dict(options['compression_opts'])
+    return result
+
+
+def get_db_options(profile: Optional[str]) -> dict:
+    """Returns the profile-specific options to be passed to `aimrocks.Options`.
+
+    Unknown profiles get the RocksDB defaults.
+    """
+    if profile not in TABLE_OPTIONS:
+        return {}
+    return dict(table_factory=get_table_factory(profile), **get_compression_options(profile))
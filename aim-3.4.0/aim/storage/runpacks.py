@@ -0,0 +1,252 @@
+"""Consolidation of finalized run containers into sharded packs.
+
+Each run keeps its sequences in a separate RocksDB instance at
+`seqs/chunks/<run_hash>`. Once the run is finalized its records can be moved
+into one of the few large pack containers at `seqs/packs/chunks/<shard>`,
+which reduces the number of files and opened DBs in the repo and keeps the
+data of different runs close to each other in SST files.
+
+The keys are copied as is, so the records of a run keep the
+`seqs/chunks/<run_hash>` prefix inside the pack and the pack container can be
+used in place of the run container. The shard of a run is derived from its
+hash, thus no additional index is needed to find the packed run.
+
+A run is served from its own container as long as it exists, so the packs
+are consulted only for the runs that were consolidated.
+"""
+import logging
+import os
+import shutil
+import zlib
+from pathlib import Path
+
+import aimrocks
+from filelock import FileLock, Timeout
+
+from typing import Dict, Iterable, List, Optional
+
+from aim.storage.encoding import encode_path
+from aim.storage.rockscontainer import (
+    RocksContainer,
+    prepare_lock_path,
+    parse_blob_ref,
+    BLOB_DOMAIN,
+    BLOB_CAS_DOMAIN,
+    BLOB_REFS_DOMAIN,
+)
+
+logger = logging.getLogger(__name__)
+
+PACKS_DIR = 'packs'
+# The number of shards must not change for an existing repo,
+# as the shard of the packed run is derived from its hash.
+PACKS_NUM = 16
+
+# Flush the pending writes to the pack once the batch grows above this size
+MAX_BATCH_SIZE = 64 * 1024 * 1024  # 64MB
+
+
+def get_pack_name(run_hash: str) -> str:
+    return f'{zlib.crc32(run_hash.encode()) % PACKS_NUM:02d}'
+
+
+def get_pack_path(name: str, run_hash: str) -> str:
+    """Returns the path of the pack for the run, relative to the repo."""
+    return os.path.join(name, PACKS_DIR, 'chunks', get_pack_name(run_hash))
+
+
+def get_run_container_path(repo_path: str, name: str, run_hash: str) -> str:
+    """Returns the path of the container holding the run records, relative to the repo.
+
+    The run container is preferred if it exists, otherwise the run pack is used.
+    """
+    path = os.path.join(name, 'chunks', run_hash)
+    if os.path.exists(os.path.join(repo_path, path)):
+        return path
+    pack_path = get_pack_path(name, run_hash)
+    if os.path.exists(os.path.join(repo_path, pack_path)):
+        return pack_path
+    return path
+
+
+def _get_run_range(name: str, run_hash: str):
+    prefix = encode_path((name, 'chunks', run_hash))
+    return prefix, prefix + b'\xff'
+
+
+def _copy_range(src: aimrocks.DB, dst: RocksContainer, begin: bytes, end: bytes):
+    # BLOBs are stored under a separate domain, so both ranges are copied
+    copied_digests = set()
+    for domain in (b'', BLOB_DOMAIN):
+        batch = aimrocks.WriteBatch()
+        batch_size = 0
+        it = src.iteritems()
+        it.seek(domain + begin)
+        for key, value in it:
+            if key >= domain + end:
+                break
+            batch.put(key, value)
+            batch_size += len(key) + len(value)
+            digest = parse_blob_ref(value) if domain else None
+            if digest is not None:
+                # content-addressed BLOBs are shared by the runs of the pack
+                batch.put(BLOB_REFS_DOMAIN + digest + key[len(domain):], b'')
+                if digest not in copied_digests:
+                    content = src.get(BLOB_CAS_DOMAIN + digest)
+                    batch.put(BLOB_CAS_DOMAIN + digest, content)
+                    batch_size += len(content)
+                    copied_digests.add(digest)
+            if batch_size >= MAX_BATCH_SIZE:
+                dst.commit(batch)
+                batch = aimrocks.WriteBatch()
+                batch_size = 0
+        dst.commit(batch)
+
+
+def _release_progress(container: RocksContainer):
+    # packs are never left in progress state once the writer is done
+    if container._progress_path is not None:
+        if container._progress_path.exists():
+            container._progress_path.unlink()
+        container._progress_path = None
+
+
+def consolidate_runs(
+    repo_path: str,
+    run_hashes: Optional[Iterable[str]] = None,
+    *,
+    name: str = 'seqs',
+    compaction: bool = True,
+    timeout: int = 10,
+) -> Dict[str, List[str]]:
+    """Moves the records of the finalized runs into the packs.
+
+    Runs in progress and runs locked by a writer are skipped. A run container
+    is removed only after its records are durably written to the pack, so the
+    process can be safely interrupted and restarted.
+
+    Args:
+        repo_path (:obj:`str`): Path to the `.aim` directory of the repo.
+        run_hashes (:obj:`Iterable[str]`, optional): Runs to consolidate. All the finalized runs by default.
+        name (:obj:`str`): Name of the repo storage. `seqs` by default.
+        compaction (:obj:`bool`): Compact the packs after the runs are moved. True by default.
+        timeout (:obj:`int`): Timeout for acquiring the pack lock, in seconds.
+
+    Returns:
+        Mapping of `consolidated` and `skipped` run hashes.
+    """
+    chunks_dir = os.path.join(repo_path, name, 'chunks')
+    if run_hashes is None:
+        run_hashes = os.listdir(chunks_dir) if os.path.exists(chunks_dir) else []
+    # The `progress` entry of the run sequences is kept until the run container
+    # is closed, so the run finalization state is taken from its meta container.
+    # The runs still open by a writer are skipped, as they hold the run lock.
+    progress_dir = os.path.join(repo_path, 'meta', 'progress')
+    runs_in_progress = set(os.listdir(progress_dir)) if os.path.exists(progress_dir) else set()
+
+    runs_by_pack: Dict[str, List[str]] = {}
+    result = {'consolidated': [], 'skipped': []}
+    for run_hash in run_hashes:
+        if run_hash in runs_in_progress or not os.path.exists(os.path.join(chunks_dir, run_hash)):
+            result['skipped'].append(run_hash)
+            continue
+        runs_by_pack.setdefault(get_pack_name(run_hash), []).append(run_hash)
+
+    for pack_name, pack_runs in runs_by_pack.items():
+        pack = RocksContainer(os.path.join(repo_path, name, PACKS_DIR, 'chunks', pack_name),
+                              read_only=False, profile=name, timeout=timeout)
+        try:
+            for run_hash in pack_runs:
+                if _pack_run(pack, Path(repo_path), name, run_hash):
+                    result['consolidated'].append(run_hash)
+                else:
+                    result['skipped'].append(run_hash)
+            # drop the BLOBs of the runs deleted or moved out of the pack
+            pack.collect_blob_garbage()
+            if compaction:
+                pack.writable_db.compact_range()
+        finally:
+            _release_progress(pack)
+            pack.close()
+
+    return result
+
+
+def _pack_run(pack: RocksContainer, repo_path: Path, name: str, run_hash: str) -> bool:
+    run_path = repo_path / name / 'chunks' / run_hash
+    lock = FileLock(str(prepare_lock_path(run_path)), timeout=0)
+    try:
+        lock.acquire()
+    except Timeout:
+        logger.debug(f'Skipping Run {run_hash}. The run is locked.')
+        return False
+    try:
+        # The run was resumed after the consolidation started
+        if (repo_path / 'meta' / 'progress' / run_hash).exists():
+            return False
+        # Opening in write mode recovers the WAL of the run
+        run_db = aimrocks.DB(str(run_path), aimrocks.Options(**pack._db_opts), read_only=False)
+        begin, end = _get_run_range(name, run_hash)
+        # drop the leftovers of previous attempts
+        pack.delete_range(begin, end)
+        _copy_range(run_db, pack, begin, end)
+        del run_db
+        pack.writable_db.flush()
+        pack.writable_db.flush_wal()
+        shutil.rmtree(run_path)
+        # the leftover of the run writer
+        progress_path = repo_path / name / 'progress' / run_hash
+        if progress_path.exists():
+            progress_path.unlink()
+    finally:
+        lock.release()
+    return True
+
+
+def unpack_run(repo_path: str, run_hash: str, *, name: str = 'seqs', timeout: int = 10) -> bool:
+    """Moves the records of the run back from its pack into the run container.
+
+    Needed before the run is resumed in write mode, as the writes go to the
+    run container which shadows the pack.
+
+    Returns:
+        :obj:`True` if the run was found in the pack.
+    """
+    run_path = Path(repo_path) / name / 'chunks' / run_hash
+    pack_path = Path(repo_path) / get_pack_path(name, run_hash)
+    if run_path.exists() or not pack_path.exists():
+        return False
+
+    pack = RocksContainer(str(pack_path), read_only=False, profile=name, timeout=timeout)
+    try:
+        begin, end = _get_run_range(name, run_hash)
+        if next(pack.keys(begin), None) is None:
+            return False
+        # Copy into a temporary location first, so that the partially
+        # copied run never shadows the pack
+        tmp_path = run_path.with_name(f'{run_hash}.unpack')
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        run = RocksContainer(str(tmp_path), read_only=False, profile=name)
+        _copy_range(pack.writable_db, run, begin, end)
+        _release_progress(run)
+        run.close()
+        os.rename(tmp_path, run_path)
+        pack.delete_range(begin, end)
+    finally:
+        _release_progress(pack)
+        pack.close()
+    return True
+
+
+def delete_packed_run(repo_path: str, run_hash: str, *, name: str = 'seqs', timeout: int = 10):
+    """Removes the records of the run from its pack, if any."""
+    pack_path = Path(repo_path) / get_pack_path(name, run_hash)
+    if not pack_path.exists():
+        return
+    pack = RocksContainer(str(pack_path), read_only=False, profile=name, timeout=timeout)
+    try:
+        pack.delete_range(*_get_run_range(name, run_hash))
+        pack.collect_blob_garbage()
+    finally:
+        _release_progress(pack)
+        pack.close()
@@ -0,0 +1,147 @@
+"""Summaries of the tracked sequences.
+
+The summaries of the run sequences are kept in the `sequence_summaries`
+subtree of the run meta tree, one key per sequence:
+`{
+    (ctx_idx, name): b'...',
+    ...
+}`
+The value is a fixed-size record of the sequence stats followed by the
+sequence dtype. Being a part of the run meta tree, the summaries are read
+from the meta index (or from the run meta container, if the run is in
+progress), so the queries on them do not touch the `seqs` containers.
+"""
+import math
+import struct
+import numpy as np
+
+from typing import Any, NamedTuple, Optional, TYPE_CHECKING
+
+from aim.storage.blockarrayview import BlockArrayView
+
+if TYPE_CHECKING:
+    from aim.storage.treeview import TreeView
+
+
+# count, value_count, first_step, last_step, last, min, max, sum
+_RECORD = struct.Struct('<qqqqdddd')
+
+# The dtypes of the sequences having numeric values (see `Metric.allowed_dtypes()`)
+_NUMERIC_DTYPES = ('float', 'float64', 'int')
+
+
+class SequenceSummary(NamedTuple):
+    """Summary of a sequence.
+
+    `last`, `min`, `max` and `mean` are the float64 stats of the numeric
+    sequences, NaN values excluded; None for the rest of the sequences.
+    """
+    dtype: str
+    count: int
+    first_step: int
+    last_step: int
+    last: Optional[float]
+    min: Optional[float]
+    max: Optional[float]
+    mean: Optional[float]
+
+
+class SequenceStats:
+    """Running stats of a sequence, updated with each tracked record.
+
+    Args:
+        dtype (:obj:`str`): the sequence dtype.
+    """
+    __slots__ = ('dtype', 'count', 'value_count', 'first_step', 'last_step', 'last', 'min', 'max', 'sum')
+
+    def __init__(self, dtype: str):
+        self.dtype = dtype
+        self.count = 0
+        self.value_count = 0
+        self.first_step = 0
+        self.last_step = 0
+        self.last = math.nan
+        self.min = math.inf
+        self.max = -math.inf
+        self.sum = 0.0
+
+    def add(self, step: int, value: Any):
+        if self.count == 0:
+            self.first_step = step
+        self.count += 1
+        self.last_step = step
+        if isinstance(value, (int, float)):
+            value = float(value)
+            self.last = value
+            if not math.isnan(value):
+                self.value_count += 1
+                self.sum += value
+                if value < self.min:
+                    self.min = value
+                if value > self.max:
+                    self.max = value
+
+    def add_records(self, steps: np.ndarray, values: Optional[np.ndarray] = None):
+        """Add the records sorted by step; `values` are None for the non-numeric sequences."""
+        if not len(steps):
+            return
+        if self.count == 0:
+            self.first_step = int(steps[0])
+        self.count += len(steps)
+        self.last_step = int(steps[-1])
+        if values is None:
+            return
+        values = values.astype(np.float64)
+        self.last = float(values[-1])
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.value_count += len(values)
+            self.sum += float(values.sum())
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+
+    def summary(self) -> SequenceSummary:
+        is_numeric = self.dtype in _NUMERIC_DTYPES
+        has_values = is_numeric and self.value_count > 0
+        return SequenceSummary(
+            dtype=self.dtype,
+            count=self.count,
+            first_step=self.first_step,
+            last_step=self.last_step,
+            last=self.last if is_numeric else None,
+            min=self.min if has_values else None,
+            max=self.max if has_values else None,
+            mean=self.sum / self.value_count if has_values else None,
+        )
+
+    def encode(self) -> bytes:
+        record = _RECORD.pack(self.count, self.value_count, self.first_step, self.last_step,
+                              self.last, self.min, self.max, self.sum)
+        return record + self.dtype.encode('utf-8')
+
+    @classmethod
+    def decode(cls, buffer: bytes) -> 'SequenceStats':
+        stats = cls(buffer[_RECORD.size:].decode('utf-8'))
+        (stats.count, stats.value_count, stats.first_step, stats.last_step,
+         stats.last, stats.min, stats.max, stats.sum) = _RECORD.unpack_from(buffer)
+        return stats
+
+
+def summarize_sequence(tree: 'TreeView', dtype: str) -> SequenceStats:
+    """Compute the stats of the records stored in the sequence `tree`.
+
+    Used for the sequences tracked before the summaries were introduced, or
+    the ones of the interrupted runs. The records are added by step, so the
+    last record is the one with the highest step.
+    """
+    stats = SequenceStats(dtype)
+    blocks_tree = tree.subtree('blocks')
+    if BlockArrayView.exists(blocks_tree):
+        for _, steps, values, _, _ in BlockArrayView.iter_raw_blocks(blocks_tree):
+            stats.add_records(steps, values)
+    elif dtype in _NUMERIC_DTYPES:
+        steps, values = tree.array('val').sparse_numpy()
+        stats.add_records(np.asarray(steps), np.asarray(values))
+    else:
+        stats.add_records(np.asarray(tree.array('val').indices_list()))
+    return stats
@@ -1,5 +1,5 @@
 from abc import abstractmethod, ABC
-from typing import Generic, TypeVar, Collection, Optional, List
+from typing import Any, Generic, Iterable, TypeVar, Collection, Optional, List, Set, Tuple
 
 T = TypeVar('T')
 
@@ -193,6 +193,18 @@ class ObjectFactory:
     def find_runs(self, ids: List[str]) -> List[Run]:
         ...
 
+    @abstractmethod
+    def run_hashes(self) -> Set[str]:
+        ...
+
+    @abstractmethod
+    def filter_run_hashes(self, filters: Iterable[Tuple[str, str, Any]]) -> Optional[Set[str]]:
+        """Hashes of the runs satisfying all the `(field, op, value)` filters.
+
+        The filters which are not supported are skipped; returns None if none of them is supported.
+        """
+        ...
+
     @abstractmethod
     def create_run(self, runhash: str) -> Run:
         ...
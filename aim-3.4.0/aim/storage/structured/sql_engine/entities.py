@@ -1,6 +1,9 @@
+import datetime
+import itertools
 import pytz
 
-from typing import Collection, Union, List, Optional
+from typing import Any, Collection, Iterable, Union, List, Optional, Set, Tuple
+from sqlalchemy import or_
 from sqlalchemy.orm import joinedload
 
 from aim.storage.types import SafeNone
@@ -25,6 +28,92 @@ def timestamp_or_none(dt):
     return dt.timestamp()
 
 
+# The run columns the `(field, op, value)` run filters are applied to, along with the type of the filter values
+_RUN_FILTER_COLUMNS = {
+    'name': (RunModel.name, str),
+    'description': (RunModel.description, str),
+    'hash': (RunModel.hash, str),
+    'archived': (RunModel.is_archived, bool),
+    'experiment': (ExperimentModel.name, str),
+}
+# The creation time is converted to the column's datetime, so the bounds are widened by the conversion error
+_TIMESTAMP_MARGIN = 0.001
+
+
+def _utc_datetime_or_none(timestamp: float) -> Optional[datetime.datetime]:
+    try:
+        return datetime.datetime.utcfromtimestamp(timestamp)
+    except (OverflowError, ValueError, OSError):
+        return None
+
+
+def _creation_time_filter(op: str, value: Any):
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return None
+    lower = _utc_datetime_or_none(value - _TIMESTAMP_MARGIN)
+    upper = _utc_datetime_or_none(value + _TIMESTAMP_MARGIN)
+    if lower is None or upper is None:
+        return None
+    if op == '==':
+        return RunModel.created_at.between(lower, upper)
+    if op in ('>', '>='):
+        return RunModel.created_at >= lower
+    if op in ('<', '<='):
+        return RunModel.created_at <= upper
+    return None
+
+
+def _tags_filter(op: str, value: Any):
+    if not isinstance(value, str):
+        return None
+    # same as `ModelMappedRun.tags`, the archived tags are skipped
+    has_tag = RunModel.tags.any((TagModel.name == value) & TagModel.is_archived.isnot(True))
+    if op == 'contains':
+        return has_tag
+    if op == 'not contains':
+        return ~has_tag
+    return None
+
+
+def run_filter_clause(field: str, op: str, value: Any):
+    """SQL clause for the `run.<field> <op> value` condition, None if the condition is not supported.
+
+    The NULL values are matched the same way Python compares None, e.g. `run.experiment != 'baseline'`
+    holds for the runs without experiment.
+    """
+    if field == 'creation_time':
+        return _creation_time_filter(op, value)
+    if field == 'tags':
+        return _tags_filter(op, value)
+    if field not in _RUN_FILTER_COLUMNS:
+        return None
+    column, value_type = _RUN_FILTER_COLUMNS[field]
+    if op in ('in', 'not in'):
+        if not isinstance(value, (list, tuple, set, frozenset)) or \
+                not all(isinstance(item, value_type) for item in value):
+            return None
+        if op == 'in':
+            return column.in_(list(value))
+        return or_(column.notin_(list(value)), column.is_(None))
+    if not isinstance(value, value_type):
+        return None
+    if op == '==':
+        return column == value
+    if op == '!=':
+        return or_(column != value, column.is_(None))
+    if value_type is bool:
+        return None
+    if op == '<':
+        return column < value
+    if op == '<=':
+        return column <= value
+    if op == '>':
+        return column > value
+    if op == '>=':
+        return column >= value
+    return None
+
+
 class ModelMappedRun(IRun, metaclass=ModelMappedClassMeta):
     __model__ = RunModel
     __mapped_properties__ = [
@@ -116,6 +205,32 @@ class ModelMappedRun(IRun, metaclass=ModelMappedClassMeta):
         ]).filter(RunModel.name.like(term))
         return ModelMappedRunCollection(session, query=q)
 
+    @classmethod
+    def all_hashes(cls, **kwargs) -> Set[str]:
+        session = kwargs.get('session')
+        if not session:
+            return set()
+        return {run_hash for run_hash, in session.query(RunModel.hash)}
+
+    @classmethod
+    def filter_hashes(cls, filters: Iterable[Tuple[str, str, Any]], **kwargs) -> Optional[Set[str]]:
+        session = kwargs.get('session')
+        clauses = [clause for clause in (run_filter_clause(*run_filter) for run_filter in filters)
+                   if clause is not None]
+        if not session or not clauses:
+            return None
+        # The properties set on the mapped entities are pending until the session
+        # is flushed, so the query sees their committed values only. The runs
+        # having pending changes are kept, and the changes of experiments and
+        # tags, which may affect any run, disable the filtering.
+        pending_runs = set()
+        for obj in itertools.chain(session.new, session.dirty, session.deleted):
+            if not isinstance(obj, RunModel):
+                return None
+            pending_runs.add(obj.hash)
+        q = session.query(RunModel.hash).outerjoin(RunModel.experiment).filter(*clauses)
+        return {run_hash for run_hash, in q} | pending_runs
+
     @property
     def experiment_obj(self) -> Optional[IExperiment]:
         if self._model and self._model.experiment:
@@ -2,7 +2,7 @@ from aim.storage.structured.entities import \
     ObjectFactory, Run, Tag, Experiment,\
     RunCollection, ExperimentCollection, TagCollection
 from aim.storage.structured.sql_engine.entities import ModelMappedRun, ModelMappedExperiment, ModelMappedTag
-from typing import List
+from typing import Any, Iterable, List, Optional, Set, Tuple
 
 
 class ModelMappedFactory(ObjectFactory):
@@ -34,6 +34,12 @@ class ModelMappedFactory(ObjectFactory):
     def find_runs(self, ids: List[str]) -> List[Run]:
         return ModelMappedRun.find_many(ids, session=self._session or self.get_session())
 
+    def run_hashes(self) -> Set[str]:
+        return ModelMappedRun.all_hashes(session=self._session or self.get_session())
+
+    def filter_run_hashes(self, filters: Iterable[Tuple[str, str, Any]]) -> Optional[Set[str]]:
+        return ModelMappedRun.filter_hashes(filters, session=self._session or self.get_session())
+
     def create_run(self, runhash: str) -> Run:
         run = ModelMappedRun.from_hash(runhash, session=self._session or self.get_session())
         run.experiment = 'default'
@@ -1,7 +1,21 @@
-from typing import Any, Iterator, Tuple, Union
+from cpython.bytes cimport PyBytes_AS_STRING, PyBytes_FromStringAndSize
+from cpython.unicode cimport PyUnicode_DecodeUTF8
+from libc.string cimport memcpy
+from libcpp.vector cimport vector
+
+import numpy as np
+
+from typing import Any, Iterator, Optional, Tuple, Union
 
 from aim.storage import encoding
-from aim.storage.encoding.encoding_native cimport decode_path
+from aim.storage.encoding.encoding_native cimport (
+    decode_path,
+    decode_int64,
+    decode_int64_big_endian,
+    decode_double,
+    int64,
+    PATH_SENTINEL_CODE,
+)
 
 from aim.storage.types import AimObject, AimObjectPath
 
@@ -13,6 +27,33 @@ from aim.storage.treeview import TreeView
 from aim.storage.inmemorytreeview import InMemoryTreeView
 
 
+cdef enum:
+    # Type ids of the encoded values. See `aim.storage.encoding.encoding`
+    _NONE = 0
+    _BOOL = 1
+    _INT = 2
+    _FLOAT = 3
+    _STRING = 4
+    _BYTES = 5
+    _ARRAY = 6
+    _OBJECT = 7
+    _CUSTOM_OBJECT = 15
+
+
+cdef enum:
+    # Kinds of the nodes of the tree being folded
+    _NODE_DICT = 0
+    _NODE_LIST = 1
+    _NODE_CUSTOM_OBJECT = 2
+    _NODE_VALUE = 3
+
+
+cdef inline bint _is_primitive(obj):
+    cdef type obj_type = type(obj)
+    return (obj is None or obj_type is bool or obj_type is int or obj_type is float
+            or obj_type is str or obj_type is bytes)
+
+
 def unfold_tree(
     obj: AimObject,
     *,
@@ -27,7 +68,7 @@ def unfold_tree(
     if depth is not None:
         depth -= 1
 
-    if obj is None:
+    if _is_primitive(obj):
         yield path, obj
     elif isinstance(obj, (bool, int, float, str, bytes)):
         yield path, obj
@@ -40,13 +81,23 @@ def unfold_tree(
             yield path, ArrayFlag
             # Ellipsis (...) is set when array elements are expected
             for idx, val in enumerate(obj):
-                yield from unfold_tree(val, path=path + (idx,), unfold_array=unfold_array, depth=depth, strict=strict)
+                # primitive elements are the leaves at any depth,
+                # no need to recurse into them
+                if _is_primitive(val):
+                    yield path + (idx,), val
+                else:
+                    yield from unfold_tree(val, path=path + (idx,), unfold_array=unfold_array,
+                                           depth=depth, strict=strict)
     elif isinstance(obj, dict):
         # TODO: set ObjectFlag for all dicts?
-        if obj == {}:
+        if not obj:
             yield path, ObjectFlag
         for key, val in obj.items():
-            yield from unfold_tree(val, path=path + (key,), unfold_array=unfold_array, depth=depth, strict=strict)
+            if _is_primitive(val):
+                yield path + (key,), val
+            else:
+                yield from unfold_tree(val, path=path + (key,), unfold_array=unfold_array,
+                                       depth=depth, strict=strict)
     elif isinstance(obj, CustomObjectBase):
         aim_name, aim_obj = obj._aim_encode()
         yield path, CustomObjectFlagType(aim_name)
@@ -67,14 +118,16 @@ cpdef val_to_node(
 ):
     if not strict:
         node = dict()
-        if val == ArrayFlag:
+        if val is ArrayFlag:
             node['__example_type__'] = str(list)
-        elif val != ObjectFlag:
+        elif val is not ObjectFlag:
             node['__example_type__'] = str(type(val))
         return node
-    if val == ObjectFlag:
+    if _is_primitive(val):
+        return val
+    if val is ObjectFlag:
         return dict()
-    elif val == ArrayFlag:
+    elif val is ArrayFlag:
         return []
     elif isinstance(val, CustomObjectFlagType):
         return CustomObject._aim_decode(val.aim_name, InMemoryTreeView(container={}, constructed=False))
@@ -82,6 +135,49 @@ cpdef val_to_node(
         return val
 
 
+cdef inline int _node_kind(node) except -1:
+    cdef type node_type = type(node)
+    if node_type is dict:
+        return _NODE_DICT
+    if node_type is list:
+        return _NODE_LIST
+    if isinstance(node, CustomObject):
+        return _NODE_CUSTOM_OBJECT
+    if isinstance(node, dict):
+        return _NODE_DICT
+    if isinstance(node, list):
+        return _NODE_LIST
+    return _NODE_VALUE
+
+
+cdef inline int _attach(parent, int kind, key, node) except -1:
+    cdef Py_ssize_t idx
+    if kind == _NODE_DICT:
+        parent[key] = node
+    elif kind == _NODE_LIST:
+        assert isinstance(key, int)
+        idx = key
+        if idx < 0:
+            raise NotImplementedError
+        elif idx < len(parent):
+            parent[idx] = node
+        else:
+            while len(parent) != idx:
+                parent.append(None)
+            parent.append(node)
+    elif kind == _NODE_CUSTOM_OBJECT:
+        parent.storage[key] = node
+    else:
+        raise ValueError
+    return 0
+
+
+cdef inline _complete_node(node):
+    if isinstance(node, CustomObject):
+        node.storage._constructed = True
+    return node
+
+
 def fold_tree(
     paths_vals: Iterator[Tuple[AimObjectPath, Any]],
     strict: bool = True
@@ -96,9 +192,14 @@ def iter_fold_tree(
     level: int = 0,
     strict: bool = True
 ):
-    cdef int idx
-    stack = []
-    path = []
+    cdef Py_ssize_t idx
+    cdef Py_ssize_t num_keys
+    cdef Py_ssize_t path_len
+    cdef Py_ssize_t lvl = level
+    cdef list stack = []
+    cdef list path = []
+    # the kinds of the `stack` nodes, to avoid type checks per record
+    cdef vector[int] kinds
 
     try:
         keys, val = next(paths_vals)
@@ -106,6 +207,7 @@ def iter_fold_tree(
             raise StopIteration
         node = val_to_node(val)
         stack.append(node)
+        kinds.push_back(_node_kind(node))
     except StopIteration:
         if level > 0:
             return
@@ -113,54 +215,40 @@ def iter_fold_tree(
             raise KeyError
 
     for keys, val in paths_vals:
+        num_keys = len(keys)
+        path_len = len(path)
         idx = 0
-        while idx < len(path):
+        while idx < path_len:
             if keys[idx] != path[idx]:
                 break
             idx += 1
 
         while idx < len(path):
             last_state = stack.pop()
-            if len(stack) == level:
-                if isinstance(last_state, CustomObject):
-                    last_state.storage._constructed = True
-                yield tuple(path), last_state
+            kinds.pop_back()
+            if len(stack) == lvl:
+                yield tuple(path), _complete_node(last_state)
             path.pop()
 
         node = val_to_node(val, strict=strict)
 
-        if len(keys) == len(path):
+        if num_keys == len(path):
             stack.pop()
+            kinds.pop_back()
             path.pop()
 
-        assert len(keys) == len(path) + 1
-        key_to_add = keys[-1]
+        assert num_keys == len(path) + 1
+        key_to_add = keys[num_keys - 1]
         path.append(key_to_add)
         assert stack
 
-        if isinstance(stack[-1], list):
-            assert isinstance(key_to_add, int)
-            if key_to_add < 0:
-                raise NotImplementedError
-            elif key_to_add < len(stack[-1]):
-                stack[-1][key_to_add] = node
-            else:
-                while len(stack[-1]) != key_to_add:
-                    stack[-1].append(None)
-                stack[-1].append(node)
-        elif isinstance(stack[-1], dict):
-            stack[-1][key_to_add] = node
-        elif isinstance(stack[-1], CustomObject):
-            stack[-1].storage[key_to_add] = node
-        else:
-            raise ValueError
+        _attach(stack[len(stack) - 1], kinds.back(), key_to_add, node)
         stack.append(node)
+        kinds.push_back(_node_kind(node))
+
+    if lvl < len(stack):
+        yield tuple(path[:lvl]), _complete_node(stack[lvl])
 
-    if level < len(stack):
-        val = stack[level]
-        if isinstance(val, CustomObject):
-            val.storage._constructed = True
-        yield tuple(path[:level]), val
 
 def encode_paths_vals(
     paths_vals: Iterator[Tuple[AimObjectPath, Any]]
@@ -173,9 +261,9 @@ def encode_paths_vals(
 
 cdef class DecodePathsVals(object):
     cdef paths_vals
-    cdef current_path
-    cdef to_yield
-    cdef int num_yielded
+    cdef list current_path
+    cdef list to_yield
+    cdef Py_ssize_t num_yielded
 
     def __cinit__(self, paths_vals):
         self.paths_vals = paths_vals
@@ -190,7 +278,8 @@ cdef class DecodePathsVals(object):
         return self._next()
 
     cdef _next(self):
-        cdef int idx
+        cdef Py_ssize_t idx
+        cdef list path
         if self.to_yield:
             val = self.to_yield[self.num_yielded]
             self.num_yielded += 1
@@ -225,15 +314,13 @@ cdef class DecodePathsVals(object):
 
         while idx < len(path):
             self.current_path.append(path[idx])
-            if idx < len(path):
-                to_yield = tuple(self.current_path), ObjectFlag
-                self.to_yield.append(to_yield)
+            to_yield = tuple(self.current_path), ObjectFlag
+            self.to_yield.append(to_yield)
             idx += 1
 
         to_yield = tuple(path), val
         self.to_yield.append(to_yield)
 
-
         val = self.to_yield[self.num_yielded]
         self.num_yielded += 1
         if self.num_yielded == len(self.to_yield):
@@ -242,30 +329,449 @@ cdef class DecodePathsVals(object):
         return val
 
 
+cdef _decode_node(val, bint strict):
+    """Decode the encoded value directly into the tree node.
+
+    Same as `val_to_node(encoding.decode(val), strict)`, with no intermediate
+    flag objects for arrays and dicts.
+    """
+    if not strict or type(val) is not bytes or len(<bytes>val) == 0:
+        return val_to_node(encoding.decode(val), strict)
+    cdef bytes buffer = val
+    cdef const unsigned char* buf = buffer
+    cdef unsigned char type_id = buf[0]
+    if type_id == _FLOAT:
+        return decode_double(buf + 1)
+    elif type_id == _INT:
+        return decode_int64(buf + 1)
+    elif type_id == _STRING:
+        return PyUnicode_DecodeUTF8(<const char*>buf + 1, len(buffer) - 1, NULL)
+    elif type_id == _OBJECT:
+        return {}
+    elif type_id == _ARRAY:
+        return []
+    elif type_id == _BOOL:
+        return buf[1] != 0
+    elif type_id == _BYTES:
+        return buffer[1:]
+    elif type_id == _NONE:
+        return None
+    return val_to_node(encoding.decode(val), strict)
+
+
+cdef class FoldEncodedTree(object):
+    """Fold the encoded `(path, value)` records into the tree.
+
+    Equivalent to `iter_fold_tree(DecodePathsVals(paths_vals), level, strict)`
+    but works on the encoded records directly: the path of each record is
+    compared with the previous one byte-wise, and only the keys that differ
+    are decoded. The intermediate dicts are created without emitting
+    `ObjectFlag` records for each level of the path.
+
+    Yields `(path, subtree)` pairs of the subtrees at `level` depth.
+    Raises `KeyError` if there are no records and `level` is 0.
+    """
+    cdef object paths_vals
+    cdef Py_ssize_t level
+    cdef bint strict
+    cdef bint started
+    cdef bint done
+    cdef list stack
+    cdef vector[int] kinds
+    cdef list path
+    # The encoded path of the last record and the offsets past each of its keys
+    cdef bytes encoded_path
+    cdef vector[Py_ssize_t] key_ends
+
+    def __cinit__(self, paths_vals, Py_ssize_t level = 0, bint strict = True):
+        self.paths_vals = paths_vals
+        self.level = level
+        self.strict = strict
+        self.started = False
+        self.done = False
+        self.stack = []
+        self.path = []
+        self.encoded_path = b''
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        cdef tuple result
+        if self.done:
+            raise StopIteration
+        if not self.started:
+            self.started = True
+            if not self._start():
+                self.done = True
+                if self.level > 0:
+                    raise StopIteration
+                raise KeyError
+        while True:
+            try:
+                encoded_path, encoded_val = next(self.paths_vals)
+            except StopIteration:
+                self.done = True
+                if self.level < len(self.stack):
+                    return tuple(self.path[:self.level]), _complete_node(self.stack[self.level])
+                raise
+            result = self._add(encoded_path, encoded_val)
+            if result is not None:
+                return result
+
+    cdef bint _start(self) except *:
+        try:
+            encoded_path, encoded_val = next(self.paths_vals)
+        except StopIteration:
+            return False
+        if len(<bytes>encoded_path) == 0:
+            # The root is the value itself
+            node = val_to_node(encoding.decode(encoded_val))
+            self.stack.append(node)
+            self.kinds.push_back(_node_kind(node))
+            return True
+        # There is no record for the root of non-empty dict
+        self.stack.append({})
+        self.kinds.push_back(_NODE_DICT)
+        self._add(encoded_path, encoded_val)
+        return True
+
+    cdef tuple _add(self, bytes encoded_path, encoded_val):
+        cdef const unsigned char* new_buf = encoded_path
+        cdef const unsigned char* old_buf = self.encoded_path
+        cdef Py_ssize_t new_len = len(encoded_path)
+        cdef Py_ssize_t old_len = len(self.encoded_path)
+        cdef Py_ssize_t common_len = min(new_len, old_len)
+        cdef Py_ssize_t pos = 0
+        cdef Py_ssize_t idx = 0
+        cdef Py_ssize_t cursor
+        cdef Py_ssize_t seg_start
+        cdef tuple result = None
+
+        if encoded_path == self.encoded_path:
+            # duplicate records of the same path are skipped
+            return None
+
+        while pos < common_len and new_buf[pos] == old_buf[pos]:
+            pos += 1
+        # The keys which end before the first different byte are common
+        while idx < <Py_ssize_t>self.key_ends.size() and self.key_ends[idx] <= pos:
+            idx += 1
+
+        while idx < len(self.path):
+            last_state = self.stack.pop()
+            self.kinds.pop_back()
+            if len(self.stack) == self.level:
+                result = tuple(self.path), _complete_node(last_state)
+            self.path.pop()
+        self.key_ends.resize(idx)
+
+        # Decode the rest of the keys
+        cursor = self.key_ends.back() if idx > 0 else 0
+        seg_start = cursor
+        new_keys = []
+        while cursor < new_len:
+            if new_buf[cursor] != PATH_SENTINEL_CODE:
+                cursor += 1
+                continue
+            if seg_start < cursor:
+                new_keys.append(PyUnicode_DecodeUTF8(<const char*>new_buf + seg_start, cursor - seg_start, NULL))
+            elif cursor + 9 >= new_len:
+                # Too short to hold an integer key, i.e. the segment is an empty string key
+                new_keys.append('')
+            else:
+                new_keys.append(decode_int64_big_endian(new_buf + cursor + 1))
+                cursor += 1 + 8
+            cursor += 1
+            seg_start = cursor
+            self.key_ends.push_back(cursor)
+        self.encoded_path = encoded_path
+
+        if not new_keys:
+            # The record overrides the node at the current path
+            if not self.path:
+                raise ValueError('The root record is expected to be the first one')
+            self.stack.pop()
+            self.kinds.pop_back()
+            new_keys.append(self.path.pop())
+
+        for key in new_keys[:-1]:
+            node = {}
+            _attach(self.stack[len(self.stack) - 1], self.kinds.back(), key, node)
+            self.path.append(key)
+            self.stack.append(node)
+            self.kinds.push_back(_NODE_DICT)
+
+        key = new_keys[len(new_keys) - 1]
+        node = _decode_node(encoded_val, self.strict)
+        _attach(self.stack[len(self.stack) - 1], self.kinds.back(), key, node)
+        self.path.append(key)
+        self.stack.append(node)
+        self.kinds.push_back(_node_kind(node))
+        return result
+
+
+cdef extern from "Python.h":
+    const char* PyUnicode_AsUTF8AndSize(object unicode, Py_ssize_t* size) except NULL
+
+
+# Type dispatch table of the encoder. The types are matched exactly,
+# the subclasses go through the generic `isinstance` checks.
+cdef dict _ENCODE_TYPE_IDS = {
+    type(None): _NONE,
+    bool: _BOOL,
+    int: _INT,
+    float: _FLOAT,
+    str: _STRING,
+    bytes: _BYTES,
+    list: _ARRAY,
+    tuple: _ARRAY,
+    dict: _OBJECT,
+}
+
+cdef bytes _NONE_VALUE = bytes([_NONE])
+cdef bytes _TRUE_VALUE = bytes([_BOOL, 1])
+cdef bytes _FALSE_VALUE = bytes([_BOOL, 0])
+cdef bytes _ARRAY_VALUE = bytes([_ARRAY])
+cdef bytes _OBJECT_VALUE = bytes([_OBJECT])
+cdef bytes _BYTES_PREFIX = bytes([_BYTES])
+
+
+cdef inline bytes _encode_number(unsigned char type_id, const void* value):
+    cdef bytes result = PyBytes_FromStringAndSize(NULL, 9)
+    cdef char* buf = PyBytes_AS_STRING(result)
+    buf[0] = <char>type_id
+    memcpy(buf + 1, value, 8)
+    return result
+
+
+cdef inline bytes _encode_str(unsigned char type_id, str value):
+    cdef Py_ssize_t size
+    cdef const char* data = PyUnicode_AsUTF8AndSize(value, &size)
+    cdef bytes result = PyBytes_FromStringAndSize(NULL, size + 1)
+    cdef char* buf = PyBytes_AS_STRING(result)
+    buf[0] = <char>type_id
+    memcpy(buf + 1, data, size)
+    return result
+
+
+cdef bytes _child_path(bytes prefix, key):
+    """Encode the path of the child, reusing the encoded path of the parent."""
+    cdef Py_ssize_t prefix_size = len(prefix)
+    cdef Py_ssize_t size
+    cdef const char* data
+    cdef int64 int_key
+    cdef int shift
+    cdef bytes result
+    cdef char* buf
+    cdef type key_type = type(key)
+    if key_type is str:
+        data = PyUnicode_AsUTF8AndSize(key, &size)
+        result = PyBytes_FromStringAndSize(NULL, prefix_size + size + 1)
+        buf = PyBytes_AS_STRING(result)
+        memcpy(buf, PyBytes_AS_STRING(prefix), prefix_size)
+        memcpy(buf + prefix_size, data, size)
+        buf[prefix_size + size] = <char>PATH_SENTINEL_CODE
+        return result
+    if key_type is int:
+        int_key = key
+        result = PyBytes_FromStringAndSize(NULL, prefix_size + 10)
+        buf = PyBytes_AS_STRING(result)
+        memcpy(buf, PyBytes_AS_STRING(prefix), prefix_size)
+        buf += prefix_size
+        buf[0] = <char>PATH_SENTINEL_CODE
+        for shift in range(8):
+            buf[1 + shift] = <char>((int_key >> (56 - 8 * shift)) & 0xff)
+        buf[9] = <char>PATH_SENTINEL_CODE
+        return result
+    return prefix + encoding.encode_path((key,))
+
+
+cdef int _encode_node(list records, bytes path, obj, bint strict) except -1:
+    """Append the encoded `(path, value)` records of the object to `records`.
+
+    Produces the same records as `encode_paths_vals(unfold_tree(obj))`, with
+    the paths of children built from the encoded path of their parent.
+    """
+    cdef double float_val
+    cdef int64 int_val
+    cdef int type_id = _ENCODE_TYPE_IDS.get(type(obj), -1)
+    if type_id == _FLOAT:
+        float_val = obj
+        records.append((path, _encode_number(_FLOAT, &float_val)))
+    elif type_id == _INT:
+        int_val = obj
+        records.append((path, _encode_number(_INT, &int_val)))
+    elif type_id == _STRING:
+        records.append((path, _encode_str(_STRING, obj)))
+    elif type_id == _BOOL:
+        records.append((path, _TRUE_VALUE if obj else _FALSE_VALUE))
+    elif type_id == _NONE:
+        records.append((path, _NONE_VALUE))
+    elif type_id == _BYTES:
+        records.append((path, _BYTES_PREFIX + obj))
+    elif type_id == _OBJECT:
+        if not obj:
+            records.append((path, _OBJECT_VALUE))
+        for key, val in (<dict>obj).items():
+            _encode_node(records, _child_path(path, key), val, strict)
+    elif type_id == _ARRAY:
+        records.append((path, _ARRAY_VALUE))
+        for idx, val in enumerate(obj):
+            _encode_node(records, _child_path(path, idx), val, strict)
+    else:
+        _encode_generic_node(records, path, obj, strict)
+    return 0
+
+
+cdef int _encode_generic_node(list records, bytes path, obj, bint strict) except -1:
+    # Same order of checks as in `unfold_tree`
+    if isinstance(obj, (bool, int, float, str, bytes)):
+        records.append((path, encoding.encode(obj)))
+    elif isinstance(obj, BLOB):
+        records.append((path, obj.transform(encoding.encode)))
+    elif isinstance(obj, (list, tuple)):
+        records.append((path, _ARRAY_VALUE))
+        for idx, val in enumerate(obj):
+            _encode_node(records, _child_path(path, idx), val, strict)
+    elif isinstance(obj, dict):
+        if obj == {}:
+            records.append((path, _OBJECT_VALUE))
+        for key, val in obj.items():
+            _encode_node(records, _child_path(path, key), val, strict)
+    elif isinstance(obj, CustomObjectBase):
+        aim_name, aim_obj = obj._aim_encode()
+        records.append((path, encoding.encode(CustomObjectFlagType(aim_name))))
+        for key, val in obj.storage.items():
+            _encode_node(records, _child_path(path, key), val, strict)
+    elif isinstance(obj, TreeView):
+        # TODO we need to implement TreeView.traverse()
+        raise NotImplementedError
+    elif not strict:
+        records.append((path, encoding.encode(repr(obj))))
+    else:
+        raise TypeError(f'Not supported value `{obj}` of type `{type(obj)}`.')
+    return 0
+
+
 def encode_tree(
     obj: AimObject,
-    strict: bool = True
+    strict: bool = True,
+    *,
+    prefix: bytes = b''
 ) -> Iterator[Tuple[bytes, bytes]]:
-    return encode_paths_vals(
-        unfold_tree(obj, strict=strict)
-    )
+    """Encode the object into `(path, value)` records.
+
+    Args:
+        obj: The object to encode.
+        strict: Raise `TypeError` for the values of unsupported types.
+            Otherwise such values are encoded as their `repr()`.
+        prefix: The encoded path prepended to the paths of all the records.
+    """
+    cdef list records = []
+    _encode_node(records, prefix, obj, strict)
+    return iter(records)
 
 
 def decode_tree(
     paths_vals: Iterator[Tuple[bytes, bytes]],
     strict: bool = True
 ) -> AimObject:
-    return fold_tree(
-        DecodePathsVals(paths_vals),
-        strict=strict
-    )
+    (keys, val), = FoldEncodedTree(paths_vals, level=0, strict=strict)
+    return val
 
 
 def iter_decode_tree(
     paths_vals: Iterator[Tuple[bytes, bytes]],
     level: int = 1
 ):
-    return iter_fold_tree(
-        DecodePathsVals(paths_vals),
-        level=level
-    )
+    return FoldEncodedTree(paths_vals, level=level)
+
+
+cdef enum:
+    # An array element key is `PATH_SENTINEL + int64_big_endian + PATH_SENTINEL`
+    _ARRAY_KEY_LENGTH = 10
+    _NUMBER_VALUE_LENGTH = 9
+    _INITIAL_CAPACITY = 1024
+
+
+cdef _grow(array, Py_ssize_t size):
+    grown = np.empty(2 * len(array), dtype=array.dtype)
+    grown[:size] = array[:size]
+    return grown
+
+
+def decode_sparse_numpy(
+    paths_vals: Iterator[Tuple[bytes, bytes]],
+    dtype: Any = None
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Decode the flat array of numbers into numpy arrays of indices and values.
+
+    The encoded `(path, value)` pairs are expected to be the records of an
+    array, relative to the array prefix. Indices are decoded from the keys and
+    values are written directly into preallocated numpy buffers, without
+    creating Python objects per element.
+
+    Returns:
+        `(indices, values)` arrays, or `None` if the array has records that
+        cannot be decoded this way (nested paths, non-numeric values, BLOBs).
+        The caller is expected to fall back to the generic decoding in that case.
+    """
+    cdef Py_ssize_t size = 0
+    cdef Py_ssize_t capacity = _INITIAL_CAPACITY
+    cdef bint has_float = False
+    cdef bytes key
+    cdef bytes val
+    cdef const unsigned char* key_buf
+    cdef const unsigned char* val_buf
+    cdef int64 int_val
+
+    indices = np.empty(capacity, dtype=np.int64)
+    ints = np.empty(capacity, dtype=np.int64)
+    floats = np.empty(capacity, dtype=np.float64)
+    cdef int64[:] indices_view = indices
+    cdef int64[:] ints_view = ints
+    cdef double[:] floats_view = floats
+
+    for encoded_path, encoded_val in paths_vals:
+        if type(encoded_path) is not bytes or type(encoded_val) is not bytes:
+            return None
+        key = encoded_path
+        val = encoded_val
+        if len(key) == 0:
+            # The array flag itself
+            if len(val) == 0 or (<const unsigned char*>val)[0] != _ARRAY:
+                return None
+            continue
+        if len(key) != _ARRAY_KEY_LENGTH or len(val) != _NUMBER_VALUE_LENGTH:
+            return None
+        key_buf = key
+        val_buf = val
+        if key_buf[0] != PATH_SENTINEL_CODE or key_buf[_ARRAY_KEY_LENGTH - 1] != PATH_SENTINEL_CODE:
+            return None
+
+        if size == capacity:
+            indices = _grow(indices, size)
+            ints = _grow(ints, size)
+            floats = _grow(floats, size)
+            indices_view = indices
+            ints_view = ints
+            floats_view = floats
+            capacity = len(indices)
+
+        indices_view[size] = decode_int64_big_endian(key_buf + 1)
+        if val_buf[0] == _INT:
+            int_val = decode_int64(val_buf + 1)
+            ints_view[size] = int_val
+            floats_view[size] = <double>int_val
+        elif val_buf[0] == _FLOAT:
+            floats_view[size] = decode_double(val_buf + 1)
+            has_float = True
+        else:
+            return None
+        size += 1
+
+    values = floats[:size] if has_float or size == 0 else ints[:size]
+    if dtype is not None:
+        values = values.astype(dtype, copy=False)
+    return indices[:size].astype(np.intp, copy=False), values
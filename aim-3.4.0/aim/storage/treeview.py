@@ -2,7 +2,7 @@ from abc import abstractmethod
 
 from aim.storage.types import AimObject, AimObjectKey, AimObjectPath
 
-from typing import TYPE_CHECKING, Any, Iterator, Tuple, Union
+from typing import TYPE_CHECKING, Any, Iterator, List, Tuple, Union
 
 if TYPE_CHECKING:
     from aim.storage.arrayview import ArrayView
@@ -65,6 +65,16 @@ class TreeView:
         except KeyError:
             return default
 
+    def multi_get(
+        self,
+        paths: List[Union[AimObjectKey, AimObjectPath]],
+        default: Any = None
+    ) -> List[AimObject]:
+        """Returns the values for the given `paths`, or `default` for the
+        missing ones.
+        """
+        return [self.get(path, default) for path in paths]
+
     @abstractmethod
     def __delitem__(
         self,
@@ -97,6 +107,26 @@ class TreeView:
     ) -> Iterator[Union[AimObjectPath, AimObjectKey]]:
         ...
 
+    def keys_in_range(
+        self,
+        start: int,
+        stop: int,
+        step: int = 1
+    ) -> Iterator[int]:
+        """Iterate over the integer keys (e.g. sparse array indices) in the
+        `[start, stop)` range.
+
+        For each of `start, start + step, start + 2 * step, ...` the first key
+        that is not less than it is yielded, skipping the duplicates.
+        """
+        target = start
+        for key in self.keys():
+            if key >= stop:
+                break
+            if key >= target:
+                yield key
+                target = start + ((key - start) // step + 1) * step
+
     @abstractmethod
     def items(
         self,
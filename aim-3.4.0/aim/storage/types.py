@@ -1,4 +1,4 @@
-from typing import Callable, Dict, List, Tuple, Union, Generic, TypeVar
+from typing import Callable, Dict, Iterator, List, Tuple, Union, Generic, TypeVar
 from copy import deepcopy
 
 
@@ -90,6 +90,15 @@ class BLOB(Generic[T]):
             self.loader_fn = None
         return self.data
 
+    def iter_chunks(self, chunk_size: int = 1024 * 1024) -> Iterator[memoryview]:
+        """Iterate over the binary content in pieces of `chunk_size` bytes.
+
+        The pieces are views over the loaded content, so no copies are made.
+        """
+        view = memoryview(self.load())
+        for offset in range(0, len(view), chunk_size):
+            yield view[offset:offset + chunk_size]
+
     def __deepcopy__(self, memo):
         data = self.load()
         instance = self.__class__(data=deepcopy(data, memo=memo))
@@ -1,183 +1,207 @@
-import heapq
 import logging
 import os
 import aimrocks
+import threading
+import time
 
-import cachetools.func
-
+from collections import defaultdict, OrderedDict
 from pathlib import Path
 
 from aim.storage.encoding import encode_path
 from aim.storage.container import Container
 from aim.storage.prefixview import PrefixView
-from aim.storage.rockscontainer import RocksContainer, optimize_db_for_read
+from aim.storage.rockscontainer import RocksContainer, get_local_shards_changes, optimize_db_for_read
+from aim.storage.rocksprofile import get_max_open_dbs
+from aim.storage.union_ import UnionIterator, ITER_ITEMS, ITER_KEYS, ITER_VALUES
 
-from typing import Dict, List, NamedTuple, Tuple
+from typing import Dict, List, Optional, Tuple
 
 
 logger = logging.getLogger(__name__)
 
 
-class Racer(NamedTuple):
-    key: bytes
-    priority: int
-    value: bytes
-    prefix: bytes
-    iterator: 'aimrocks.ItemsIterator'
-
-
-class ItemsIterator:
-    def __init__(self, dbs: Dict[bytes, "aimrocks.DB"], *args, **kwargs):
-        self.args = args
-        self.kwargs = kwargs
-        self._iterators = {}
-        for key, value in dbs.items():
-            self._iterators[key] = value.iteritems(*args, **kwargs)
-        self._priority: Dict[bytes, int] = {
-            prefix: idx
-            for idx, prefix in enumerate(self._iterators)
-        }
-        self._heap: List[Racer] = []
-
-    def __iter__(self):
-        return self
-
-    def __reversed__(self):
-        raise NotImplementedError
-
-    def seek_to_first(self):
-        for prefix, iterator in self._iterators.items():
-            iterator.seek_to_first()
-        self._init_heap()
-
-    def seek_to_last(self):
-        for prefix, iterator in self._iterators.items():
-            iterator.seek_to_last()
-        self._init_heap()
-
-    def seek(self, key: bytes):
-        for prefix, iterator in self._iterators.items():
-            iterator.seek(key)
-        self._init_heap()
+class DBHandlePool:
+    """Pool of open read-only RocksDB handles with LRU eviction.
 
-    def seek_for_prev(self, key):
-        for prefix, iterator in self._iterators.items():
-            iterator.seek_for_prev(key)
-        max_key = self._init_heap()
-        self.seek(max_key)
+    At most `max_open` handles are kept open at a time. Handles are opened on
+    the first access and the least recently used one is closed when the limit
+    is reached. Iterators created from an evicted handle remain valid, as they
+    keep a reference to it.
 
-    def get(self) -> Tuple[bytes, bytes]:
-        return self._get(seek_next=False)
+    Args:
+        opts (:obj:`dict`): options to open the RocksDB instances with.
+        max_open (:obj:`int`): the maximum number of handles kept open.
+    """
 
-    def _get(self, seek_next: bool = False) -> Tuple[bytes, bytes]:
-
-        if not self._heap:
-            raise StopIteration
-
-        key, _, value, prefix, iterator = self._heap[0]
-
-        if not seek_next:
-            return key, value
-
-        while self._heap:
-            alt = self._heap[0]
-
-            if (
-                alt.key != key and (alt.prefix == prefix or not alt.key.startswith(prefix))
-            ):
-                break
-
-            heapq.heappop(self._heap)
-            try:
-                new_key, new_value = next(alt.iterator)
-                racer = Racer(new_key, alt.priority, new_value, alt.prefix, alt.iterator)
-                heapq.heappush(self._heap, racer)
-                # self._state[prefix] = (new_key, new_value)
-            except StopIteration:
-                pass
-
-        return key, value
+    def __init__(self, opts: dict, max_open: int):
+        self.opts = opts
+        self.max_open = max_open
+        self._handles: 'OrderedDict[str, aimrocks.DB]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.open_count = 0
+        self.evict_count = 0
+
+    def get(self, path: str) -> aimrocks.DB:
+        with self._lock:
+            db = self._handles.get(path)
+            if db is not None:
+                self._handles.move_to_end(path)
+                return db
+
+        optimize_db_for_read(Path(path), self.opts)
+        db = aimrocks.DB(path, opts=aimrocks.Options(**self.opts), read_only=True)
+
+        with self._lock:
+            self.open_count += 1
+            self._handles[path] = db
+            while len(self._handles) > self.max_open:
+                evicted_path, _ = self._handles.popitem(last=False)
+                self.evict_count += 1
+                logger.debug(f'Closing RocksDB handle {evicted_path}: '
+                             f'more than {self.max_open} handles are open')
+        return db
 
-    def _init_heap(self):
-        self._heap = []
-        max_key = b''
-        for prefix, iterator in self._iterators.items():
-            try:
-                key, value = iterator.get()
-                max_key = max(key, max_key)
-            except ValueError:
-                continue
-            racer = Racer(key, self._priority[prefix], value, prefix, iterator)
-            heapq.heappush(self._heap, racer)
+    def discard(self, path: str):
+        with self._lock:
+            self._handles.pop(path, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of handles currently open and the total number
+        of handles opened and evicted so far.
+        """
+        return {
+            'open': len(self._handles),
+            'opened': self.open_count,
+            'evicted': self.evict_count,
+        }
 
-        return max_key
 
-    def __next__(self) -> Tuple[bytes, bytes]:
-        return self._get(seek_next=True)
+class DBHandle:
+    """Lazily opened handle of the RocksDB instance at `path`.
 
+    The actual handle is obtained from the `pool` on each access, so it is
+    reopened transparently if it has been evicted meanwhile.
+    """
 
-# We temporary implement KeysIterator and ValuesIterator
-# using ItemsIterator because the performance is not better
-# when iterating over only one of them
+    def __init__(self, path: str, pool: DBHandlePool):
+        self.path = path
+        self.pool = pool
 
-class KeysIterator(ItemsIterator):
+    @property
+    def db(self) -> aimrocks.DB:
+        return self.pool.get(self.path)
 
-    def get(self) -> bytes:
-        key, value = super().get()
-        return key
+    def get(self, key: bytes, *args, **kwargs) -> bytes:
+        return self.db.get(key, *args, **kwargs)
 
-    def __next__(self) -> bytes:
-        key, value = super().__next__()
-        return key
+    def multi_get(self, keys: List[bytes], *args, **kwargs) -> Dict[bytes, bytes]:
+        return self.db.multi_get(keys, *args, **kwargs)
 
+    def iteritems(self, *args, **kwargs):
+        return self.db.iteritems(*args, **kwargs)
 
-class ValuesIterator(ItemsIterator):
-    def get(self) -> bytes:
-        key, value = super().get()
-        return value
+    def iterkeys(self, *args, **kwargs):
+        return self.db.iterkeys(*args, **kwargs)
 
-    def __next__(self) -> bytes:
-        key, value = super().__next__()
-        return value
+    def itervalues(self, *args, **kwargs):
+        return self.db.itervalues(*args, **kwargs)
 
 
 class DB(object):
-    def __init__(self, db_path: str, db_name: str, opts, read_only: bool = False):
+    # The shards state is checked at most once per this interval, so the reads
+    # in a tight loop do not stat the directories on each access. The changes
+    # made by the process itself are picked up right away.
+    SHARDS_CHECK_INTERVAL = 0.1
+    # Listings of the shards are retaken during this interval after the last
+    # change, in case the directory modification times are coarse-grained
+    SHARDS_SETTLE_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        db_path: str,
+        db_name: str,
+        opts,
+        read_only: bool = False,
+        max_open_dbs: int = None
+    ):
         assert read_only
         self.db_path = db_path
         self.db_name = db_name
         self.opts = opts
-        self._dbs: Dict[bytes, aimrocks.DB] = dict()
-
-    def _get_db(
-        self,
-        prefix: bytes,
-        path: str,
-        cache: Dict[bytes, aimrocks.DB],
-        store: Dict[bytes, aimrocks.DB] = None,
-    ):
-        db = cache.get(prefix)
-        if db is None:
-            optimize_db_for_read(Path(path), self.opts)
-            db = aimrocks.DB(path, opts=aimrocks.Options(**self.opts), read_only=True)
-        if store is not None:
-            store[prefix] = db
-        return db
+        self.pool = DBHandlePool(opts, max_open=max_open_dbs or get_max_open_dbs())
+        self._index_db: aimrocks.DB = None
+        self._dbs: Dict[bytes, DBHandle] = dict()
+
+        # The keys of run DBs are prefixed with `(db_name, 'chunks', run_hash)`
+        self._chunks_prefix = encode_path((self.db_name, "chunks"))
+        # Incremented each time the set of shards changes
+        self.generation = 0
+        self._shards_state: Tuple[Optional[int], ...] = None
+        self._shards_changed_at = 0.0
+        self._shards_checked_at = 0.0
+        self._local_shards_changes = get_local_shards_changes()
+
+    def _get_index_db(self) -> aimrocks.DB:
+        # The index is accessed by the most of the reads, so it is kept open
+        # out of the pool
+        if self._index_db is None:
+            index_path = os.path.join(self.db_path, self.db_name, "index")
+            optimize_db_for_read(Path(index_path), self.opts)
+            self._index_db = aimrocks.DB(index_path, opts=aimrocks.Options(**self.opts), read_only=True)
+        return self._index_db
 
-    @cachetools.func.ttl_cache(maxsize=None, ttl=0.1)
     def _list_dir(self, path: str):
         try:
             return os.listdir(path)
         except FileNotFoundError:
             return []
 
+    def _get_mtime(self, path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _get_shards_state(self) -> Tuple[Optional[int], ...]:
+        # Runs are added to / removed from the union by creating / deleting
+        # entries of `progress` and `chunks` directories; the index is created
+        # in the root directory and its files are replaced in `index` directory
+        # when the records of the finalized runs are flushed. Any of these
+        # changes the modification time of the corresponding directory, so
+        # checking them is enough to detect a change without listing the
+        # directories.
+        root_dir = os.path.join(self.db_path, self.db_name)
+        return (
+            self._get_mtime(root_dir),
+            self._get_mtime(os.path.join(root_dir, "progress")),
+            self._get_mtime(os.path.join(root_dir, "chunks")),
+            self._get_mtime(os.path.join(root_dir, "index")),
+        )
+
     @property
-    @cachetools.func.ttl_cache(maxsize=None, ttl=0.1)
     def dbs(self):
-        index_prefix = encode_path((self.db_name, "chunks"))
-        index_path = os.path.join(self.db_path, self.db_name, "index")
+        now = time.time()
+        local_shards_changes = get_local_shards_changes()
+        checked_recently = now - self._shards_checked_at < self.SHARDS_CHECK_INTERVAL
+        if checked_recently and local_shards_changes == self._local_shards_changes:
+            return self._dbs
+        self._shards_checked_at = now
+        self._local_shards_changes = local_shards_changes
+        state = self._get_shards_state()
+        state_changed = state != self._shards_state
+        if state_changed:
+            self._shards_changed_at = now
+        elif now - self._shards_changed_at > self.SHARDS_SETTLE_INTERVAL:
+            return self._dbs
+        self._shards_state = state
+        self._list_dbs(reopen_index=state_changed)
+        return self._dbs
+
+    def _list_dbs(self, reopen_index: bool = False):
+        index_was_open = self._index_db is not None
         try:
-            index_db = self._get_db(index_prefix, index_path, self._dbs)
+            index_db = self._get_index_db()
         except Exception:
             index_db = None
             logger.warning('No index was detected')
@@ -185,42 +209,80 @@ class DB(object):
         # If index exists -- only load those in progress
         selector = 'progress' if index_db is not None else 'chunks'
 
-        new_dbs: Dict[bytes, aimrocks.DB] = {}
+        # The run DBs are not opened here, but on the first access
+        new_dbs: Dict[bytes, DBHandle] = {}
         db_dir = os.path.join(self.db_path, self.db_name, selector)
         for prefix in self._list_dir(db_dir):
             path = os.path.join(self.db_path, self.db_name, "chunks", prefix)
             prefix = encode_path((self.db_name, "chunks", prefix))
-            self._get_db(prefix, path, self._dbs, new_dbs)
-
+            handle = self._dbs.get(prefix)
+            if handle is None:
+                handle = DBHandle(path, self.pool)
+            new_dbs[prefix] = handle
+
+        for prefix, handle in self._dbs.items():
+            if prefix not in new_dbs and isinstance(handle, DBHandle):
+                self.pool.discard(handle.path)
+
+        if index_was_open and index_db is not None and (reopen_index or new_dbs.keys() != self._dbs.keys() - {b""}):
+            # A read-only handle sees the index as of the time it was opened, so
+            # the records of the runs finalized meanwhile are only visible to a
+            # new one. It is opened after listing the runs in progress, as the
+            # records are written to the index before the run leaves `progress`.
+            self._index_db = None
+            index_db = self._get_index_db()
         if index_db is not None:
             new_dbs[b""] = index_db
+        if new_dbs.keys() != self._dbs.keys():
+            self.generation += 1
         self._dbs = new_dbs
-        return new_dbs
 
     def close(self):
         ...
 
+    def _get_shard_prefix(self, key: bytes, dbs: Dict[bytes, aimrocks.DB]) -> bytes:
+        # The run hash is the path segment right after `(db_name, 'chunks')`,
+        # so the shard prefix is extracted from the key itself.
+        # Keys outside the run DBs in progress are served by the index.
+        if key.startswith(self._chunks_prefix):
+            end = key.find(b"\xfe", len(self._chunks_prefix))
+            if end != -1:
+                prefix = key[:end + 1]
+                if prefix in dbs:
+                    return prefix
+        return b""
+
     def get(self, key: bytes, *args, **kwargs) -> bytes:
-        for prefix, db in self.dbs.items():
-            # Shadowing
-            if key.startswith(prefix):
-                return db.get(key)
-        return self.dbs[b""].get(key)
+        dbs = self.dbs
+        return dbs[self._get_shard_prefix(key, dbs)].get(key)
+
+    def multi_get(self, keys: List[bytes], *args, **kwargs) -> Dict[bytes, bytes]:
+        # Group the keys by the shard they belong to,
+        # so that there is a single batched lookup per shard
+        dbs = self.dbs
+        keys_by_prefix: Dict[bytes, List[bytes]] = defaultdict(list)
+        for key in keys:
+            keys_by_prefix[self._get_shard_prefix(key, dbs)].append(key)
+
+        values = {}
+        for prefix, shard_keys in keys_by_prefix.items():
+            values.update(dbs[prefix].multi_get(shard_keys, *args, **kwargs))
+        return values
 
     def iteritems(
         self, *args, **kwargs
-    ) -> "ItemsIterator":
-        return ItemsIterator(self.dbs, *args, **kwargs)
+    ) -> UnionIterator:
+        return UnionIterator(self.dbs, self._chunks_prefix, ITER_ITEMS, *args, **kwargs)
 
     def iterkeys(
         self, *args, **kwargs
-    ) -> "KeysIterator":
-        return KeysIterator(self.dbs, *args, **kwargs)
+    ) -> UnionIterator:
+        return UnionIterator(self.dbs, self._chunks_prefix, ITER_KEYS, *args, **kwargs)
 
     def itervalues(
         self, *args, **kwargs
-    ) -> "ValuesIterator":
-        return ValuesIterator(self.dbs, *args, **kwargs)
+    ) -> UnionIterator:
+        return UnionIterator(self.dbs, self._chunks_prefix, ITER_VALUES, *args, **kwargs)
 
 
 class RocksUnionContainer(RocksContainer):
@@ -0,0 +1,261 @@
+# distutils: language = c++
+# cython: wraparound = False
+# cython: boundscheck = False
+# cython: nonecheck=False
+
+from libcpp.vector cimport vector
+
+
+cpdef enum:
+    ITER_ITEMS = 0
+    ITER_KEYS = 1
+    ITER_VALUES = 2
+
+
+cdef bytes PATH_SENTINEL = b'\xfe'
+
+
+cdef class UnionIterator:
+    """K-way merge of the iterators over the shards of union DB.
+
+    The iterator follows the interface of `aimrocks` iterators: it has to be
+    positioned with one of the `seek*` methods first, `next()` returns the
+    current record and moves forward, `reversed()` gives a view that returns
+    the current record and moves backward.
+
+    The records of the index (the shard with `b''` prefix) are shadowed by
+    the shards of runs in progress: an index record is skipped if its key
+    belongs to one of the run shards.
+
+    Args:
+        dbs: shard prefix to DB mapping. The index is expected to be the last.
+        chunks_prefix: the prefix of run keys, followed by the run hash.
+        mode: one of `ITER_ITEMS`, `ITER_KEYS`, `ITER_VALUES`. Only keys are
+            read from the shards in `ITER_KEYS` mode.
+    """
+    cdef list _iterators
+    cdef list _reversed_iterators
+    cdef list _keys
+    cdef list _values
+    cdef vector[int] _heap
+    cdef bytes _chunks_prefix
+    cdef set _shard_prefixes
+    cdef int _index_idx
+    cdef int _mode
+    cdef bint _reverse
+
+    def __init__(self, dbs, bytes chunks_prefix, int mode = ITER_ITEMS, *args, **kwargs):
+        self._iterators = []
+        self._reversed_iterators = []
+        self._shard_prefixes = set()
+        self._index_idx = -1
+        self._chunks_prefix = chunks_prefix
+        self._mode = mode
+        self._reverse = False
+
+        for prefix, db in dbs.items():
+            if prefix:
+                self._shard_prefixes.add(prefix)
+            else:
+                self._index_idx = len(self._iterators)
+            if mode == ITER_KEYS:
+                iterator = db.iterkeys(*args, **kwargs)
+            else:
+                iterator = db.iteritems(*args, **kwargs)
+            self._iterators.append(iterator)
+            # reversed iterators share the position with the original ones
+            self._reversed_iterators.append(reversed(iterator))
+
+        self._keys = [None] * len(self._iterators)
+        self._values = [None] * len(self._iterators)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self._set_direction(False)
+        item = self._current()
+        self._advance()
+        return item
+
+    def __reversed__(self):
+        return ReversedUnionIterator(self)
+
+    def get(self):
+        return self._current()
+
+    def seek_to_first(self):
+        self._reverse = False
+        for iterator in self._iterators:
+            iterator.seek_to_first()
+        self._init_heap()
+
+    def seek_to_last(self):
+        self._reverse = True
+        for iterator in self._iterators:
+            iterator.seek_to_last()
+        self._init_heap()
+
+    def seek(self, bytes key):
+        self._reverse = False
+        for iterator in self._iterators:
+            iterator.seek(key)
+        self._init_heap()
+
+    def seek_for_prev(self, bytes key):
+        self._reverse = True
+        for iterator in self._iterators:
+            iterator.seek_for_prev(key)
+        self._init_heap()
+
+    cdef _prev(self):
+        self._set_direction(True)
+        item = self._current()
+        self._advance()
+        return item
+
+    cdef bint _read(self, int idx) except *:
+        try:
+            item = self._iterators[idx].get()
+        except (ValueError, StopIteration):
+            return False
+        if self._mode == ITER_KEYS:
+            self._keys[idx] = item
+        else:
+            self._keys[idx], self._values[idx] = item
+        return True
+
+    cdef bint _step(self, int idx) except *:
+        try:
+            if self._reverse:
+                next(self._reversed_iterators[idx])
+            else:
+                next(self._iterators[idx])
+        except StopIteration:
+            return False
+        return self._read(idx)
+
+    cdef bint _before(self, int a, int b) except *:
+        cdef bytes key_a = self._keys[a]
+        cdef bytes key_b = self._keys[b]
+        if key_a == key_b:
+            # run shards come before the index
+            return a < b
+        if self._reverse:
+            return key_a > key_b
+        return key_a < key_b
+
+    cdef void _push(self, int idx) except *:
+        cdef size_t pos = self._heap.size()
+        cdef size_t parent
+        self._heap.push_back(idx)
+        while pos > 0:
+            parent = (pos - 1) // 2
+            if not self._before(self._heap[pos], self._heap[parent]):
+                break
+            self._heap[pos] = self._heap[parent]
+            self._heap[parent] = idx
+            pos = parent
+
+    cdef int _pop(self) except *:
+        cdef int top = self._heap[0]
+        cdef size_t size = self._heap.size() - 1
+        cdef size_t pos = 0
+        cdef size_t child
+        cdef int tmp
+        self._heap[0] = self._heap[size]
+        self._heap.pop_back()
+        while True:
+            child = 2 * pos + 1
+            if child >= size:
+                break
+            if child + 1 < size and self._before(self._heap[child + 1], self._heap[child]):
+                child += 1
+            if not self._before(self._heap[child], self._heap[pos]):
+                break
+            tmp = self._heap[pos]
+            self._heap[pos] = self._heap[child]
+            self._heap[child] = tmp
+            pos = child
+        return top
+
+    cdef void _init_heap(self) except *:
+        cdef int idx
+        self._heap.clear()
+        for idx in range(len(self._iterators)):
+            if self._read(idx):
+                self._push(idx)
+
+    cdef bint _is_shadowed(self, int idx) except *:
+        if idx != self._index_idx:
+            return False
+        cdef bytes key = self._keys[idx]
+        if not key.startswith(self._chunks_prefix):
+            return False
+        cdef Py_ssize_t end = key.find(PATH_SENTINEL, len(self._chunks_prefix))
+        if end == -1:
+            return False
+        return key[:end + 1] in self._shard_prefixes
+
+    cdef void _settle(self) except *:
+        cdef int idx
+        while not self._heap.empty() and self._is_shadowed(self._heap[0]):
+            idx = self._pop()
+            if self._step(idx):
+                self._push(idx)
+
+    cdef _current(self):
+        self._settle()
+        if self._heap.empty():
+            raise StopIteration
+        cdef int idx = self._heap[0]
+        if self._mode == ITER_KEYS:
+            return self._keys[idx]
+        if self._mode == ITER_VALUES:
+            return self._values[idx]
+        return self._keys[idx], self._values[idx]
+
+    cdef void _advance(self) except *:
+        cdef int idx = self._pop()
+        cdef bytes key = self._keys[idx]
+        if self._step(idx):
+            self._push(idx)
+        # skip the duplicates of the key in other shards
+        while not self._heap.empty() and self._keys[self._heap[0]] == key:
+            idx = self._pop()
+            if self._step(idx):
+                self._push(idx)
+
+    cdef void _set_direction(self, bint reverse) except *:
+        # Changing the direction requires all the shard iterators to be
+        # repositioned around the current key
+        if self._reverse == reverse:
+            return
+        self._settle()
+        if self._heap.empty():
+            self._reverse = reverse
+            return
+        cdef bytes key = self._keys[self._heap[0]]
+        self._reverse = reverse
+        for iterator in self._iterators:
+            if reverse:
+                iterator.seek_for_prev(key)
+            else:
+                iterator.seek(key)
+        self._init_heap()
+
+
+cdef class ReversedUnionIterator:
+    cdef UnionIterator _iterator
+
+    def __init__(self, UnionIterator iterator):
+        self._iterator = iterator
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._iterator._prev()
+
+    def __reversed__(self):
+        return self._iterator
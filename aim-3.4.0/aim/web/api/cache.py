@@ -0,0 +1,144 @@
+"""Server-side cache of the search responses.
+
+The responses are cached by the endpoint, the request parameters and the
+generation of the repo, i.e. the token of the repo data state. Any change of
+the repo data changes the generation, so the cached responses never need to
+be invalidated explicitly; the stale ones are evicted in the LRU order once
+the cache size goes above the limit.
+
+The ETag of the response is derived from the same key, so the conditional
+requests of the browser are answered with `304 Not Modified` without
+touching the storage, even if the response itself is evicted.
+"""
+import ast
+import hashlib
+import os
+
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterator, Optional
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+from aim.__version__ import __version__ as aim_version
+from aim.sdk.repo import Repo
+from aim.storage.query import strip_query
+from aim.web.api.utils import ConcurrencyLimit, iterate_in_storage_executor, run_in_storage_executor
+from aim.web.configs import AIM_UI_RESPONSE_CACHE_SIZE_KEY
+
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024  # 256MB
+
+
+class ResponseCache:
+    """LRU cache of the response bodies, bounded by their total size in bytes.
+
+    Args:
+        max_size (:obj:`int`): Total size of the cached responses.
+        max_entry_size (:obj:`int`, optional): Size of the largest response kept in the cache.
+            A quarter of the `max_size` by default.
+    """
+    def __init__(self, max_size: int, max_entry_size: Optional[int] = None):
+        self.max_size = max_size
+        self.max_entry_size = max_entry_size if max_entry_size is not None else max_size // 4
+        self.size = 0
+        self._entries: 'OrderedDict[Hashable, bytes]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        content = self._entries.get(key)
+        if content is not None:
+            self._entries.move_to_end(key)
+        return content
+
+    def put(self, key: Hashable, content: bytes):
+        if len(content) > self.max_entry_size:
+            return
+        self.discard(key)
+        self._entries[key] = content
+        self.size += len(content)
+        while self.size > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def discard(self, key: Hashable):
+        content = self._entries.pop(key, None)
+        if content is not None:
+            self.size -= len(content)
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+
+response_cache = ResponseCache(int(os.environ.get(AIM_UI_RESPONSE_CACHE_SIZE_KEY, DEFAULT_CACHE_SIZE)))
+
+
+def normalize_query(query: str) -> str:
+    """Returns the same string for the queries differing only in formatting."""
+    query = strip_query(query)
+    try:
+        return ast.dump(ast.parse(query, mode='eval')) if query else ''
+    except SyntaxError:
+        return query
+
+
+def get_etag(key: Hashable) -> str:
+    digest = hashlib.blake2b(repr((aim_version, key)).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+async def cached_streaming_response(request: Request,
+                                    repo: Repo,
+                                    key: Hashable,
+                                    streamer_factory: Callable[[], Iterator[bytes]],
+                                    limit: Optional[ConcurrencyLimit] = None,
+                                    media_type: Optional[str] = None,
+                                    cache: ResponseCache = response_cache) -> Response:
+    """Serves the response of the streamer from the cache, if the repo data is unchanged since it was cached.
+
+    Args:
+        request (:obj:`Request`): The request, checked for the `If-None-Match` header.
+        repo (:obj:`Repo`): The repo the response is computed from.
+        key (:obj:`Hashable`): The endpoint and the normalized request parameters.
+        streamer_factory (:obj:`Callable`): Creates the streamer of the response body, if it is not cached.
+        limit (:obj:`ConcurrencyLimit`, optional): The concurrency limit of the endpoint.
+        media_type (:obj:`str`, optional): Media type of the response.
+        cache (:obj:`ResponseCache`): The cache to use.
+    """
+    generation = await run_in_storage_executor(repo.get_generation)
+    cache_key = (key, generation)
+    # the browser revalidates the response on each request
+    headers = {'ETag': get_etag(cache_key), 'Cache-Control': 'no-cache'}
+
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match and headers['ETag'] in map(str.strip, if_none_match.split(',')):
+        return Response(status_code=304, headers=headers)
+
+    content = cache.get(cache_key)
+    if content is not None:
+        return Response(content, media_type=media_type, headers=headers)
+
+    async def cache_stream(streamer):
+        chunks = []
+        size = 0
+        async for chunk in streamer:
+            if chunks is not None:
+                size += len(chunk)
+                if size > cache.max_entry_size:
+                    chunks = None
+                else:
+                    chunks.append(chunk)
+            yield chunk
+        # the response could see the changes made while it was computed, so the
+        # result is cached only if there were none
+        if chunks is not None and generation == await run_in_storage_executor(repo.get_generation):
+            cache.put(cache_key, b''.join(chunks))
+
+    # the factory queries the repo, so it is called in the storage executor as well
+    streamer = iterate_in_storage_executor(streamer_factory, limit)
+    return StreamingResponse(cache_stream(streamer), media_type=media_type, headers=headers)
@@ -4,6 +4,8 @@ from typing import Optional, Tuple
 
 from collections import Counter
 from fastapi import Depends, HTTPException, Request, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from aim.web.api.utils import APIRouter  # wrapper for fastapi.APIRouter
 from urllib import parse
 
@@ -14,9 +16,13 @@ from aim.web.api.projects.pydantic_models import (
     ProjectApiOut,
     ProjectParamsOut,
 )
-from aim.web.api.utils import object_factory
+from aim.web.api.utils import ConcurrencyLimit, object_factory
+from aim.web.api.cache import cached_streaming_response
+
 projects_router = APIRouter()
 
+params_limit = ConcurrencyLimit(2)
+
 
 @projects_router.get('/', response_model=ProjectApiOut)
 async def project_api():
@@ -64,7 +70,7 @@ async def project_activity_api(request: Request, factory=Depends(object_factory)
 
 
 @projects_router.get('/params/', response_model=ProjectParamsOut, response_model_exclude_defaults=True)
-async def project_params_api(sequence: Optional[Tuple[str, ...]] = Query(())):
+async def project_params_api(request: Request, sequence: Optional[Tuple[str, ...]] = Query(())):
     project = Project()
 
     if not project.exists():
@@ -78,8 +84,13 @@ async def project_params_api(sequence: Optional[Tuple[str, ...]] = Query(())):
     else:
         sequence = project.repo.available_sequence_types()
 
-    response = {
-        'params': project.repo.collect_params_info(),
-    }
-    response.update(**project.repo.collect_sequence_info(sequence))
-    return response
+    def streamer_factory():
+        response = {
+            'params': project.repo.collect_params_info(),
+        }
+        response.update(**project.repo.collect_sequence_info(sequence))
+        yield JSONResponse(jsonable_encoder(ProjectParamsOut(**response), exclude_defaults=True)).body
+
+    key = ('projects/params', tuple(sequence))
+    return await cached_streaming_response(request, project.repo, key, streamer_factory, params_limit,
+                                           media_type='application/json')
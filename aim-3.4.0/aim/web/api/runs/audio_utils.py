@@ -10,7 +10,7 @@ from aim.sdk.sequence_collection import SequenceCollection
 from aim.sdk.sequence import Sequence
 from aim.sdk.uri_service import URIService, generate_resource_path
 
-from aim.web.api.runs.utils import get_run_props, collect_run_streamable_data, IndexRange
+from aim.web.api.runs.utils import get_run_props, StreamFrameWriter, stream_run_data, IndexRange
 from aim.web.api.runs.pydantic_models import TraceBase
 
 if TYPE_CHECKING:
@@ -82,10 +82,10 @@ def get_trace_info(trace: Sequence, rec_slice: slice, rec_density: int, idx_slic
     }
 
 
-async def audio_search_result_streamer(traces: SequenceCollection,
-                                       rec_range: IndexRange, rec_density: int,
-                                       idx_range: IndexRange, idx_density: int,
-                                       calc_total_ranges: bool):
+def audio_search_result_streamer(traces: SequenceCollection,
+                                 rec_range: IndexRange, rec_density: int,
+                                 idx_range: IndexRange, idx_density: int,
+                                 calc_total_ranges: bool):
     record_range_missing = rec_range.start is None or rec_range.stop is None
     index_range_missing = idx_range.start is None or idx_range.stop is None
     run_traces = {}
@@ -107,6 +107,8 @@ async def audio_search_result_streamer(traces: SequenceCollection,
     rec_slice = slice(rec_start, rec_stop, rec_step)
     idx_slice = slice(idx_start, idx_stop, idx_step)
 
+    writer = StreamFrameWriter()
+
     def _pack_run_data(run_: Run, traces_: list):
         _rec_range = trcs_rec_range if record_range_missing or calc_total_ranges else rec_range
         _idx_range = trcs_idx_range if index_range_missing or calc_total_ranges else idx_range
@@ -124,35 +126,34 @@ async def audio_search_result_streamer(traces: SequenceCollection,
                 'props': get_run_props(run_)
             }
         }
-        encoded_tree = encode_tree(run_dict)
-        return collect_run_streamable_data(encoded_tree)
+        writer.write_tree(encode_tree(run_dict))
+        return writer.flush()
 
     if run_traces:
         for run_info in run_traces.values():
             traces_list = []
             for trace in run_info['traces']:
                 traces_list.append(get_trace_info(trace, rec_slice, rec_density, idx_slice))
-            yield _pack_run_data(run_info['run'], traces_list)
+            yield from _pack_run_data(run_info['run'], traces_list)
     else:
         for run_trace_collection in traces.iter_runs():
             traces_list = []
             for trace in run_trace_collection.iter():
                 traces_list.append(get_trace_info(trace, rec_slice, rec_density, idx_slice))
             if traces_list:
-                yield _pack_run_data(run_trace_collection.run, traces_list)
+                yield from _pack_run_data(run_trace_collection.run, traces_list)
 
 
 def audios_batch_result_streamer(uri_batch: List[str], repo: 'Repo'):
     uri_service = URIService(repo=repo)
-    batch_iterator = uri_service.request_batch(uri_batch=uri_batch)
-    for it in batch_iterator:
-        yield collect_run_streamable_data(encode_tree(it))
+    yield from stream_run_data(uri_service.request_batch_encoded(uri_batch=uri_batch))
 
 
 def requested_audio_traces_streamer(run: Run,
                                     requested_traces: List[TraceBase],
                                     rec_range, idx_range,
                                     rec_num: int = 50, idx_num: int = 5) -> List[dict]:
+    writer = StreamFrameWriter()
     for requested_trace in requested_traces:
         trace_name = requested_trace.name
         context = Context(requested_trace.context)
@@ -192,4 +193,5 @@ def requested_audio_traces_streamer(run: Run,
             'iters': steps,
         }
         encoded_tree = encode_tree(trace_dict)
-        yield collect_run_streamable_data(encoded_tree)
+        writer.write_tree(encoded_tree)
+        yield from writer.flush()
@@ -0,0 +1,182 @@
+"""Columnar binary format of the metric search response.
+
+The default format encodes every trace as a tree, including its numpy
+arrays. In the columnar format the arrays are streamed as raw typed buffers
+instead, so neither the server nor the client has to pass them through the
+tree encoding.
+
+The response is a sequence of frames, two for each run::
+
+    <kind: uint8><3 padding bytes><meta size: uint32><data size: uint32>
+    <meta><padding to 8 bytes>
+    <data>
+
+The meta is an encoded tree framed the same way as in the other streamed
+responses. The RUN frame holds the run `hash`, `params` and `props` and has
+no data. The TRACES frame holds the `traces` of the run; the data of each
+trace column is described in the trace `columns` as `[dtype, offset, length]`,
+where the offset is relative to the start of the frame data. The column
+buffers are 8-byte aligned, so they can be used in place.
+
+Python clients can read the response with `iter_columnar_stream`::
+
+    response = requests.get(f'{aim_url}/api/runs/search/metric/',
+                            params={'q': query, 'format': 'columnar'}, stream=True)
+    for run in iter_columnar_stream(response.iter_content(chunk_size=None)):
+        for trace in run['traces']:
+            plot(trace['iters'], trace['values'])
+"""
+import struct
+
+import numpy as np
+
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from aim.sdk.sequence_collection import SequenceCollection
+from aim.storage.treeutils import decode_tree, encode_tree
+from aim.web.api.runs.utils import (
+    METRIC_TRACE_ARRAYS,
+    collect_run_streamable_data,
+    collect_sliced_metric_trace,
+    get_run_props,
+)
+
+COLUMNAR_MEDIA_TYPE = 'application/vnd.aim.columnar'
+
+RUN_FRAME = 1
+TRACES_FRAME = 2
+
+_FRAME_HEADER = struct.Struct('<B3xII')
+_ALIGNMENT = 8
+
+
+def _padding(size: int) -> bytes:
+    return bytes(-size % _ALIGNMENT)
+
+
+def pack_columnar_frame(kind: int, meta: dict, columns: Optional[List[np.ndarray]] = None) -> bytes:
+    """Packs the frame of the given kind. The `columns` are laid out in the given order."""
+    parts = []
+    data_size = 0
+    for array in columns or ():
+        array = np.ascontiguousarray(array)
+        parts.append(array)
+        data_size += array.nbytes
+        padding = _padding(array.nbytes)
+        if padding:
+            parts.append(padding)
+            data_size += len(padding)
+
+    meta = collect_run_streamable_data(encode_tree(meta))
+    header = _FRAME_HEADER.pack(kind, len(meta), data_size)
+    return b''.join([header, meta, _padding(len(header) + len(meta)), *parts])
+
+
+def _collect_columns(trace: dict, columns: List[np.ndarray], offset: int) -> int:
+    # Replaces the arrays of the trace with their descriptions in the frame data
+    trace_columns = {}
+    for name in METRIC_TRACE_ARRAYS:
+        array = trace.pop(name)
+        if array is None or array.dtype == 'object':
+            continue
+        trace_columns[name] = [array.dtype.str, offset, len(array)]
+        columns.append(array)
+        offset += array.nbytes + len(_padding(array.nbytes))
+    trace['columns'] = trace_columns
+    return offset
+
+
+def metric_search_columnar_streamer(traces: SequenceCollection,
+                                    steps_num: int,
+                                    x_axis: Optional[str],
+                                    sampling: str = 'stride') -> Iterator[bytes]:
+    for run_trace_collection in traces.iter_runs():
+        run = None
+        traces_list = []
+        columns = []
+        offset = 0
+        for trace in run_trace_collection.iter():
+            if not run:
+                run = run_trace_collection.run
+            trace_dict = collect_sliced_metric_trace(run, trace, steps_num, x_axis, sampling)
+            offset = _collect_columns(trace_dict, columns, offset)
+            traces_list.append(trace_dict)
+
+        if run:
+            yield pack_columnar_frame(RUN_FRAME, {
+                'hash': run.hash,
+                'params': run.get(...),
+                'props': get_run_props(run),
+            })
+            yield pack_columnar_frame(TRACES_FRAME, {'traces': traces_list}, columns)
+
+
+def _iter_framed_records(meta: memoryview) -> Iterator:
+    offset = 0
+    while offset < len(meta):
+        (key_size,) = struct.unpack_from('I', meta, offset)
+        offset += 4
+        key = bytes(meta[offset:offset + key_size])
+        offset += key_size
+        (value_size,) = struct.unpack_from('I', meta, offset)
+        offset += 4
+        yield key, bytes(meta[offset:offset + value_size])
+        offset += value_size
+
+
+def iter_columnar_frames(chunks: Iterable[bytes]) -> Iterator[tuple]:
+    """Splits the stream into `(kind, meta, data)` frames. The meta is decoded, the data is left as is."""
+    pending = []
+    pending_size = 0
+    required_size = _FRAME_HEADER.size
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size < required_size:
+            continue
+        # the chunks are joined only once the whole frame is received
+        buffer = memoryview(b''.join(pending))
+        offset = 0
+        while True:
+            if len(buffer) - offset < _FRAME_HEADER.size:
+                required_size = _FRAME_HEADER.size
+                break
+            kind, meta_size, data_size = _FRAME_HEADER.unpack_from(buffer, offset)
+            meta_start = offset + _FRAME_HEADER.size
+            data_start = meta_start + meta_size + len(_padding(_FRAME_HEADER.size + meta_size))
+            frame_end = data_start + data_size
+            if frame_end > len(buffer):
+                required_size = frame_end - offset
+                break
+            meta = decode_tree(_iter_framed_records(buffer[meta_start:meta_start + meta_size]))
+            yield kind, meta, buffer[data_start:frame_end]
+            offset = frame_end
+        tail = buffer[offset:]
+        pending = [tail] if tail else []
+        pending_size = len(tail)
+    if pending_size:
+        raise ValueError('Unexpected end of the columnar stream.')
+
+
+def iter_columnar_stream(chunks: Iterable[bytes]) -> Iterator[Dict]:
+    """Decodes the columnar metric search response.
+
+    Yields the runs with their `hash`, `params`, `props` and `traces`. The
+    columns of the traces are read-only numpy arrays sharing the frame data;
+    the columns missing in the response, e.g. the x-axis ones, are None.
+    """
+    run = None
+    for kind, meta, data in iter_columnar_frames(chunks):
+        if kind == RUN_FRAME:
+            run = meta
+        elif kind == TRACES_FRAME:
+            for trace in meta['traces']:
+                columns = trace.pop('columns')
+                for name in METRIC_TRACE_ARRAYS:
+                    if name in columns:
+                        dtype, offset, length = columns[name]
+                        trace[name] = np.frombuffer(data, dtype=dtype, count=length, offset=offset)
+                    else:
+                        trace[name] = None
+            run['traces'] = meta['traces']
+            yield run
@@ -0,0 +1,118 @@
+"""Downsampling of the metric traces for plotting.
+
+The methods select the indices of the records to keep, so that the values,
+iters, epochs and timestamps of the trace are sampled together:
+
+- `stride`: every n-th record, plus the last one.
+- `minmax`: the records with the min and the max value of each bucket.
+  Keeps the spikes, but not the shape of the curve between them.
+- `lttb`: Largest-Triangle-Three-Buckets. Keeps the record forming the
+  largest triangle with the records selected in the adjacent buckets, which
+  preserves the visual shape of the curve, including the spikes.
+
+The first and the last records are always kept.
+"""
+import numpy as np
+
+DOWNSAMPLING_METHODS = ('stride', 'minmax', 'lttb')
+
+
+def stride_indices(num_records: int, num_points: int) -> np.ndarray:
+    step = (num_records // num_points) or 1
+    indices = np.arange(0, num_records, step)
+    if (num_records - 1) % step != 0:
+        indices = np.append(indices, num_records - 1)
+    return indices
+
+
+def _bucket_edges(start: int, stop: int, num_buckets: int) -> np.ndarray:
+    # The buckets are never empty, as there are at least as many records as buckets
+    return np.linspace(start, stop, num_buckets + 1).astype(np.int64)
+
+
+def _first_match_per_bucket(matches: np.ndarray, buckets: np.ndarray) -> np.ndarray:
+    candidates = np.flatnonzero(matches)
+    _, first = np.unique(buckets[candidates], return_index=True)
+    return candidates[first]
+
+
+def minmax_indices(values: np.ndarray, num_points: int) -> np.ndarray:
+    num_records = len(values)
+    if num_records <= num_points:
+        return np.arange(num_records)
+    num_buckets = max(num_points // 2, 1)
+    edges = _bucket_edges(0, num_records, num_buckets)
+    values = values.astype(np.float64, copy=False)
+    # fmin/fmax skip the NaN values; the buckets of NaNs only are dropped
+    mins = np.fmin.reduceat(values, edges[:-1])
+    maxs = np.fmax.reduceat(values, edges[:-1])
+    buckets = np.repeat(np.arange(num_buckets), np.diff(edges))
+    return np.unique(np.concatenate((
+        [0],
+        _first_match_per_bucket(values == mins[buckets], buckets),
+        _first_match_per_bucket(values == maxs[buckets], buckets),
+        [num_records - 1],
+    )))
+
+
+def lttb_indices(iters: np.ndarray, values: np.ndarray, num_points: int) -> np.ndarray:
+    num_records = len(values)
+    if num_records <= num_points:
+        return np.arange(num_records)
+    if num_points < 3:
+        return stride_indices(num_records, num_points)
+
+    x = iters.astype(np.float64)
+    y = values.astype(np.float64)
+    # The inner records are split into buckets, a single record is selected from each of them
+    edges = _bucket_edges(1, num_records - 1, num_points - 2)
+    sizes = np.diff(edges)
+    # the last bucket ends right before the last record
+    avg_x = np.append(np.add.reduceat(x[:-1], edges[:-1]) / sizes, x[-1])
+    avg_y = np.append(np.add.reduceat(y[:-1], edges[:-1]) / sizes, y[-1])
+    # The doubled area of the triangle formed by the selected record `a` of the
+    # previous bucket, the record `p` and the average of the next bucket is
+    # |x_a * (y_p - avg_y) + y_a * (avg_x - x_p) + (x_p * avg_y - avg_x * y_p)|.
+    # The coefficients depend on `a` linearly, so they are computed for all records at once.
+    buckets = np.repeat(np.arange(1, num_points - 1), sizes)
+    next_x = avg_x[buckets]
+    next_y = avg_y[buckets]
+    inner = slice(1, num_records - 1)
+    coef_x = y[inner] - next_y
+    coef_y = next_x - x[inner]
+    free = x[inner] * next_y - next_x * y[inner]
+
+    all_finite = np.isfinite(y).all()
+
+    indices = np.empty(num_points, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = num_records - 1
+    selected = 0
+    # the coefficients are indexed from the first inner record
+    bounds = zip((edges[:-1] - 1).tolist(), (edges[1:] - 1).tolist())
+    for bucket, (start, stop) in enumerate(bounds, start=1):
+        areas = np.abs(x[selected] * coef_x[start:stop] + y[selected] * coef_y[start:stop] + free[start:stop])
+        if not all_finite:
+            # the non-finite values are never preferred
+            areas[~np.isfinite(areas)] = -1
+        selected = start + 1 + int(areas.argmax())
+        indices[bucket] = selected
+    return indices
+
+
+def downsample(iters: np.ndarray, values: np.ndarray, num_points: int, method: str = 'stride') -> np.ndarray:
+    """Returns the indices of the records to keep, in the ascending order.
+
+    Args:
+        iters (:obj:`np.ndarray`): The steps of the records, used as the x-axis.
+        values (:obj:`np.ndarray`): The values of the records.
+        num_points (:obj:`int`): The number of records to keep, approximately.
+        method (:obj:`str`): One of `DOWNSAMPLING_METHODS`. `stride` by default.
+    """
+    if method == 'stride' or values.dtype == 'object':
+        return stride_indices(len(values), num_points)
+    if method == 'minmax':
+        return minmax_indices(values, num_points)
+    if method == 'lttb':
+        return lttb_indices(iters, values, num_points)
+    raise ValueError(f'Unknown downsampling method \'{method}\'.')
@@ -12,7 +12,8 @@ from aim.sdk.run import Run
 from aim.sdk.uri_service import URIService, generate_resource_path
 
 from aim.web.api.runs.utils import (
-    collect_run_streamable_data,
+    StreamFrameWriter,
+    stream_run_data,
     IndexRange,
     get_run_props,
 )
@@ -79,7 +80,7 @@ def get_trace_info(trace: Sequence, rec_slice: slice, rec_density: int) -> dict:
     }
 
 
-async def figure_search_result_streamer(
+def figure_search_result_streamer(
         traces: SequenceCollection,
         rec_range: IndexRange,
         rec_density: int,
@@ -100,6 +101,8 @@ async def figure_search_result_streamer(
 
     rec_slice = slice(rec_start, rec_stop, rec_step)
 
+    writer = StreamFrameWriter()
+
     def _pack_run_data(run_: Run, traces_: list):
         _rec_range = (
             trcs_rec_range if record_range_missing or calc_total_ranges else rec_range
@@ -116,34 +119,33 @@ async def figure_search_result_streamer(
                 'props': get_run_props(run_),
             }
         }
-        encoded_tree = encode_tree(run_dict)
-        return collect_run_streamable_data(encoded_tree)
+        writer.write_tree(encode_tree(run_dict))
+        return writer.flush()
 
     if run_traces:
         for run_info in run_traces.values():
             traces_list = []
             for trace in run_info['traces']:
                 traces_list.append(get_trace_info(trace, rec_slice, rec_density))
-            yield _pack_run_data(run_info['run'], traces_list)
+            yield from _pack_run_data(run_info['run'], traces_list)
     else:
         for run_trace_collection in traces.iter_runs():
             traces_list = []
             for trace in run_trace_collection.iter():
                 traces_list.append(get_trace_info(trace, rec_slice, rec_density))
             if traces_list:
-                yield _pack_run_data(run_trace_collection.run, traces_list)
+                yield from _pack_run_data(run_trace_collection.run, traces_list)
 
 
 def figure_batch_result_streamer(uri_batch: List[str], repo: 'Repo'):
     uri_service = URIService(repo=repo)
-    batch_iterator = uri_service.request_batch(uri_batch=uri_batch)
-    for it in batch_iterator:
-        yield collect_run_streamable_data(encode_tree(it))
+    yield from stream_run_data(uri_service.request_batch_encoded(uri_batch=uri_batch))
 
 
 def requested_figure_object_traces_streamer(
         run: Run, requested_traces: List[TraceBase], rec_range, rec_num: int = 50
 ) -> List[dict]:
+    writer = StreamFrameWriter()
     for requested_trace in requested_traces:
         trace_name = requested_trace.name
         context = Context(requested_trace.context)
@@ -172,4 +174,5 @@ def requested_figure_object_traces_streamer(
             'record_range': (trace.first_step(), trace.last_step() + 1),
         }
         encoded_tree = encode_tree(trace_dict)
-        yield collect_run_streamable_data(encoded_tree)
+        writer.write_tree(encoded_tree)
+        yield from writer.flush()
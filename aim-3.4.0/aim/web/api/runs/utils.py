@@ -12,14 +12,25 @@ from aim.sdk.sequences.metric import Metric
 from aim.sdk.objects.distribution import Distribution
 from aim.sdk.objects.text import Text
 from aim.sdk.sequence_collection import SequenceCollection
+from aim.web.api.runs.downsampling import downsample
 from aim.web.api.runs.pydantic_models import AlignedRunIn, TraceBase
+from aim.storage.pyramid import bucket_extrema
 from aim.storage.treeutils import encode_tree
+from aim.storage.types import BLOB
 
 if TYPE_CHECKING:
     from aim.sdk import Repo
 
 IndexRange = namedtuple('IndexRange', ['start', 'stop'])
 
+# BLOBs (images, audios, figures) are streamed in pieces of this size
+BLOB_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# The sizes of keys and values in the streamed frames
+_FRAME_HEADER = struct.Struct('I')
+_FRAME_HEADER_SIZE = _FRAME_HEADER.size
+_pack_frame_header = _FRAME_HEADER.pack_into
+
 
 def str_to_range(range_str: str):
     defaults = [None, None]
@@ -47,6 +58,14 @@ def get_run_props(run: Run):
     }
 
 
+def collect_run_info(run: Run, sequences: Tuple[str, ...]) -> dict:
+    return {
+        'params': run.get(...),
+        'traces': run.collect_sequence_info(sequences, skip_last_value=True),
+        'props': get_run_props(run)
+    }
+
+
 def numpy_to_encodable(array: np.ndarray) -> Optional[dict]:
     encoded_numpy = {
         'type': 'numpy',
@@ -75,45 +94,199 @@ def sliced_np_array(array: np.ndarray, _slice: slice) -> np.ndarray:
         return array[_slice]
 
 
-def sliced_array(array: list, _slice: slice) -> list:
-    last_step_needed = (_slice.stop - 1) % _slice.step != 0
-    if last_step_needed:
-        last_value = array[-1]
-        return array[_slice] + [last_value]
-    else:
-        return array[_slice]
-
-
-def collect_x_axis_data(x_trace: Metric, iters: np.ndarray) -> Tuple[Optional[dict], Optional[dict]]:
+def collect_x_axis_arrays(x_trace: Metric, iters: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
     if not x_trace:
         return None, None
 
     x_axis_values = []
     x_axis_iters = []
-    for idx in iters:
-        try:
-            x_val = x_trace.values[idx.item()]
-        except KeyError:
-            x_val = None
+    for idx, x_val in zip(iters.tolist(), x_trace.values.take(iters).tolist()):
         if x_val:
-            x_axis_iters.append(idx.item())
+            x_axis_iters.append(idx)
             x_axis_values.append(x_val)
 
     if not x_axis_iters:
         return None, None
 
-    return numpy_to_encodable(np.array(x_axis_iters, dtype='float64')),\
-        numpy_to_encodable(np.array(x_axis_values, dtype='float64'))
+    return np.array(x_axis_iters, dtype='int64'), np.array(x_axis_values, dtype='float64')
+
+
+def collect_x_axis_data(x_trace: Metric, iters: np.ndarray) -> Tuple[Optional[dict], Optional[dict]]:
+    x_axis_iters, x_axis_values = collect_x_axis_arrays(x_trace, iters)
+    if x_axis_iters is None:
+        return None, None
+    return numpy_to_encodable(x_axis_iters), numpy_to_encodable(x_axis_values)
+
+
+# The numpy arrays of the sliced metric trace
+METRIC_TRACE_ARRAYS = ('values', 'iters', 'epochs', 'timestamps', 'x_axis_values', 'x_axis_iters')
+
+
+def get_sampling_buckets(trace: Metric, steps_num: int, sampling: str) -> Optional[np.ndarray]:
+    # The pyramid keeps the records holding the extrema of each bucket, the ones
+    # `minmax` sampling selects anyway. The other methods would pick different
+    # records out of them than out of the raw ones, so they read the raw records.
+    if sampling != 'minmax':
+        return None
+    return trace.pyramid_level(steps_num)
+
+
+def collect_sliced_metric_trace(run: Run,
+                                trace: Metric,
+                                steps_num: int,
+                                x_axis: Optional[str],
+                                sampling: str = 'stride') -> dict:
+    """Sample `steps_num` records of the trace, along with the values of the `x_axis` metric at the same steps.
+
+    The records are selected by the `sampling` method, see `aim.web.api.runs.downsampling`.
+    With `minmax` sampling the long traces are sampled from the records holding the
+    extrema of the buckets of the trace pyramid, the rest are sampled from the raw records.
+    The sampled data is returned as numpy arrays, see `METRIC_TRACE_ARRAYS`.
+    """
+    buckets = get_sampling_buckets(trace, steps_num, sampling)
+    if buckets is None:
+        iters, values = trace.values.sparse_numpy()
+        num_records = len(values)
+        indices = downsample(iters, values, steps_num, sampling)
+        epochs = trace.epochs.values_numpy()[indices]
+        timestamps = trace.timestamps.values_numpy()[indices]
+    else:
+        num_records = int(buckets['count'].sum())
+        iters, values, epochs, timestamps = bucket_extrema(buckets)
+        indices = downsample(iters, values, steps_num, sampling)
+        epochs, timestamps = epochs[indices], timestamps[indices]
+    step = (num_records // steps_num) or 1
+    sampled_iters = iters[indices]
+    x_axis_trace = run.get_metric(x_axis, trace.context) if x_axis else None
+    x_axis_iters, x_axis_values = collect_x_axis_arrays(x_axis_trace, sampled_iters)
+
+    return {
+        'name': trace.name,
+        'context': trace.context.to_dict(),
+        'slice': [0, num_records, step],
+        'values': values[indices],
+        'iters': sampled_iters,
+        'epochs': epochs,
+        'timestamps': timestamps,
+        'x_axis_values': x_axis_values,
+        'x_axis_iters': x_axis_iters,
+    }
+
+
+class StreamFrameWriter:
+    """Writes the encoded `(key, value)` records framed as
+    `<key size><key><value size><value>` into a buffer.
+
+    The buffer grows geometrically and the records are copied into it only
+    once, so the cost of framing is linear in the response size. The framed
+    data is taken out in pieces of at most `chunk_size` bytes. The data taken
+    out is detached from the buffer right away, so the writer can be written
+    to before the pieces are consumed.
+    """
+
+    def __init__(self, chunk_size: int = BLOB_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, size: int) -> int:
+        offset = self._size
+        required = offset + size
+        if required > len(self._buffer):
+            self._buffer.extend(bytes(max(required, 2 * len(self._buffer)) - len(self._buffer)))
+        self._size = required
+        return offset
+
+    def write(self, key: bytes, value: bytes):
+        if isinstance(value, BLOB):
+            value = value.load()
+        key_size = len(key)
+        value_size = len(value)
+        offset = self._reserve(2 * _FRAME_HEADER_SIZE + key_size + value_size)
+        buffer = self._buffer
+        _pack_frame_header(buffer, offset, key_size)
+        offset += _FRAME_HEADER_SIZE
+        buffer[offset:offset + key_size] = key
+        offset += key_size
+        _pack_frame_header(buffer, offset, value_size)
+        offset += _FRAME_HEADER_SIZE
+        buffer[offset:offset + value_size] = value
+
+    def write_header(self, key: bytes, value_size: int):
+        """Write the frame header only. The value is expected to follow in the stream."""
+        key_size = len(key)
+        offset = self._reserve(2 * _FRAME_HEADER_SIZE + key_size)
+        _pack_frame_header(self._buffer, offset, key_size)
+        offset += _FRAME_HEADER_SIZE
+        self._buffer[offset:offset + key_size] = key
+        _pack_frame_header(self._buffer, offset + key_size, value_size)
+
+    def write_tree(self, encoded_tree: Iterator[Tuple[bytes, bytes]]):
+        for key, value in encoded_tree:
+            self.write(key, value)
+
+    def _take(self, size: int) -> Iterator[bytes]:
+        # the rest of the data (less than a chunk, if any) is moved to a new buffer
+        taken, self._buffer = self._buffer, bytearray(self._buffer[size:self._size])
+        self._size -= size
+        return self._iter_pieces(taken, size)
+
+    def _iter_pieces(self, data: bytearray, size: int) -> Iterator[bytes]:
+        with memoryview(data) as view:
+            for offset in range(0, size, self.chunk_size):
+                yield bytes(view[offset:min(offset + self.chunk_size, size)])
+
+    def chunks(self) -> Iterator[bytes]:
+        """Take the full chunks out of the buffer, keeping the rest."""
+        return self._take(self._size - self._size % self.chunk_size)
+
+    def flush(self) -> Iterator[bytes]:
+        """Take all the buffered data out, in chunks of at most `chunk_size` bytes."""
+        return self._take(self._size)
+
+    def getvalue(self) -> bytes:
+        """Take all the buffered data out as a single piece."""
+        with memoryview(self._buffer) as view:
+            result = bytes(view[:self._size])
+        self._size = 0
+        return result
 
 
 def collect_run_streamable_data(encoded_tree: Iterator[Tuple[bytes, bytes]]) -> bytes:
-    result = bytes()
+    writer = StreamFrameWriter()
+    writer.write_tree(encoded_tree)
+    return writer.getvalue()
+
+
+def stream_run_data(encoded_tree: Iterator[Tuple[bytes, bytes]], chunk_size: int = BLOB_CHUNK_SIZE) -> Iterator[bytes]:
+    """Same as `collect_run_streamable_data`, but the result is streamed in
+    pieces of `chunk_size` bytes. BLOB values are streamed right after their
+    header instead of being copied into the buffer.
+
+    A BLOB is loaded as a whole (RocksDB values cannot be read partially),
+    and each piece of it is copied once more into a `bytes` object, as the
+    streaming response accepts no other buffer type. Thus the extra memory
+    per BLOB is bounded by `chunk_size` rather than by the BLOB size.
+    """
+    writer = StreamFrameWriter(chunk_size)
     for key, val in encoded_tree:
-        result += struct.pack('I', len(key)) + key + struct.pack('I', len(val)) + val
-    return result
+        if isinstance(val, BLOB):
+            data = val.load()
+            writer.write_header(key, len(data))
+            yield from writer.flush()
+            for chunk in val.iter_chunks(chunk_size):
+                yield bytes(chunk)
+        else:
+            writer.write(key, val)
+            yield from writer.chunks()
+    yield from writer.flush()
 
 
 def custom_aligned_metrics_streamer(requested_runs: List[AlignedRunIn], x_axis: str, repo: 'Repo') -> bytes:
+    writer = StreamFrameWriter()
     for run_data in requested_runs:
         run_hash = run_data.run_id
         requested_traces = run_data.traces
@@ -143,37 +316,26 @@ def custom_aligned_metrics_streamer(requested_runs: List[AlignedRunIn], x_axis:
             run_hash: traces_list
         }
         encoded_tree = encode_tree(run_dict)
-        yield collect_run_streamable_data(encoded_tree)
+        writer.write_tree(encoded_tree)
+        yield from writer.flush()
 
 
-async def metric_search_result_streamer(traces: SequenceCollection,
-                                        steps_num: int,
-                                        x_axis: Optional[str]) -> bytes:
+def metric_search_result_streamer(traces: SequenceCollection,
+                                  steps_num: int,
+                                  x_axis: Optional[str],
+                                  sampling: str = 'stride') -> bytes:
+    writer = StreamFrameWriter()
     for run_trace_collection in traces.iter_runs():
         run = None
         traces_list = []
         for trace in run_trace_collection.iter():
             if not run:
                 run = run_trace_collection.run
-            iters, values = trace.values.sparse_numpy()
-            num_records = len(values)
-            step = (num_records // steps_num) or 1
-            _slice = slice(0, num_records, step)
-            sliced_iters = sliced_np_array(iters, _slice)
-            x_axis_trace = run.get_metric(x_axis, trace.context) if x_axis else None
-            x_axis_iters, x_axis_values = collect_x_axis_data(x_axis_trace, sliced_iters)
-
-            traces_list.append({
-                'name': trace.name,
-                'context': trace.context.to_dict(),
-                'slice': [0, num_records, step],
-                'values': numpy_to_encodable(sliced_np_array(values, _slice)),
-                'iters': numpy_to_encodable(sliced_iters),
-                'epochs': numpy_to_encodable(sliced_np_array(trace.epochs.values_numpy(), _slice)),
-                'timestamps': numpy_to_encodable(sliced_np_array(trace.timestamps.values_numpy(), _slice)),
-                'x_axis_values': x_axis_values,
-                'x_axis_iters': x_axis_iters,
-            })
+            trace_dict = collect_sliced_metric_trace(run, trace, steps_num, x_axis, sampling)
+            for name in METRIC_TRACE_ARRAYS:
+                if trace_dict[name] is not None:
+                    trace_dict[name] = numpy_to_encodable(trace_dict[name])
+            traces_list.append(trace_dict)
 
         if run:
             run_dict = {
@@ -185,10 +347,12 @@ async def metric_search_result_streamer(traces: SequenceCollection,
             }
 
             encoded_tree = encode_tree(run_dict)
-            yield collect_run_streamable_data(encoded_tree)
+            writer.write_tree(encoded_tree)
+            yield from writer.flush()
 
 
 def run_search_result_streamer(runs: SequenceCollection, limit: int) -> bytes:
+    writer = StreamFrameWriter()
     run_count = 0
     for run_trace_collection in runs.iter_runs():
         run = run_trace_collection.run
@@ -201,14 +365,18 @@ def run_search_result_streamer(runs: SequenceCollection, limit: int) -> bytes:
         }
 
         encoded_tree = encode_tree(run_dict)
-        yield collect_run_streamable_data(encoded_tree)
+        writer.write_tree(encoded_tree)
+        yield from writer.flush()
 
         run_count += 1
         if limit and run_count >= limit:
             break
 
 
-def collect_requested_metric_traces(run: Run, requested_traces: List[TraceBase], steps_num: int = 200) -> List[dict]:
+def collect_requested_metric_traces(run: Run,
+                                    requested_traces: List[TraceBase],
+                                    steps_num: int = 200,
+                                    sampling: str = 'stride') -> List[dict]:
     processed_traces_list = []
     for requested_trace in requested_traces:
         metric_name = requested_trace.name
@@ -217,19 +385,21 @@ def collect_requested_metric_traces(run: Run, requested_traces: List[TraceBase],
         if not trace:
             continue
 
-        iters, values = trace.values.sparse_list()
+        buckets = get_sampling_buckets(trace, steps_num, sampling)
+        if buckets is None:
+            iters, values = trace.values.sparse_numpy()
+        else:
+            iters, values, _, _ = bucket_extrema(buckets)
+        indices = downsample(iters, values, steps_num, sampling)
 
-        values = list(map(lambda x: x if float('-inf') < x < float('inf') and x == x else None, values))
-
-        num_records = len(values)
-        step = (num_records // steps_num) or 1
-        _slice = slice(0, num_records, step)
+        values = list(map(lambda x: x if float('-inf') < x < float('inf') and x == x else None,
+                          values[indices].tolist()))
 
         processed_traces_list.append({
             'name': trace.name,
             'context': trace.context.to_dict(),
-            'values': sliced_array(values, _slice),
-            'iters': sliced_array(iters, _slice),
+            'values': values,
+            'iters': iters[indices].tolist(),
         })
 
     return processed_traces_list
@@ -247,6 +417,7 @@ def requested_distribution_traces_streamer(run: Run,
                                            requested_traces: List[TraceBase],
                                            rec_range,
                                            rec_num: int = 50) -> List[dict]:
+    writer = StreamFrameWriter()
     for requested_trace in requested_traces:
         trace_name = requested_trace.name
         context = Context(requested_trace.context)
@@ -272,7 +443,8 @@ def requested_distribution_traces_streamer(run: Run,
             'iters': steps,
         }
         encoded_tree = encode_tree(trace_dict)
-        yield collect_run_streamable_data(encoded_tree)
+        writer.write_tree(encoded_tree)
+        yield from writer.flush()
 
 
 def text_collection_to_encodable(text_record: Iterable[Text]):
@@ -298,6 +470,7 @@ def requested_text_traces_streamer(run: Run,
                                    requested_traces: List[TraceBase],
                                    rec_range, idx_range,
                                    rec_num: int = 50, idx_num: int = 5) -> List[dict]:
+    writer = StreamFrameWriter()
     for requested_trace in requested_traces:
         trace_name = requested_trace.name
         context = Context(requested_trace.context)
@@ -337,4 +510,5 @@ def requested_text_traces_streamer(run: Run,
             'iters': steps,
         }
         encoded_tree = encode_tree(trace_dict)
-        yield collect_run_streamable_data(encoded_tree)
+        writer.write_tree(encoded_tree)
+        yield from writer.flush()
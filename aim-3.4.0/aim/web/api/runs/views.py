@@ -1,4 +1,4 @@
-from fastapi import Depends, HTTPException, Query
+from fastapi import Depends, HTTPException, Query, Request
 from fastapi.responses import JSONResponse, StreamingResponse
 
 from aim.web.api.runs.audio_utils import (
@@ -6,20 +6,26 @@ from aim.web.api.runs.audio_utils import (
     audio_search_result_streamer,
     audios_batch_result_streamer
 )
-from aim.web.api.utils import APIRouter  # wrapper for fastapi.APIRouter
+from aim.web.api.utils import (
+    APIRouter,  # wrapper for fastapi.APIRouter
+    ConcurrencyLimit,
+    get_project,
+    iterate_in_storage_executor,
+    run_in_storage_executor,
+)
 from typing import Optional, Tuple
-
-from aim.web.api.projects.project import Project
 from aim.web.api.runs.utils import (
     collect_requested_metric_traces,
+    collect_run_info,
     requested_distribution_traces_streamer,
     requested_text_traces_streamer,
     custom_aligned_metrics_streamer,
-    get_run_props,
     metric_search_result_streamer,
     run_search_result_streamer,
     str_to_range,
 )
+from aim.web.api.runs.downsampling import DOWNSAMPLING_METHODS
+from aim.web.api.runs.columnar import COLUMNAR_MEDIA_TYPE, metric_search_columnar_streamer
 from aim.web.api.runs.image_utils import (
     requested_image_traces_streamer,
     image_search_result_streamer,
@@ -52,6 +58,7 @@ from aim.web.api.runs.pydantic_models import (
     URIBatchIn,
 )
 from aim.web.api.utils import object_factory
+from aim.web.api.cache import cached_streaming_response, normalize_query
 from aim.storage.query import syntax_error_check
 from aim.web.api.runs.figure_utils import (
     requested_figure_object_traces_streamer,
@@ -61,14 +68,27 @@ from aim.web.api.runs.figure_utils import (
 
 runs_router = APIRouter()
 
+# The searches go through the whole repo, so only a few of them are served at a time
+# for each endpoint, leaving the rest of the storage workers to the lighter requests.
+SEARCH_CONCURRENCY = 2
+BATCH_CONCURRENCY = 4
+
+run_search_limit = ConcurrencyLimit(SEARCH_CONCURRENCY)
+metric_align_limit = ConcurrencyLimit(SEARCH_CONCURRENCY)
+metric_search_limit = ConcurrencyLimit(SEARCH_CONCURRENCY)
+images_search_limit = ConcurrencyLimit(SEARCH_CONCURRENCY)
+audios_search_limit = ConcurrencyLimit(SEARCH_CONCURRENCY)
+figures_search_limit = ConcurrencyLimit(SEARCH_CONCURRENCY)
+blobs_batch_limit = ConcurrencyLimit(BATCH_CONCURRENCY)
+run_batch_limit = ConcurrencyLimit(BATCH_CONCURRENCY)
+
 
 @runs_router.get('/search/run/', response_model=RunSearchApiOut,
                  responses={400: {'model': QuerySyntaxErrorOut}})
-def run_search_api(q: Optional[str] = '', limit: Optional[int] = 0, offset: Optional[str] = None):
+async def run_search_api(request: Request,
+                         q: Optional[str] = '', limit: Optional[int] = 0, offset: Optional[str] = None):
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
+    project = await get_project()
 
     query = q.strip()
     try:
@@ -80,40 +100,46 @@ def run_search_api(q: Optional[str] = '', limit: Optional[int] = 0, offset: Opti
             'line': se.lineno,
             'offset': se.offset
         })
-    runs = project.repo.query_runs(query=query, paginated=bool(limit), offset=offset)
 
-    streamer = run_search_result_streamer(runs, limit)
-    return StreamingResponse(streamer)
+    def streamer_factory():
+        runs = project.repo.query_runs(query=query, paginated=bool(limit), offset=offset)
+        return run_search_result_streamer(runs, limit)
+
+    key = ('runs/search/run', normalize_query(query), limit, offset)
+    return await cached_streaming_response(request, project.repo, key, streamer_factory, run_search_limit)
 
 
 @runs_router.post('/search/metric/align/', response_model=RunMetricCustomAlignApiOut)
-def run_metric_custom_align_api(request_data: MetricAlignApiIn):
+async def run_metric_custom_align_api(request_data: MetricAlignApiIn):
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
+    project = await get_project()
 
     x_axis_metric_name = request_data.align_by
     requested_runs = request_data.runs
 
     streamer = custom_aligned_metrics_streamer(requested_runs, x_axis_metric_name, project.repo)
-    return StreamingResponse(streamer)
+    return StreamingResponse(iterate_in_storage_executor(streamer, metric_align_limit))
 
 
 @runs_router.get('/search/metric/', response_model=RunMetricSearchApiOut,
                  responses={400: {'model': QuerySyntaxErrorOut}})
-async def run_metric_search_api(q: Optional[str] = '',
+async def run_metric_search_api(request: Request,
+                                q: Optional[str] = '',
                                 p: Optional[int] = 50,
-                                x_axis: Optional[str] = None):
+                                x_axis: Optional[str] = None,
+                                sampling: Optional[str] = 'stride',
+                                response_format: Optional[str] = Query(None, alias='format')):
     steps_num = p
+    if sampling not in DOWNSAMPLING_METHODS:
+        raise HTTPException(status_code=400, detail='Invalid sampling method')
+    # the columnar format is requested either explicitly or by the Accept header
+    columnar = response_format == 'columnar' or COLUMNAR_MEDIA_TYPE in request.headers.get('accept', '')
 
     if x_axis:
         x_axis = x_axis.strip()
 
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
+    project = await get_project()
 
     query = q.strip()
     try:
@@ -126,10 +152,15 @@ async def run_metric_search_api(q: Optional[str] = '',
             'offset': se.offset
         })
 
-    traces = project.repo.query_metrics(query=query)
+    def streamer_factory():
+        traces = project.repo.query_metrics(query=query)
+        if columnar:
+            return metric_search_columnar_streamer(traces, steps_num, x_axis, sampling)
+        return metric_search_result_streamer(traces, steps_num, x_axis, sampling)
 
-    streamer = metric_search_result_streamer(traces, steps_num, x_axis)
-    return StreamingResponse(streamer)
+    key = ('runs/search/metric', normalize_query(query), steps_num, x_axis, sampling, columnar)
+    return await cached_streaming_response(request, project.repo, key, streamer_factory, metric_search_limit,
+                                           media_type=COLUMNAR_MEDIA_TYPE if columnar else None)
 
 
 @runs_router.get('/search/images/', response_model=RunImagesSearchApiOut,
@@ -139,9 +170,7 @@ async def run_images_search_api(q: Optional[str] = '',
                                 index_range: Optional[str] = '', index_density: Optional[int] = 5,
                                 calc_ranges: Optional[bool] = False):
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
+    project = await get_project()
 
     query = q.strip()
     try:
@@ -154,17 +183,18 @@ async def run_images_search_api(q: Optional[str] = '',
             'offset': se.offset
         })
 
-    traces = project.repo.query_images(query=query)
-
     try:
         record_range = str_to_range(record_range)
         index_range = str_to_range(index_range)
     except ValueError:
         raise HTTPException(status_code=400, detail='Invalid range format')
 
-    streamer = image_search_result_streamer(traces, record_range, record_density,
+    def streamer_factory():
+        traces = project.repo.query_images(query=query)
+        return image_search_result_streamer(traces, record_range, record_density,
                                             index_range, index_density, calc_ranges)
-    return StreamingResponse(streamer)
+
+    return StreamingResponse(iterate_in_storage_executor(streamer_factory, images_search_limit))
 
 
 @runs_router.get('/search/audios/', response_model=RunAudiosSearchApiOut,
@@ -174,9 +204,7 @@ async def run_audios_search_api(q: Optional[str] = '',
                                 index_range: Optional[str] = '', index_density: Optional[int] = 5,
                                 calc_ranges: Optional[bool] = False):
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
+    project = await get_project()
 
     query = q.strip()
     try:
@@ -189,17 +217,18 @@ async def run_audios_search_api(q: Optional[str] = '',
             'offset': se.offset
         })
 
-    traces = project.repo.query_audios(query=query)
-
     try:
         record_range = str_to_range(record_range)
         index_range = str_to_range(index_range)
     except ValueError:
         raise HTTPException(status_code=400, detail='Invalid range format')
 
-    streamer = audio_search_result_streamer(traces, record_range, record_density,
+    def streamer_factory():
+        traces = project.repo.query_audios(query=query)
+        return audio_search_result_streamer(traces, record_range, record_density,
                                             index_range, index_density, calc_ranges)
-    return StreamingResponse(streamer)
+
+    return StreamingResponse(iterate_in_storage_executor(streamer_factory, audios_search_limit))
 
 
 @runs_router.get('/search/figures/', response_model=RunFiguresSearchApiOut,
@@ -209,9 +238,7 @@ async def run_figures_search_api(q: Optional[str] = '',
                                  record_density: Optional[int] = 50,
                                  calc_ranges: Optional[bool] = False):
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
+    project = await get_project()
 
     query = q.strip()
     try:
@@ -224,54 +251,50 @@ async def run_figures_search_api(q: Optional[str] = '',
             'offset': se.offset
         })
 
-    traces = project.repo.query_figure_objects(query=query)
-
     try:
         record_range = str_to_range(record_range)
     except ValueError:
         raise HTTPException(status_code=400, detail='Invalid range format')
 
-    streamer = figure_search_result_streamer(traces, record_range, record_density, calc_ranges)
-    return StreamingResponse(streamer)
+    def streamer_factory():
+        traces = project.repo.query_figure_objects(query=query)
+        return figure_search_result_streamer(traces, record_range, record_density, calc_ranges)
+
+    return StreamingResponse(iterate_in_storage_executor(streamer_factory, figures_search_limit))
 
 
 @runs_router.post('/images/get-batch/')
-def image_blobs_batch_api(uri_batch: URIBatchIn):
+async def image_blobs_batch_api(uri_batch: URIBatchIn):
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
+    project = await get_project()
 
-    return StreamingResponse(images_batch_result_streamer(uri_batch, project.repo))
+    streamer = images_batch_result_streamer(uri_batch, project.repo)
+    return StreamingResponse(iterate_in_storage_executor(streamer, blobs_batch_limit))
 
 
 @runs_router.post('/audios/get-batch/')
-def audio_blobs_batch_api(uri_batch: URIBatchIn):
+async def audio_blobs_batch_api(uri_batch: URIBatchIn):
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
+    project = await get_project()
 
-    return StreamingResponse(audios_batch_result_streamer(uri_batch, project.repo))
+    streamer = audios_batch_result_streamer(uri_batch, project.repo)
+    return StreamingResponse(iterate_in_storage_executor(streamer, blobs_batch_limit))
 
 
 @runs_router.post('/figures/get-batch/')
-def figure_blobs_batch_api(uri_batch: URIBatchIn):
+async def figure_blobs_batch_api(uri_batch: URIBatchIn):
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
+    project = await get_project()
 
-    return StreamingResponse(figure_batch_result_streamer(uri_batch, project.repo))
+    streamer = figure_batch_result_streamer(uri_batch, project.repo)
+    return StreamingResponse(iterate_in_storage_executor(streamer, blobs_batch_limit))
 
 
 @runs_router.get('/{run_id}/info/', response_model=RunInfoOut)
 async def run_params_api(run_id: str, sequence: Optional[Tuple[str, ...]] = Query(())):
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
-    run = project.repo.get_run(run_id)
+    project = await get_project()
+    run = await run_in_storage_executor(project.repo.get_run, run_id)
     if not run:
         raise HTTPException(status_code=404)
 
@@ -283,25 +306,25 @@ async def run_params_api(run_id: str, sequence: Optional[Tuple[str, ...]] = Quer
     else:
         sequence = project.repo.available_sequence_types()
 
-    response = {
-        'params': run.get(...),
-        'traces': run.collect_sequence_info(sequence, skip_last_value=True),
-        'props': get_run_props(run)
-    }
+    async with run_batch_limit:
+        response = await run_in_storage_executor(collect_run_info, run, sequence)
     return JSONResponse(response)
 
 
 @runs_router.post('/{run_id}/metric/get-batch/', response_model=RunMetricsBatchApiOut)
-async def run_metric_batch_api(run_id: str, requested_traces: RunTracesBatchApiIn):
+async def run_metric_batch_api(run_id: str, requested_traces: RunTracesBatchApiIn,
+                               p: Optional[int] = 200, sampling: Optional[str] = 'stride'):
+    if sampling not in DOWNSAMPLING_METHODS:
+        raise HTTPException(status_code=400, detail='Invalid sampling method')
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
-    run = project.repo.get_run(run_id)
+    project = await get_project()
+    run = await run_in_storage_executor(project.repo.get_run, run_id)
     if not run:
         raise HTTPException(status_code=404)
 
-    traces_data = collect_requested_metric_traces(run, requested_traces)
+    async with run_batch_limit:
+        traces_data = await run_in_storage_executor(collect_requested_metric_traces, run, requested_traces,
+                                                    p, sampling)
 
     return JSONResponse(traces_data)
 
@@ -312,10 +335,8 @@ async def run_images_batch_api(run_id: str,
                                record_range: Optional[str] = '', record_density: Optional[int] = 50,
                                index_range: Optional[str] = '', index_density: Optional[int] = 5):
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
-    run = project.repo.get_run(run_id)
+    project = await get_project()
+    run = await run_in_storage_executor(project.repo.get_run, run_id)
     if not run:
         raise HTTPException(status_code=404)
 
@@ -329,7 +350,7 @@ async def run_images_batch_api(run_id: str,
                                                       record_range, index_range,
                                                       record_density, index_density)
 
-    return StreamingResponse(traces_streamer)
+    return StreamingResponse(iterate_in_storage_executor(traces_streamer, run_batch_limit))
 
 
 @runs_router.post('/{run_id}/audios/get-batch/', response_model=RunAudiosBatchApiOut)
@@ -338,10 +359,8 @@ async def run_audios_batch_api(run_id: str,
                                record_range: Optional[str] = '', record_density: Optional[int] = 50,
                                index_range: Optional[str] = '', index_density: Optional[int] = 5):
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
-    run = project.repo.get_run(run_id)
+    project = await get_project()
+    run = await run_in_storage_executor(project.repo.get_run, run_id)
     if not run:
         raise HTTPException(status_code=404)
 
@@ -355,7 +374,7 @@ async def run_audios_batch_api(run_id: str,
                                                       record_range, index_range,
                                                       record_density, index_density)
 
-    return StreamingResponse(traces_streamer)
+    return StreamingResponse(iterate_in_storage_executor(traces_streamer, run_batch_limit))
 
 
 @runs_router.post('/{run_id}/figures/get-batch/', response_model=RunFiguresBatchApiOut)
@@ -364,10 +383,8 @@ async def run_figures_batch_api(run_id: str,
                                 record_range: Optional[str] = '',
                                 record_density: Optional[int] = 50):
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
-    run = project.repo.get_run(run_id)
+    project = await get_project()
+    run = await run_in_storage_executor(project.repo.get_run, run_id)
     if not run:
         raise HTTPException(status_code=404)  # Get project
 
@@ -381,7 +398,7 @@ async def run_figures_batch_api(run_id: str,
                                                               record_range,
                                                               record_density)
 
-    return StreamingResponse(traces_streamer)
+    return StreamingResponse(iterate_in_storage_executor(traces_streamer, run_batch_limit))
 
 
 @runs_router.post('/{run_id}/distributions/get-batch/', response_model=RunDistributionsBatchApiOut)
@@ -390,10 +407,8 @@ async def run_distributions_batch_api(run_id: str,
                                       record_range: Optional[str] = '',
                                       record_density: Optional[int] = 50):
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
-    run = project.repo.get_run(run_id)
+    project = await get_project()
+    run = await run_in_storage_executor(project.repo.get_run, run_id)
     if not run:
         raise HTTPException(status_code=404)
     try:
@@ -403,7 +418,7 @@ async def run_distributions_batch_api(run_id: str,
 
     traces_streamer = requested_distribution_traces_streamer(run, requested_traces, record_range, record_density)
 
-    return StreamingResponse(traces_streamer)
+    return StreamingResponse(iterate_in_storage_executor(traces_streamer, run_batch_limit))
 
 
 @runs_router.post('/{run_id}/texts/get-batch/', response_model=RunTextsBatchApiOut)
@@ -412,10 +427,8 @@ async def run_texts_batch_api(run_id: str,
                               record_range: Optional[str] = '', record_density: Optional[int] = 50,
                               index_range: Optional[str] = '', index_density: Optional[int] = 5):
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
-    run = project.repo.get_run(run_id)
+    project = await get_project()
+    run = await run_in_storage_executor(project.repo.get_run, run_id)
     if not run:
         raise HTTPException(status_code=404)
 
@@ -429,7 +442,7 @@ async def run_texts_batch_api(run_id: str,
                                                      record_range, index_range,
                                                      record_density, index_density)
 
-    return StreamingResponse(traces_streamer)
+    return StreamingResponse(iterate_in_storage_executor(traces_streamer, run_batch_limit))
 
 
 @runs_router.put('/{run_id}/', response_model=StructuredRunUpdateOut)
@@ -489,10 +502,8 @@ async def remove_run_tag_api(run_id: str, tag_id: str, factory=Depends(object_fa
 @runs_router.delete('/{run_id}/')
 async def delete_run_api(run_id: str):
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
-    success = project.repo.delete_run(run_id)
+    project = await get_project()
+    success = await run_in_storage_executor(project.repo.delete_run, run_id)
     if not success:
         raise HTTPException(400, detail=f'Error while deleting run {run_id}.')
 
@@ -505,10 +516,8 @@ async def delete_run_api(run_id: str):
 @runs_router.post('/delete-batch/')
 async def delete_runs_batch_api(runs_batch: RunsBatchIn):
     # Get project
-    project = Project()
-    if not project.exists():
-        raise HTTPException(status_code=404)
-    success, remaining_runs = project.repo.delete_runs(runs_batch)
+    project = await get_project()
+    success, remaining_runs = await run_in_storage_executor(project.repo.delete_runs, runs_batch)
     if not success:
         raise HTTPException(400, detail={'message': 'Error while deleting runs.',
                                          'remaining_runs': remaining_runs})
@@ -1,10 +1,23 @@
+import asyncio
 import datetime
+import functools
+import os
 import pytz
 
+from concurrent.futures import ThreadPoolExecutor
+
 from fastapi import APIRouter as FastAPIRouter
 from fastapi import HTTPException
 from fastapi.types import DecoratedCallable
-from typing import Any, Callable
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, Union
+
+from aim.web.configs import AIM_UI_STORAGE_WORKERS_KEY
+
+# Number of threads serving the blocking storage work (RocksDB reads, SQL queries, query evaluation)
+DEFAULT_STORAGE_WORKERS = 16
+
+_storage_executor: Optional[ThreadPoolExecutor] = None
+_STREAM_END = object()
 
 
 def object_factory():
@@ -16,6 +29,97 @@ def object_factory():
     return project.repo.structured_db
 
 
+async def get_project():
+    """Gets the project in the storage executor, raises 404 if its repo doesn't exist."""
+    from aim.web.api.projects.project import Project
+
+    def _get_project():
+        project = Project()
+        return project if project.exists() else None
+
+    project = await run_in_storage_executor(_get_project)
+    if project is None:
+        raise HTTPException(status_code=404)
+    return project
+
+
+def get_storage_executor() -> ThreadPoolExecutor:
+    global _storage_executor
+    if _storage_executor is None:
+        max_workers = int(os.environ.get(AIM_UI_STORAGE_WORKERS_KEY, DEFAULT_STORAGE_WORKERS))
+        _storage_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='aim-storage')
+    return _storage_executor
+
+
+async def run_in_storage_executor(func: Callable, *args, **kwargs) -> Any:
+    """Runs the blocking call in the storage executor, so that the event loop keeps serving other requests."""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(get_storage_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def iterate_in_storage_executor(iterator: Union[Iterator, Callable[[], Iterator]],
+                                      limit: Optional['ConcurrencyLimit'] = None) -> AsyncIterator:
+    """Produces the items of the blocking iterator in the storage executor.
+
+    The iterator can be passed as a factory, e.g. when creating it queries the storage.
+    The factory is then called in the storage executor as well. The endpoint concurrency
+    `limit`, if given, is held from creating the iterator until it is exhausted.
+    """
+    if limit is not None:
+        await limit.acquire()
+    producing = False
+    try:
+        if callable(iterator):
+            producing = True
+            iterator = await run_in_storage_executor(iterator)
+            producing = False
+        while True:
+            producing = True
+            item = await run_in_storage_executor(next, iterator, _STREAM_END)
+            producing = False
+            if item is _STREAM_END:
+                break
+            yield item
+    finally:
+        # the client went away; a generator can't be closed while it is still producing an item
+        close = getattr(iterator, 'close', None)
+        if close is not None and not producing:
+            close()
+        if limit is not None:
+            limit.release()
+
+
+class ConcurrencyLimit:
+    """Limits the number of requests of an endpoint doing storage work at the same time.
+
+    The requests over the limit wait for their turn, so that a few heavy
+    requests can not take all the storage workers.
+    """
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # created lazily to be bound to the event loop of the server
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def acquire(self):
+        await self.semaphore.acquire()
+
+    def release(self):
+        self.semaphore.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
 def datetime_now():
     return datetime.datetime.utcnow().replace(tzinfo=pytz.utc)
 
@@ -6,3 +6,5 @@ AIM_ENV_MODE_KEY = '__AIM_ENV_MODE__'
 AIM_UI_MOUNTED_REPO_PATH = '__AIM_UI_MOUNT_REPO_PATH__'
 AIM_UI_TELEMETRY_KEY = 'AIM_UI_TELEMETRY_ENABLED'
 AIM_UI_BASE_PATH = '__AIM_UI_BASE_PATH__'
+AIM_UI_STORAGE_WORKERS_KEY = 'AIM_UI_STORAGE_WORKERS'
+AIM_UI_RESPONSE_CACHE_SIZE_KEY = 'AIM_UI_RESPONSE_CACHE_SIZE'
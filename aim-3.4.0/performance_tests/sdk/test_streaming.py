@@ -0,0 +1,18 @@
+from parameterized import parameterized
+
+from performance_tests.base import TestBase
+from performance_tests.utils import get_baseline, write_baseline
+from performance_tests.sdk.utils import generate_metric_search_response, stream_run_dicts
+
+
+class TestStreamingExecutionTime(TestBase):
+    @parameterized.expand([(10,), (50,), (200,)])
+    def test_stream_metric_search_response(self, size_mb):
+        run_dicts = generate_metric_search_response(size_mb)
+        execution_time = stream_run_dicts(run_dicts)
+        test_name = f'test_stream_metric_search_response_{size_mb}mb'
+        baseline = get_baseline(test_name)
+        if baseline:
+            self.assertInRange(execution_time, baseline)
+        else:
+            write_baseline(test_name, execution_time)
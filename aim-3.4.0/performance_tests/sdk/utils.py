@@ -1,5 +1,8 @@
+import numpy as np
+
 from aim.sdk import Repo
-from aim.web.api.runs.utils import get_run_props
+from aim.storage.treeutils import encode_tree
+from aim.web.api.runs.utils import StreamFrameWriter, get_run_props, numpy_to_encodable
 from performance_tests.utils import timing
 
 
@@ -56,3 +59,36 @@ def query_metrics(query):
     repo = Repo.default_repo()
     metrics = list(repo.query_metrics(query=query).iter())
 
+
+def generate_metric_search_response(size_mb, runs_count=100, traces_count=10):
+    """Generates the run dicts of metric search response of about `size_mb` megabytes."""
+    rnd = np.random.default_rng(0)
+    # values, iters, epochs and timestamps of float64
+    trace_length = size_mb * 1024 * 1024 // (runs_count * traces_count * 4 * 8)
+    run_dicts = []
+    for run_idx in range(runs_count):
+        traces_list = [{
+            'name': f'metric {trace_idx}',
+            'context': {'subset': 'train'},
+            'slice': [0, trace_length, 1],
+            'values': numpy_to_encodable(rnd.random(trace_length)),
+            'iters': numpy_to_encodable(np.arange(trace_length, dtype='float64')),
+            'epochs': numpy_to_encodable(np.zeros(trace_length)),
+            'timestamps': numpy_to_encodable(rnd.random(trace_length)),
+        } for trace_idx in range(traces_count)]
+        run_dicts.append({
+            f'{run_idx:024x}': {
+                'params': {'hparams': {'lr': 0.01, 'batch_size': 32}},
+                'traces': traces_list,
+            }
+        })
+    return run_dicts
+
+
+@timing()
+def stream_run_dicts(run_dicts):
+    writer = StreamFrameWriter()
+    for run_dict in run_dicts:
+        writer.write_tree(encode_tree(run_dict))
+        for _ in writer.flush():
+            pass
@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+
+from parameterized import parameterized
+
+from performance_tests.base import TestBase
+from performance_tests.utils import get_baseline, write_baseline
+from performance_tests.storage.utils import (
+    get_compression_db_options,
+    get_dir_size,
+    read_synthetic_container,
+    write_synthetic_container,
+)
+
+# `None` stands for the per-profile policy of `aim.storage.rocksprofile`
+COMPRESSION_POLICIES = {
+    'none': 'no_compression',
+    'snappy': 'snappy_compression',
+    'lz4': 'lz4_compression',
+    'zstd': 'zstd_compression',
+    'profile': None,
+}
+
+
+class TestCompression(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        super().tearDown()
+
+    @parameterized.expand([
+        (profile, policy)
+        for profile in ('meta', 'seqs')
+        for policy in COMPRESSION_POLICIES
+    ])
+    def test_compression(self, profile, policy):
+        path = os.path.join(self.path, profile)
+        db_opts = get_compression_db_options(profile, COMPRESSION_POLICIES[policy])
+        write_synthetic_container(path, profile, db_opts)
+
+        for test_name, value in (
+            (f'test_compression_size_{profile}_{policy}', get_dir_size(path)),
+            (f'test_compression_read_{profile}_{policy}', read_synthetic_container(path, db_opts)),
+        ):
+            baseline = get_baseline(test_name)
+            if baseline:
+                self.assertInRange(value, baseline)
+            else:
+                write_baseline(test_name, value)
@@ -0,0 +1,37 @@
+from parameterized import parameterized
+
+from performance_tests.base import TestBase
+from performance_tests.utils import get_baseline, write_baseline
+from performance_tests.storage.utils import (
+    decode_param_trees,
+    encode_param_trees,
+    generate_param_tree,
+    get_encoded_param_trees,
+    unfold_param_trees,
+)
+
+# shape: number of trees
+PARAM_TREES = {
+    'deep': 100,
+    'wide': 10,
+    # the params of the runs table page
+    'run': 10000,
+}
+
+
+class TestTreeFolding(TestBase):
+    @parameterized.expand(PARAM_TREES.items())
+    def test_tree_folding(self, shape, trees_count):
+        trees = [generate_param_tree(shape, seed) for seed in range(trees_count)]
+        encoded_trees = get_encoded_param_trees(trees)
+
+        for test_name, execution_time in (
+            (f'test_decode_tree_{shape}', decode_param_trees(encoded_trees)),
+            (f'test_unfold_tree_{shape}', unfold_param_trees(trees)),
+            (f'test_encode_tree_{shape}', encode_param_trees(trees)),
+        ):
+            baseline = get_baseline(test_name)
+            if baseline:
+                self.assertInRange(execution_time, baseline)
+            else:
+                write_baseline(test_name, execution_time)
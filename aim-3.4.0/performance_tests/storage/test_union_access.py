@@ -0,0 +1,18 @@
+from aim import Repo
+
+from performance_tests.base import StorageTestBase
+from performance_tests.utils import get_baseline, write_baseline
+from performance_tests.storage.utils import access_union_run_params, collect_sequence_containers
+
+
+class TestUnionAccess(StorageTestBase):
+    def test_union_access(self):
+        test_name = 'test_union_access'
+        repo = Repo.default_repo()
+        run_hashes = collect_sequence_containers()
+        execution_time = access_union_run_params(repo, run_hashes)
+        baseline = get_baseline(test_name)
+        if baseline:
+            self.assertInRange(execution_time, baseline)
+        else:
+            write_baseline(test_name, execution_time)
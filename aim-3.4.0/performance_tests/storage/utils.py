@@ -1,6 +1,13 @@
+import os
+import random
+
+import aimrocks
+
 from aim import Repo
 from aim.sdk.configs import get_aim_repo_name
-from aim.storage.rockscontainer import RocksContainer
+from aim.storage.encoding import encode, encode_path
+from aim.storage.rockscontainer import RocksContainer, BLOB_DOMAIN
+from aim.storage.treeutils import decode_tree, encode_tree, unfold_tree
 
 from performance_tests.utils import timing
 
@@ -34,6 +41,131 @@ def iterative_access_metric_values(repo, query):
         _ = trace.values.values_numpy()
 
 
+@timing()
+def access_union_run_params(repo, run_hashes):
+    # point reads of the run params through the union of the meta containers,
+    # each one accessing the shards of the union
+    meta_tree = repo._get_meta_tree()
+    for run_hash in run_hashes:
+        for _ in range(100):
+            meta_tree.get(('chunks', run_hash, 'end_time'))
+
+
 def collect_sequence_containers():
     repo = Repo.default_repo()
     return [run.hash for run in repo.iter_runs()]
+
+
+def get_dir_size(path):
+    size = 0
+    for root, _, files in os.walk(path):
+        for file_name in files:
+            size += os.path.getsize(os.path.join(root, file_name))
+    return size
+
+
+def get_compression_db_options(profile, compression):
+    db_opts = RocksContainer('', read_only=True, profile=profile)._db_opts
+    if compression is None:
+        # the profile policy
+        return db_opts
+    db_opts.pop('compression_opts', None)
+    db_opts['compression'] = getattr(aimrocks.CompressionType, compression)
+    return db_opts
+
+
+def write_synthetic_container(path, profile, db_opts, runs_count=20, seed=0):
+    """Fills the container with records resembling the ones in the given repo storage.
+
+    `meta` containers get run params, `seqs` containers get metric values along
+    with some incompressible BLOBs standing for PNG/JPEG images.
+    """
+    rnd = random.Random(seed)
+    db = aimrocks.DB(path, aimrocks.Options(**db_opts), read_only=False)
+    for run_idx in range(runs_count):
+        run_hash = f'{run_idx:024x}'
+        batch = aimrocks.WriteBatch()
+        if profile == 'seqs':
+            for metric_idx in range(5):
+                for step in range(2000):
+                    key = encode_path(('seqs', 'chunks', run_hash, 0, f'metric {metric_idx}', 'val', step))
+                    batch.put(key, encode(rnd.random()))
+            for step in range(20):
+                key = encode_path(('seqs', 'chunks', run_hash, 0, 'images', 'val', step, 'data'))
+                batch.put(key, b'')
+                batch.put(BLOB_DOMAIN + key, encode(rnd.getrandbits(64 * 1024 * 8).to_bytes(64 * 1024, 'little')))
+        else:
+            params = {
+                'hparams': {'lr': rnd.choice([0.1, 0.01, 0.001]), 'batch_size': rnd.choice([32, 64, 128]),
+                            'optimizer': rnd.choice(['adam', 'sgd']), 'layers': [64, 128, 256, 512]},
+                'dataset': {'name': 'cifar10', 'path': '/data/datasets/cifar10', 'split': [0.8, 0.1, 0.1]},
+                'name': f'Run # {run_idx}',
+            }
+            for key, val in encode_tree({'meta': {'chunks': {run_hash: {'attrs': params}}}}):
+                batch.put(key, val)
+        db.write(batch)
+    db.compact_range()
+    del db
+
+
+@timing()
+def read_synthetic_container(path, db_opts):
+    db = aimrocks.DB(path, aimrocks.Options(**db_opts), read_only=True)
+    it = db.iteritems()
+    it.seek_to_first()
+    for _ in it:
+        pass
+    del db
+
+
+def generate_param_tree(shape, seed=0):
+    """Generates the run params of the given shape.
+
+    `deep` trees are nested 64 levels down, `wide` trees have a few thousands
+    of params at the top levels, `run` trees resemble the params of a typical run.
+    """
+    rnd = random.Random(seed)
+    if shape == 'deep':
+        tree = node = {}
+        for level in range(64):
+            node['lr'] = rnd.random()
+            node['name'] = f'level {level}'
+            node['child'] = {}
+            node = node['child']
+    elif shape == 'wide':
+        tree = {f'param {idx}': {'lr': rnd.random(), 'batch_size': rnd.randint(1, 512), 'layers': [64, 128, 256],
+                                 'name': f'param {idx}', 'enabled': rnd.random() > 0.5}
+                for idx in range(2000)}
+    else:
+        tree = {
+            'hparams': {'lr': rnd.random(), 'batch_size': rnd.choice([32, 64, 128]),
+                        'optimizer': rnd.choice(['adam', 'sgd']), 'layers': [64, 128, 256, 512]},
+            'dataset': {'name': 'cifar10', 'path': '/data/datasets/cifar10', 'split': [0.8, 0.1, 0.1]},
+            'name': f'Run # {rnd.randint(0, 10000)}',
+        }
+    return tree
+
+
+def get_encoded_param_trees(trees):
+    # records are sorted the way they are read from the container
+    return [sorted(encode_tree(tree)) for tree in trees]
+
+
+@timing()
+def encode_param_trees(trees):
+    for tree in trees:
+        for _ in encode_tree(tree):
+            pass
+
+
+@timing()
+def decode_param_trees(encoded_trees):
+    for records in encoded_trees:
+        decode_tree(iter(records))
+
+
+@timing()
+def unfold_param_trees(trees):
+    for tree in trees:
+        for _ in unfold_tree(tree):
+            pass
@@ -155,6 +155,11 @@ setup(
             'aim.storage.treeutils_',
             ['aim/storage/treeutils_.pyx'],
             language='c++'
+        ),
+        Extension(
+            'aim.storage.union_',
+            ['aim/storage/union_.pyx'],
+            language='c++'
         )
     ],
     entry_points={
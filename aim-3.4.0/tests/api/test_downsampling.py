@@ -0,0 +1,69 @@
+import numpy as np
+
+from parameterized import parameterized
+
+from tests.base import PrefilledDataApiTestBase, TestBase
+
+from aim.sdk import Run
+from aim.web.api.runs.downsampling import downsample
+
+
+class TestDownsampling(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.iters = np.arange(100000)
+        self.values = np.sin(self.iters / 1000)
+        self.values[54321] = 10.0
+
+    @parameterized.expand([('minmax',), ('lttb',)])
+    def test_spikes_kept(self, method):
+        indices = downsample(self.iters, self.values, 200, method)
+        self.assertIn(54321, indices)
+        self.assertLessEqual(len(indices), 202)
+        self.assertEqual(0, indices[0])
+        self.assertEqual(99999, indices[-1])
+        self.assertTrue(np.all(np.diff(indices) > 0))
+
+    def test_stride(self):
+        indices = downsample(self.iters, self.values, 200, 'stride')
+        self.assertNotIn(54321, indices)
+        self.assertListEqual(list(range(0, 100000, 500)) + [99999], indices.tolist())
+
+    @parameterized.expand([('stride',), ('minmax',), ('lttb',)])
+    def test_short_traces(self, method):
+        for num_records in (0, 1, 2, 50):
+            indices = downsample(self.iters[:num_records], self.values[:num_records], 50, method)
+            self.assertListEqual(list(range(num_records)), indices.tolist())
+
+
+class TestDownsampledMetricsApi(PrefilledDataApiTestBase):
+    def test_metric_batch_api_sampling(self):
+        run = next(iter(self.repo.iter_runs()))
+        requested_traces = [{'name': 'loss', 'context': {'is_training': True, 'subset': 'train'}}]
+        for sampling in ('stride', 'minmax', 'lttb'):
+            response = self.client.post(f'/api/runs/{run.hash}/metric/get-batch/',
+                                        params={'p': 10, 'sampling': sampling}, json=requested_traces)
+            self.assertEqual(200, response.status_code)
+            trace = response.json()[0]
+            self.assertEqual(0, trace['iters'][0])
+            self.assertEqual(99, trace['iters'][-1])
+            self.assertEqual(len(trace['iters']), len(trace['values']))
+
+        response = self.client.post(f'/api/runs/{run.hash}/metric/get-batch/',
+                                    params={'sampling': 'median'}, json=requested_traces)
+        self.assertEqual(400, response.status_code)
+
+    def test_stride_sampling_of_long_trace(self):
+        # long traces have a downsampling pyramid, which is used for `minmax` sampling only
+        run = Run(system_tracking_interval=None)
+        for step in range(2000):
+            run.track(float(step % 7), name='long_loss', step=step)
+        run.finalize()
+
+        requested_traces = [{'name': 'long_loss', 'context': {}}]
+        response = self.client.post(f'/api/runs/{run.hash}/metric/get-batch/',
+                                    params={'p': 10, 'sampling': 'stride'}, json=requested_traces)
+        self.assertEqual(200, response.status_code)
+        trace = response.json()[0]
+        self.assertListEqual(list(range(0, 2000, 200)) + [1999], trace['iters'])
+        self.assertListEqual([float(step % 7) for step in trace['iters']], trace['values'])
@@ -0,0 +1,47 @@
+from tests.base import PrefilledDataApiTestBase, TestBase
+
+from aim.web.api.cache import ResponseCache, normalize_query
+
+
+class TestResponseCache(TestBase):
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_size=10, max_entry_size=6)
+        cache.put('a', b'aaaa')
+        cache.put('b', b'bbbb')
+        self.assertEqual(b'aaaa', cache.get('a'))  # `b` is the least recently used now
+        cache.put('c', b'cccc')
+        self.assertNotIn('b', cache)
+        self.assertEqual(8, cache.size)
+
+        cache.put('d', b'd' * 7)  # too large to be cached
+        self.assertNotIn('d', cache)
+        self.assertListEqual([b'aaaa', b'cccc'], [cache.get('a'), cache.get('c')])
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query('run.hparams.lr>0.1 and metric.name=="loss"'),
+                         normalize_query(' run.hparams.lr > 0.1  and  metric.name == "loss" '))
+        self.assertNotEqual(normalize_query('metric.name == "loss"'), normalize_query('metric.name == "loss "'))
+
+
+class TestCachedSearchApi(PrefilledDataApiTestBase):
+    def test_search_revalidation(self):
+        client = self.client
+        params = {'q': 'run["name"] == "Run # 3"'}
+
+        response = client.get('/api/runs/search/metric/', params=params)
+        self.assertEqual(200, response.status_code)
+        etag = response.headers['etag']
+        content = response.content
+
+        response = client.get('/api/runs/search/metric/', params=params, headers={'If-None-Match': etag})
+        self.assertEqual(304, response.status_code)
+        response = client.get('/api/runs/search/metric/', params=params)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(content, response.content)
+
+        # any change of the repo data invalidates the response
+        with self.repo.structured_db as db:
+            db.create_experiment('Cached search experiment')
+        response = client.get('/api/runs/search/metric/', params=params, headers={'If-None-Match': etag})
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response.headers['etag'])
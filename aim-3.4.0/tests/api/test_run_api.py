@@ -7,6 +7,7 @@ from tests.utils import decode_encoded_tree_stream
 
 from aim.storage.treeutils import decode_tree
 from aim.sdk.run import Run
+from aim.web.api.runs.columnar import COLUMNAR_MEDIA_TYPE, iter_columnar_stream
 
 
 class TestRunApi(PrefilledDataApiTestBase):
@@ -98,6 +99,30 @@ class TestRunApi(PrefilledDataApiTestBase):
                 self.assertEqual(0.0, array[0])
                 self.assertEqual(expected_step_count, len(array))
 
+    def test_search_metrics_api_columnar(self):
+        client = self.client
+
+        response = client.get('/api/runs/search/metric/', params={'q': 'run["name"] == "Run # 3"'})
+        decoded_response = decode_tree(decode_encoded_tree_stream(response.iter_content(chunk_size=512*1024)))
+
+        response = client.get('/api/runs/search/metric/', params={'q': 'run["name"] == "Run # 3"'},
+                              headers={'Accept': COLUMNAR_MEDIA_TYPE})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(COLUMNAR_MEDIA_TYPE, response.headers['content-type'])
+        columnar_response = list(iter_columnar_stream(response.iter_content(chunk_size=1024)))
+
+        self.assertEqual(len(decoded_response), len(columnar_response))
+        for run in columnar_response:
+            expected_run = decoded_response[run['hash']]
+            self.assertEqual(expected_run['params'], run['params'])
+            self.assertEqual(len(expected_run['traces']), len(run['traces']))
+            for expected_trace, trace in zip(expected_run['traces'], run['traces']):
+                self.assertEqual(expected_trace['name'], trace['name'])
+                self.assertEqual(expected_trace['slice'], trace['slice'])
+                for column in ('values', 'iters', 'epochs', 'timestamps'):
+                    expected = np.frombuffer(expected_trace[column]['blob'], dtype='float64')
+                    self.assertListEqual(expected.tolist(), trace[column].astype('float64').tolist())
+
     def test_search_aligned_metrics_api(self):
         client = self.client
         run_hashes = []
@@ -0,0 +1,50 @@
+import asyncio
+import threading
+
+from tests.base import TestBase
+
+from aim.web.api.utils import ConcurrencyLimit, iterate_in_storage_executor
+
+
+class TestStorageExecutor(TestBase):
+    def test_iterate_in_storage_executor(self):
+        limit = ConcurrencyLimit(2)
+        active = []
+        max_active = []
+
+        def streamer():
+            for _ in range(3):
+                active.append(1)
+                max_active.append(len(active))
+                yield threading.current_thread().name
+                active.pop()
+
+        async def consume():
+            return [name async for name in iterate_in_storage_executor(streamer(), limit)]
+
+        async def consume_all():
+            return await asyncio.gather(*(consume() for _ in range(5)))
+
+        results = asyncio.run(consume_all())
+        for thread_names in results:
+            self.assertEqual(3, len(thread_names))
+            for name in thread_names:
+                self.assertTrue(name.startswith('aim-storage'))
+        self.assertLessEqual(max(max_active), 2)
+        self.assertEqual(2, limit.semaphore._value)
+
+    def test_iterator_factory_called_in_storage_executor(self):
+        limit = ConcurrencyLimit(1)
+        factory_threads = []
+
+        def streamer_factory():
+            factory_threads.append(threading.current_thread().name)
+            return iter(range(3))
+
+        async def consume():
+            return [item async for item in iterate_in_storage_executor(streamer_factory, limit)]
+
+        self.assertEqual([0, 1, 2], asyncio.run(consume()))
+        self.assertEqual(1, len(factory_threads))
+        self.assertTrue(factory_threads[0].startswith('aim-storage'))
+        self.assertEqual(1, limit.semaphore._value)
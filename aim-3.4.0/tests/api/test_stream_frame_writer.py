@@ -0,0 +1,28 @@
+from tests.base import TestBase
+from tests.utils import decode_encoded_tree_stream
+
+from aim.storage.treeutils import decode_tree, encode_tree
+from aim.storage.types import BLOB
+from aim.web.api.runs.utils import StreamFrameWriter, collect_run_streamable_data, stream_run_data
+
+
+class TestStreamFrameWriter(TestBase):
+    tree = {'run': {'params': {'lr': 0.1}, 'blob': b'\x00' * 1000, 'traces': [{'name': 'loss'}] * 100}}
+
+    def test_chunks(self):
+        writer = StreamFrameWriter(chunk_size=256)
+        writer.write_tree(encode_tree(self.tree))
+        chunks = list(writer.chunks())
+        self.assertTrue(all(len(chunk) == 256 for chunk in chunks))
+        self.assertLess(len(writer), 256)
+        chunks.extend(writer.flush())
+        self.assertEqual(0, len(writer))
+
+        data = b''.join(chunks)
+        self.assertEqual(collect_run_streamable_data(encode_tree(self.tree)), data)
+        self.assertEqual(self.tree, decode_tree(decode_encoded_tree_stream([data], concat_chunks=True)))
+
+    def test_stream_blobs(self):
+        records = list(encode_tree(self.tree)) + [(b'image', BLOB(b'\x01' * 1000))]
+        streamed = b''.join(stream_run_data(iter(records), chunk_size=256))
+        self.assertEqual(collect_run_streamable_data(iter(records)), streamed)
@@ -1,12 +1,15 @@
 import os
+import time
 
 from tests.base import TestBase
 from tests.utils import remove_test_data
 
 from aim.sdk import Run
+from aim.sdk.configs import AIM_RUN_SUMMARY_FLUSH_INTERVAL
 from aim.storage.context import Context
 from aim.storage.containertreeview import ContainerTreeView
 from aim.storage.rockscontainer import RocksContainer
+from aim.storage.blockarrayview import BlockArrayView, BLOCK_SIZE
 
 
 class TestRunContainerData(TestBase):
@@ -83,53 +86,98 @@ class TestRunContainerData(TestBase):
         rc = RocksContainer(meta_container_path, read_only=True)
         tree = ContainerTreeView(rc)
         metric_1_dict = tree.view(('meta', 'chunks', run.hash, 'traces', Context({}).idx, 'metric 1')).collect()
+        # the summary of a new sequence is written right away, the updates are deferred
+        self.assertEqual(1.0, metric_1_dict['last'])
+        self.assertEqual(0, metric_1_dict['last_step'])
+        self.assertEqual('float', metric_1_dict['dtype'])
+
+        run.finalize()
+        rc = RocksContainer(meta_container_path, read_only=True)
+        tree = ContainerTreeView(rc)
+        metric_1_dict = tree.view(('meta', 'chunks', run.hash, 'traces', Context({}).idx, 'metric 1')).collect()
         self.assertEqual(3.0, metric_1_dict['last'])
+        self.assertEqual(2, metric_1_dict['last_step'])
         self.assertEqual('float', metric_1_dict['dtype'])
 
         metric_1_dict = tree.view(('meta', 'chunks', run.hash, 'traces',
                                    Context({'subset': 'train'}).idx, 'metric 1')).collect()
         self.assertEqual(1.0, metric_1_dict['last'])
 
+    def test_track_into_new_run(self):
+        # the sequences of a new run are looked up in an empty `seqs` container
+        run = Run(system_tracking_interval=None)
+        run.track([1, 2], name='lists', context={})
+        run.track([3], name='lists', context={})
+        run.track(1.0, name='metric 1', context={})
+        run.finalize()
+
+        series_container_path = os.path.join(self.repo.path, 'seqs', 'chunks', run.hash)
+        rc = RocksContainer(series_container_path, read_only=True)
+        tree = ContainerTreeView(rc)
+        lists_tree = tree.view(('seqs', 'chunks', run.hash, Context({}).idx, 'lists'))
+        self.assertListEqual([[1, 2], [3]], lists_tree.array('val').tolist())
+
+    def test_summaries_flushed_when_tracking_stops(self):
+        os.environ[AIM_RUN_SUMMARY_FLUSH_INTERVAL] = '0.2'
+        try:
+            run = Run(system_tracking_interval=None)
+        finally:
+            del os.environ[AIM_RUN_SUMMARY_FLUSH_INTERVAL]
+        run.track(1.0, name='metric 1', context={})
+        run.track(2.0, name='metric 1', context={})
+        time.sleep(1)
+
+        meta_container_path = os.path.join(self.repo.path, 'meta', 'chunks', run.hash)
+        rc = RocksContainer(meta_container_path, read_only=True)
+        tree = ContainerTreeView(rc)
+        metric_1_dict = tree.view(('meta', 'chunks', run.hash, 'traces', Context({}).idx, 'metric 1')).collect()
+        self.assertEqual(2.0, metric_1_dict['last'])
+        self.assertEqual(1, metric_1_dict['last_step'])
+        run.finalize()
+
     def test_series_tree_values(self):
         # sequential steps
         run = Run()
         run.track(1.0, name='metric 1', context={})
         run.track(2.0, name='metric 1', context={})
         run.track(3.0, name='metric 1', context={})
+        run.finalize()
 
         series_container_path = os.path.join(self.repo.path, 'seqs', 'chunks', run.hash)
         rc = RocksContainer(series_container_path, read_only=True)
         tree = ContainerTreeView(rc)
         traces_dict = tree.view(('seqs', 'chunks', run.hash, Context({}).idx, 'metric 1')).collect()
-        self.assertSetEqual({'val', 'epoch', 'time'}, set(traces_dict.keys()))
-        self.assertEqual(3, len(traces_dict['val']))
-        self.assertEqual(3, len(traces_dict['epoch']))
-        self.assertEqual(3, len(traces_dict['time']))
-        self.assertEqual(1.0, traces_dict['val'][0])
-        self.assertEqual(2.0, traces_dict['val'][1])
-        self.assertEqual(3.0, traces_dict['val'][2])
+        self.assertSetEqual({'blocks', 'pyramid'}, set(traces_dict.keys()))
+        self.assertSetEqual({'step', 'val', 'epoch', 'time'}, set(traces_dict['blocks'].keys()))
+        blocks_tree = tree.view(('seqs', 'chunks', run.hash, Context({}).idx, 'metric 1', 'blocks'))
+        val_array_view = BlockArrayView(blocks_tree, 'val')
+        self.assertEqual(3, len(val_array_view))
+        self.assertEqual(3, len(BlockArrayView(blocks_tree, 'epoch')))
+        self.assertEqual(3, len(BlockArrayView(blocks_tree, 'time')))
+        self.assertListEqual([1.0, 2.0, 3.0], val_array_view.tolist())
 
         # user-specified steps
         run = Run()
         run.track(1.0, name='metric 1', step=10, context={})
         run.track(2.0, name='metric 1', step=20, context={})
         run.track(3.0, name='metric 1', step=30, context={})
+        run.finalize()
 
         series_container_path = os.path.join(self.repo.path, 'seqs', 'chunks', run.hash)
         rc = RocksContainer(series_container_path, read_only=True)
         tree = ContainerTreeView(rc)
-        traces_dict = tree.view(('seqs', 'chunks', run.hash, Context({}).idx, 'metric 1')).collect()
-        self.assertEqual(31, len(traces_dict['val']))  # last index is 30
-        # sparse array
-        self.assertTrue(all(x is None for x in traces_dict['val'][0:10]))
-        self.assertEqual(1.0, traces_dict['val'][10])
-        self.assertTrue(all(x is None for x in traces_dict['val'][11:20]))
-        self.assertEqual(2.0, traces_dict['val'][20])
-        self.assertTrue(all(x is None for x in traces_dict['val'][21:30]))
-        self.assertEqual(3.0, traces_dict['val'][30])
-        val_array_view = tree.view(('seqs', 'chunks', run.hash, Context({}).idx, 'metric 1')).array('val')
-        self.assertEqual(31, len(val_array_view))
+        blocks_tree = tree.view(('seqs', 'chunks', run.hash, Context({}).idx, 'metric 1', 'blocks'))
+        val_array_view = BlockArrayView(blocks_tree, 'val')
+        self.assertEqual(31, len(val_array_view))  # last index is 30
         self.assertEqual(3, len(list(val_array_view)))
+        # sparse array
+        values = val_array_view.tolist()
+        self.assertTrue(all(x is None for x in values[0:10]))
+        self.assertEqual(1.0, values[10])
+        self.assertTrue(all(x is None for x in values[11:20]))
+        self.assertEqual(2.0, values[20])
+        self.assertTrue(all(x is None for x in values[21:30]))
+        self.assertEqual(3.0, values[30])
         self.assertEqual(1.0, val_array_view[10])
         self.assertEqual(2.0, val_array_view[20])
         self.assertEqual(3.0, val_array_view[30])
@@ -139,19 +187,34 @@ class TestRunContainerData(TestBase):
         run.track(3.0, name='metric 1', step=30, context={})
         run.track(1.0, name='metric 1', step=10, context={})
         run.track(2.0, name='metric 1', step=20, context={})
+        run.finalize()
 
         series_container_path = os.path.join(self.repo.path, 'seqs', 'chunks', run.hash)
         rc = RocksContainer(series_container_path, read_only=True)
         tree = ContainerTreeView(rc)
-        traces_dict = tree.view(('seqs', 'chunks', run.hash, Context({}).idx, 'metric 1')).collect()
-        self.assertEqual(31, len(traces_dict['val']))  # last index is 30
-        # sparse array
-        self.assertTrue(all(x is None for x in traces_dict['val'][0:10]))
-        self.assertEqual(1.0, traces_dict['val'][10])
-        self.assertTrue(all(x is None for x in traces_dict['val'][11:20]))
-        self.assertEqual(2.0, traces_dict['val'][20])
-        self.assertTrue(all(x is None for x in traces_dict['val'][21:30]))
-        self.assertEqual(3.0, traces_dict['val'][30])
+        blocks_tree = tree.view(('seqs', 'chunks', run.hash, Context({}).idx, 'metric 1', 'blocks'))
+        val_array_view = BlockArrayView(blocks_tree, 'val')
+        self.assertEqual(31, len(val_array_view))  # last index is 30
+        self.assertListEqual([10, 20, 30], val_array_view.indices_list())
+        self.assertListEqual([1.0, 2.0, 3.0], val_array_view.values_list())
+
+        # steps spanning multiple blocks
+        run = Run()
+        for step in range(2 * BLOCK_SIZE + 10):
+            run.track(float(step), name='metric 1', epoch=step // 100, context={})
+        run.finalize()
+
+        series_container_path = os.path.join(self.repo.path, 'seqs', 'chunks', run.hash)
+        rc = RocksContainer(series_container_path, read_only=True)
+        tree = ContainerTreeView(rc)
+        blocks_tree = tree.view(('seqs', 'chunks', run.hash, Context({}).idx, 'metric 1', 'blocks'))
+        self.assertListEqual([0, 1, 2], list(blocks_tree.subtree('val').keys()))
+        val_array_view = BlockArrayView(blocks_tree, 'val')
+        self.assertEqual(2 * BLOCK_SIZE + 10, len(val_array_view))
+        self.assertEqual(float(BLOCK_SIZE), val_array_view[BLOCK_SIZE])
+        self.assertListEqual([float(step) for step in range(2 * BLOCK_SIZE + 10)], val_array_view.values_list())
+        epoch_array_view = BlockArrayView(blocks_tree, 'epoch')
+        self.assertEqual(BLOCK_SIZE // 100, epoch_array_view[BLOCK_SIZE])
 
     def test_run_set_param_meta_tree(self):
         run = Run()
@@ -0,0 +1,81 @@
+import math
+
+from tests.base import TestBase
+
+from aim.sdk.run import Run
+from aim.storage.context import Context
+
+
+class TestSequenceSummary(TestBase):
+    def test_summary_of_tracked_sequences(self):
+        run = Run(system_tracking_interval=None)
+        values = [0.5, 0.25, math.nan, 0.75, 0.1]
+        for step, value in enumerate(values):
+            run.track(value, name='loss', step=step + 10)
+            run.track(step, name='loss', context={'subset': 'val'})
+        run.track([1, 2], name='lists')
+        run.finalize()
+
+        run = self.repo.get_run(run.hash)
+        summary = run.get_sequence_summary('loss', Context({}))
+        self.assertEqual('float', summary.dtype)
+        self.assertEqual(5, summary.count)
+        self.assertEqual((10, 14), (summary.first_step, summary.last_step))
+        self.assertEqual((0.1, 0.1, 0.75), (summary.last, summary.min, summary.max))
+        self.assertAlmostEqual(0.4, summary.mean)
+
+        summary = run.get_sequence_summary('loss', Context({'subset': 'val'}))
+        self.assertEqual(('int', 5, 4.0), (summary.dtype, summary.count, summary.last))
+
+        summary = run.get_sequence_summary('lists', Context({}))
+        self.assertEqual(1, summary.count)
+        self.assertIsNone(summary.max)
+        self.assertIsNone(run.get_sequence_summary('accuracy', Context({})))
+
+    def test_summary_of_resumed_run(self):
+        run = Run(system_tracking_interval=None)
+        for step in range(10):
+            run.track(float(step), name='loss')
+        run.finalize()
+
+        run = Run(run.hash, system_tracking_interval=None)
+        run.track(-1.0, name='loss')
+        run.finalize()
+
+        summary = self.repo.get_run(run.hash).get_sequence_summary('loss', Context({}))
+        self.assertEqual((11, 10, -1.0, -1.0, 9.0), (summary.count, summary.last_step, summary.last,
+                                                     summary.min, summary.max))
+
+    def test_query_sequence_summary(self):
+        run = Run(system_tracking_interval=None)
+        run['group'] = 'sequence_summary'
+        for step in range(10):
+            run.track(1.0 / (step + 1), name='loss')
+            run.track(step / 10, name='accuracy', context={'subset': 'val'})
+        run.finalize()
+
+        query = 'run.group == "sequence_summary" and run.metrics["loss"].last < 0.2'
+        self.assertEqual([run.hash], [r.run.hash for r in self.repo.query_runs(query).iter_runs()])
+        query = 'run.group == "sequence_summary" and run.metrics["accuracy", {"subset": "val"}].max > 0.95'
+        self.assertEqual([], [r.run.hash for r in self.repo.query_runs(query).iter_runs()])
+        query = 'run.group == "sequence_summary" and run.metrics["missing"].last < 0.2'
+        self.assertEqual([], [r.run.hash for r in self.repo.query_runs(query).iter_runs()])
+
+        query = 'run.group == "sequence_summary" and metric.max < 0.95'
+        self.assertEqual(['accuracy'], [metric.name for metric in self.repo.query_metrics(query)])
+
+    def test_query_run_param_named_metrics(self):
+        run = Run(system_tracking_interval=None)
+        run['group'] = 'metrics_param'
+        run['metrics'] = {'loss': 'mse'}
+        for step in range(10):
+            run.track(1.0 / (step + 1), name='loss')
+        run.finalize()
+
+        query = 'run.group == "metrics_param" and run.metrics["loss"] == "mse"'
+        self.assertEqual([run.hash], [r.run.hash for r in self.repo.query_runs(query).iter_runs()])
+        query = 'run.group == "metrics_param" and run.metrics.loss == "mse"'
+        self.assertEqual([run.hash], [r.run.hash for r in self.repo.query_runs(query).iter_runs()])
+        # the summaries are still reachable from the sequences of the run
+        query = 'run.group == "metrics_param" and metric.last < 0.2'
+        self.assertEqual(['loss'], [metric.name for metric in self.repo.query_metrics(query)])
@@ -0,0 +1,97 @@
+import numpy as np
+
+from tests.base import TestBase
+
+from aim.sdk import Run
+from aim.sdk.objects.text import Text
+from aim.storage import treeutils
+from aim.storage.context import Context
+from aim.storage.encoding import encode, encode_path
+from aim.storage.utils import ArrayFlag
+
+
+def encode_array(items):
+    yield encode_path(()), encode(ArrayFlag)
+    for idx, val in items:
+        yield encode_path(idx), encode(val)
+
+
+class TestDecodeSparseNumpy(TestBase):
+    def test_decode_float_array(self):
+        items = [(0, 1.0), (5, 2.5), (1000, -3.0)]
+        indices, values = treeutils.decode_sparse_numpy(encode_array(items))
+        self.assertEqual(np.intp, indices.dtype)
+        self.assertEqual(np.float64, values.dtype)
+        self.assertListEqual([0, 5, 1000], indices.tolist())
+        self.assertListEqual([1.0, 2.5, -3.0], values.tolist())
+
+    def test_decode_int_and_mixed_arrays(self):
+        indices, values = treeutils.decode_sparse_numpy(encode_array([(0, 1), (1, 2)]))
+        self.assertEqual(np.int64, values.dtype)
+        self.assertListEqual([1, 2], values.tolist())
+
+        indices, values = treeutils.decode_sparse_numpy(encode_array([(0, 1), (1, 2.5)]))
+        self.assertEqual(np.float64, values.dtype)
+        self.assertListEqual([1.0, 2.5], values.tolist())
+
+    def test_decode_large_array(self):
+        items = [(idx, float(idx)) for idx in range(5000)]
+        indices, values = treeutils.decode_sparse_numpy(encode_array(items))
+        self.assertEqual(5000, len(indices))
+        self.assertListEqual(list(range(5000)), indices.tolist())
+        self.assertListEqual([float(idx) for idx in range(5000)], values.tolist())
+
+    def test_unsupported_array_falls_back(self):
+        self.assertIsNone(treeutils.decode_sparse_numpy(encode_array([(0, 1.0), (1, None)])))
+        self.assertIsNone(treeutils.decode_sparse_numpy(encode_array([(0, 'text')])))
+        nested = [(encode_path(()), encode(ArrayFlag)),
+                  (encode_path((0,)), encode(ArrayFlag)),
+                  (encode_path((0, 0)), encode(1.0))]
+        self.assertIsNone(treeutils.decode_sparse_numpy(iter(nested)))
+
+
+class TestTreeArrayViewRanges(TestBase):
+    def setUp(self):
+        super().setUp()
+        run = Run(system_tracking_interval=None)
+        for step in range(0, 1000, 2):
+            run.track(Text(str(step)), name='texts', step=step)
+        self.values = run.get_text_sequence('texts', Context({})).values
+
+    def test_items_slice_by_step(self):
+        steps = [idx for idx, _ in self.values.items_slice(slice(10, 30, 4), slice_by='step')]
+        self.assertListEqual([10, 14, 18, 22, 26], steps)
+        # odd steps are missing from the sparse array
+        steps = [idx for idx, _ in self.values.items_slice(slice(11, 40, 3), slice_by='step')]
+        self.assertListEqual([14, 20, 26, 32, 38], steps)
+
+    def test_items_in_range(self):
+        items = list(self.values.items_in_range(100, 110))
+        self.assertListEqual([100, 102, 104, 106, 108], [idx for idx, _ in items])
+        self.assertListEqual(['100', '102', '104', '106', '108'], [val.data for _, val in items])
+
+        # sampled over the occupied range [0, 998], i.e. with stride of 19 steps
+        steps = [idx for idx, _ in self.values.items_in_range(0, 1000, 50)]
+        self.assertEqual(53, len(steps))
+        self.assertListEqual([0, 20, 38, 58, 76], steps[:5])
+        self.assertListEqual(sorted(set(steps)), steps)
+
+        self.assertListEqual([], list(self.values.items_in_range(2000, 3000, 50)))
+
+    def test_take(self):
+        values = self.values.take([4, 5, 998, 2000])
+        self.assertEqual('4', values[0].data)
+        self.assertIsNone(values[1])
+        self.assertEqual('998', values[2].data)
+        self.assertIsNone(values[3])
+
+
+class TestBlockArrayViewTake(TestBase):
+    def test_take(self):
+        run = Run(system_tracking_interval=None)
+        for step in range(0, 3000, 3):
+            run.track(float(step), name='loss', step=step)
+        run.finalize()
+
+        values = run.get_metric('loss', Context({})).values.take(np.array([0, 1, 3, 1500, 2997, 5000]))
+        self.assertListEqual([0.0, None, 3.0, 1500.0, 2997.0, None], values.tolist())
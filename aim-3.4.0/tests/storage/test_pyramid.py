@@ -0,0 +1,56 @@
+import numpy as np
+
+from tests.base import TestBase
+
+from aim.sdk import Run
+from aim.storage.context import Context
+from aim.storage.pyramid import bucket_extrema, bucket_means, bucket_width
+
+
+class TestMetricPyramid(TestBase):
+    def test_pyramid_summarizes_records(self):
+        run = Run(system_tracking_interval=None)
+        values = np.sin(np.arange(20000) / 100.0)
+        values[12345] = 10.0
+        values[100:200] = np.nan
+        for step, value in enumerate(values.tolist()):
+            run.track(value, name='loss', step=step, epoch=step // 1000)
+        run.finalize()
+
+        metric = run.get_metric('loss', Context({}))
+        buckets = metric.pyramid_level(50)
+        self.assertGreaterEqual(len(buckets), 50)
+        self.assertLess(len(buckets), 4 * 50)
+        self.assertEqual(20000, buckets['count'].sum())
+        self.assertEqual(19999, buckets['last_step'].max())
+
+        level = next(level for level in range(10) if 19999 // bucket_width(level) == buckets['bucket'].max())
+        width = bucket_width(level)
+        for bucket, mean in zip(buckets, bucket_means(buckets)):
+            bucket_values = values[bucket['bucket'] * width:(bucket['bucket'] + 1) * width]
+            self.assertEqual(np.nanmin(bucket_values), bucket['min'])
+            self.assertEqual(np.nanmax(bucket_values), bucket['max'])
+            self.assertAlmostEqual(np.nanmean(bucket_values), mean)
+
+        steps, extrema, epochs, _ = bucket_extrema(buckets)
+        self.assertIn(12345, steps.tolist())
+        self.assertEqual(10.0, extrema.max())
+        self.assertEqual(12, epochs[steps.tolist().index(12345)])
+
+        # the first level is too coarse to plot all the records
+        self.assertIsNone(metric.pyramid_level(len(values)))
+
+    def test_pyramid_is_not_used_when_behind_records(self):
+        run = Run(system_tracking_interval=None)
+        for step in range(5000):
+            run.track(float(step), name='loss', step=step)
+        run.finalize()
+        self.assertIsNotNone(run.get_metric('loss', Context({})).pyramid_level(10))
+
+        run = Run(run.hash, system_tracking_interval=None)
+        run.track(1.0, name='loss', step=5000)
+        run._resources.flush_sequences()
+        self.assertIsNone(run.get_metric('loss', Context({})).pyramid_level(10))
+
+        run.finalize()
+        self.assertIsNotNone(run.get_metric('loss', Context({})).pyramid_level(10))
@@ -0,0 +1,90 @@
+from parameterized import parameterized
+
+from tests.base import TestBase
+
+from aim.sdk import Run
+from aim.sdk.query_planner import RunCondition, extract_run_conditions, get_run_candidates
+from aim.storage.query import RestrictedPythonQuery
+
+
+class TestQueryPlanner(TestBase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.run_hashes = []
+        for idx, (lr, optimizer) in enumerate([(0.001, 'adam'), (0.01, 'sgd'), (0.1, 'adam'), (1, None)]):
+            run = Run(system_tracking_interval=None)
+            run['hparams'] = {'lr': lr, 'optimizer': optimizer, 'idx': idx}
+            run['group'] = 'params_index'
+            if idx < 2:
+                run.experiment = 'params_index'
+            if idx == 1:
+                run.add_tag('params_index')
+            run.finalize()
+            cls.run_hashes.append(run.hash)
+
+    def query_run_hashes(self, query):
+        return {run.run.hash for run in self.repo.query_runs(query).iter_runs()}
+
+    @parameterized.expand([
+        ('equal', 'run.hparams.lr == 0.01', [1]),
+        ('equal int', 'run["hparams", "lr"] == 1', [3]),
+        ('not equal', 'run.hparams.optimizer != "adam"', [1, 3]),
+        ('in', 'run.hparams["optimizer"] in ["sgd", "rmsprop"]', [1]),
+        ('range', '0.001 < run.hparams.lr <= 0.1', [1, 2]),
+        ('conjunction', 'run.hparams.lr < 1 and run.hparams.optimizer == "adam"', [0, 2]),
+        ('disjunction', 'run.hparams.idx == 0 or run.hparams.idx == 3', [0, 3]),
+        ('experiment', 'run.experiment == "params_index"', [0, 1]),
+        ('tags', '"params_index" in run.tags and run.hparams.lr < 1', [1]),
+        ('not in tags', '"params_index" not in run.tags and run.archived == False', [0, 2, 3]),
+    ])
+    def test_query_with_run_candidates(self, name, query, expected_runs):
+        query = f'run.group == "params_index" and ({query})'
+        self.assertSetEqual({self.run_hashes[idx] for idx in expected_runs}, self.query_run_hashes(query))
+
+    def test_run_candidates(self):
+        expr = RestrictedPythonQuery('run.group == "params_index" and run.hparams.optimizer == "adam"').expr
+        candidates = get_run_candidates(self.repo, expr)
+        self.assertIn(self.run_hashes[0], candidates)
+        self.assertNotIn(self.run_hashes[1], candidates)
+
+        expr = RestrictedPythonQuery('run.experiment != "params_index" and run.hparams.idx <= 2').expr
+        candidates = get_run_candidates(self.repo, expr)
+        self.assertIn(self.run_hashes[2], candidates)
+        self.assertNotIn(self.run_hashes[1], candidates)
+        self.assertNotIn(self.run_hashes[3], candidates)
+
+        self.assertIsNone(get_run_candidates(self.repo, '(run.hparams.lr > 0 or run.name == "test")'))
+
+    def test_updated_params_are_found(self):
+        run = Run(self.run_hashes[3], system_tracking_interval=None)
+        run['hparams', 'optimizer'] = 'adagrad'
+        run.finalize()
+        try:
+            query = 'run.group == "params_index" and run.hparams.optimizer == "adagrad"'
+            self.assertSetEqual({self.run_hashes[3]}, self.query_run_hashes(query))
+            query = 'run.group == "params_index" and run.hparams.optimizer == None'
+            self.assertSetEqual(set(), self.query_run_hashes(query))
+        finally:
+            run = Run(self.run_hashes[3], system_tracking_interval=None)
+            run['hparams', 'optimizer'] = None
+            run.finalize()
+
+    def test_unflushed_structured_changes_are_found(self):
+        run = self.repo.get_run(self.run_hashes[2])
+        run.archived = True
+        try:
+            query = 'run.group == "params_index" and run.archived == True'
+            self.assertSetEqual({self.run_hashes[2]}, self.query_run_hashes(query))
+        finally:
+            run.archived = False
+
+    def test_extract_run_conditions(self):
+        conditions = extract_run_conditions(
+            'run.hparams.lr == 0.1 and 1 < run["epochs"] and run.name != "x" and "y" in metric.run.tags')
+        self.assertTupleEqual((
+            RunCondition(('hparams', 'lr'), '==', 0.1, True),
+            RunCondition(('epochs',), '>', 1, False),
+            RunCondition(('name',), '!=', 'x', True),
+            RunCondition(('tags',), 'contains', 'y', True),
+        ), conditions)
@@ -0,0 +1,90 @@
+import os
+import shutil
+
+from tests.base import TestBase
+
+from aim.sdk import Run
+from aim.storage.rocksprofile import AIM_ROCKS_BLOB_DEDUP
+from aim.storage.rockscontainer import RocksContainer, BLOB_CAS_DOMAIN
+from aim.storage.types import BLOB
+
+
+class TestBLOBDeduplication(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.repo.path, 'seqs', 'chunks', 'blob_dedup')
+        self.container = RocksContainer(self.path, read_only=False, dedup_blobs=True)
+
+    def tearDown(self):
+        self.container.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+        super().tearDown()
+
+    def _stored_blobs(self):
+        return list(self.container.keys(BLOB_CAS_DOMAIN))
+
+    def test_identical_blobs_stored_once(self):
+        data = os.urandom(1024)
+        for key in (b'a', b'b', b'c'):
+            self.container[key] = BLOB(data)
+        self.container[b'd'] = BLOB(b'other')
+
+        self.assertEqual(2, len(self._stored_blobs()))
+        for key in (b'a', b'b', b'c'):
+            self.assertEqual(data, self.container[key].load())
+        self.assertEqual(b'other', self.container[b'd'].load())
+
+    def test_garbage_collection(self):
+        data = os.urandom(1024)
+        self.container[b'a'] = BLOB(data)
+        self.container[b'b'] = BLOB(data)
+
+        del self.container[b'a']
+        self.assertEqual(0, self.container.collect_blob_garbage())
+        self.assertEqual(data, self.container[b'b'].load())
+
+        # overwritten records release the references as well
+        self.container[b'b'] = b'value'
+        self.assertEqual(1, self.container.collect_blob_garbage())
+        self.assertListEqual([], self._stored_blobs())
+
+    def test_garbage_collected_on_run_finalize(self):
+        os.environ[AIM_ROCKS_BLOB_DEDUP] = '1'
+        try:
+            run = Run(system_tracking_interval=None)
+        finally:
+            del os.environ[AIM_ROCKS_BLOB_DEDUP]
+        _, meta_container = run._write_containers
+        data = os.urandom(1024)
+        run.meta_run_tree['blob'] = BLOB(os.urandom(1024))
+        run.meta_run_tree['blob'] = BLOB(data)
+        self.assertEqual(2, len(list(meta_container.keys(BLOB_CAS_DOMAIN))))
+        run.finalize()
+        self.assertEqual(1, len(list(meta_container.keys(BLOB_CAS_DOMAIN))))
+        self.assertEqual(data, self.repo.get_run(run.hash).meta_run_tree['blob'].load())
+
+
+class TestContainerTreeViewOverwrite(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.repo.path, 'seqs', 'chunks', 'tree_overwrite')
+        self.container = RocksContainer(self.path, read_only=False)
+        self.tree = self.container.tree()
+
+    def tearDown(self):
+        self.container.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+        super().tearDown()
+
+    def test_overwrite(self):
+        for value in (1, {'a': 1, 'b': [1, 2]}, 2.5, [3], {'c': 'x'}, 'y', None):
+            self.tree['key'] = value
+            self.assertEqual(value, self.tree.collect('key'))
+
+    def test_buffered_writes(self):
+        self.container.buffer_writes()
+        self.tree['key'] = 1
+        self.tree['key'] = 2
+        self.assertIsNone(self.tree.get('key'))
+        self.container.flush_writes()
+        self.assertEqual(2, self.tree['key'])
@@ -0,0 +1,54 @@
+import os
+
+from tests.base import TestBase
+from tests.utils import remove_test_data
+
+from aim.sdk import Run
+from aim.storage import runpacks
+from aim.storage.context import Context
+
+
+class TestRunPacks(TestBase):
+    def tearDown(self):
+        remove_test_data()
+        super().tearDown()
+
+    def _create_run(self, steps: int) -> str:
+        run = Run(system_tracking_interval=None)
+        for step in range(steps):
+            run.track(float(step), name='loss', step=step)
+        run.finalize()
+        run_hash = run.hash
+        del run
+        # release the run containers
+        self.repo.container_pool.clear()
+        self.repo.container_view_pool.clear()
+        return run_hash
+
+    def test_consolidate_and_read(self):
+        run_hashes = [self._create_run(steps) for steps in (10, 20)]
+
+        result = runpacks.consolidate_runs(self.repo.path)
+        self.assertSetEqual(set(run_hashes), set(result['consolidated']))
+        for run_hash in run_hashes:
+            self.assertFalse(os.path.exists(os.path.join(self.repo.path, 'seqs', 'chunks', run_hash)))
+
+        for run_hash, steps in zip(run_hashes, (10, 20)):
+            run = Run(run_hash, read_only=True)
+            values = run.get_metric('loss', Context({})).values.sparse_numpy()[1]
+            self.assertListEqual([float(step) for step in range(steps)], values.tolist())
+
+    def test_resume_packed_run(self):
+        run_hash = self._create_run(10)
+        runpacks.consolidate_runs(self.repo.path)
+
+        run = Run(run_hash, system_tracking_interval=None)
+        run.track(10.0, name='loss', step=10)
+        run.finalize()
+        del run
+        self.repo.container_pool.clear()
+        self.repo.container_view_pool.clear()
+
+        run = Run(run_hash, read_only=True)
+        values = run.get_metric('loss', Context({})).values.sparse_numpy()[1]
+        self.assertListEqual([float(step) for step in range(11)], values.tolist())
@@ -0,0 +1,38 @@
+from tests.base import TestBase
+
+from aim.sdk import Run
+from aim.storage import treeutils
+
+TREE = {
+    'hparams': {'lr': 0.01, 'batch_size': 32, 'layers': [64, None, 'relu', (1, 2)], 'enabled': True},
+    'dataset': {'name': 'cifar10', 'raw': b'\xfe\xff', 'split': {}},
+    'empty': [],
+    42: {'nested': {'deep': -1}},
+}
+
+
+class TestTreeEncoding(TestBase):
+    def test_encode_tree(self):
+        expected = list(treeutils.encode_paths_vals(treeutils.unfold_tree(TREE)))
+        self.assertListEqual(expected, list(treeutils.encode_tree(TREE)))
+        prefix = b'meta\xfe'
+        self.assertListEqual([(prefix + key, val) for key, val in expected],
+                             list(treeutils.encode_tree(TREE, prefix=prefix)))
+
+    def test_decode_tree(self):
+        records = sorted(treeutils.encode_tree(TREE))
+        expected = treeutils.fold_tree(treeutils.DecodePathsVals(iter(records)))
+        self.assertEqual(expected, treeutils.decode_tree(iter(records)))
+        for level in (1, 2):
+            expected = list(treeutils.iter_fold_tree(treeutils.DecodePathsVals(iter(records)), level=level))
+            self.assertListEqual(expected, list(treeutils.iter_decode_tree(iter(records), level=level)))
+
+    def test_decode_empty_string_keys(self):
+        for tree in ({'': 1}, {'a': {'': 1}}, {'a': {'': 1, 'b': [2]}}):
+            records = sorted(treeutils.encode_tree(tree))
+            self.assertEqual(tree, treeutils.decode_tree(iter(records)))
+
+        run = Run(system_tracking_interval=None)
+        run['x'] = {'a': {'': 1}}
+        run.finalize()
+        self.assertEqual({'a': {'': 1}}, self.repo.get_run(run.hash)['x'])
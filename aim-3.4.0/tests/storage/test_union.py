@@ -0,0 +1,94 @@
+import os
+import shutil
+
+from tests.base import TestBase
+from tests.utils import remove_test_data
+
+from aim.storage.encoding import encode_path
+from aim.storage.rockscontainer import RocksContainer
+from aim.storage.union import DB, DBHandle, DBHandlePool
+
+
+class TestDBHandlePool(TestBase):
+    def tearDown(self):
+        remove_test_data()
+        super().tearDown()
+
+    def test_lru_eviction(self):
+        handles = []
+        pool = None
+        for idx in range(3):
+            path = os.path.join(self.repo.path, 'seqs', 'chunks', f'handle_pool_{idx}')
+            rc = RocksContainer(path, read_only=False)
+            rc[b'key'] = str(idx).encode()
+            if pool is None:
+                pool = DBHandlePool(rc._db_opts, max_open=2)
+            rc.close()
+            handles.append(DBHandle(path, pool))
+
+        self.assertDictEqual({'open': 0, 'opened': 0, 'evicted': 0}, pool.stats())
+        self.assertEqual(b'0', handles[0].get(b'key'))
+        self.assertEqual(b'1', handles[1].get(b'key'))
+        self.assertEqual(b'0', handles[0].get(b'key'))
+        # the least recently used handle is evicted
+        self.assertEqual(b'2', handles[2].get(b'key'))
+        self.assertDictEqual({'open': 2, 'opened': 3, 'evicted': 1}, pool.stats())
+        # and transparently reopened
+        self.assertEqual(b'1', handles[1].get(b'key'))
+        self.assertDictEqual({'open': 2, 'opened': 4, 'evicted': 2}, pool.stats())
+
+
+class TestUnionDBRouting(TestBase):
+    db_name = 'union_routing'
+
+    def tearDown(self):
+        shutil.rmtree(os.path.join(self.repo.path, self.db_name), ignore_errors=True)
+        super().tearDown()
+
+    def _write_run(self, run_hash: str):
+        path = os.path.join(self.repo.path, self.db_name, 'chunks', run_hash)
+        rc = RocksContainer(path, read_only=False)
+        rc[encode_path((self.db_name, 'chunks', run_hash, 'name'))] = run_hash.encode()
+        rc.close()
+        return rc._db_opts
+
+    def test_get_routes_to_run_db(self):
+        opts = self._write_run('run1')
+        db = DB(self.repo.path, self.db_name, opts, read_only=True)
+        self.assertEqual(b'run1', db.get(encode_path((self.db_name, 'chunks', 'run1', 'name'))))
+        generation = db.generation
+
+        # the shards are not relisted unless the directories change
+        db.dbs
+        self.assertEqual(generation, db.generation)
+
+        # the runs written by this process are seen without waiting for the shards check interval
+        self._write_run('run2')
+        self.assertEqual(b'run2', db.get(encode_path((self.db_name, 'chunks', 'run2', 'name'))))
+        self.assertEqual(generation + 1, db.generation)
+
+    def test_shards_state_checked_once_per_interval(self):
+        opts = self._write_run('run1')
+        db = DB(self.repo.path, self.db_name, opts, read_only=True)
+        db.dbs
+
+        checks = []
+        get_shards_state = db._get_shards_state
+        db._get_shards_state = lambda: checks.append(True) or get_shards_state()
+        for _ in range(100):
+            db.get(encode_path((self.db_name, 'chunks', 'run1', 'name')))
+        self.assertLessEqual(len(checks), 1)
+
+    def test_iterate_over_run_dbs(self):
+        opts = self._write_run('run2')
+        self._write_run('run1')
+        db = DB(self.repo.path, self.db_name, opts, read_only=True)
+        keys = [encode_path((self.db_name, 'chunks', run_hash, 'name')) for run_hash in ('run1', 'run2')]
+
+        it = db.iterkeys()
+        it.seek_to_first()
+        self.assertListEqual(keys, list(it))
+
+        it = db.iteritems()
+        it.seek_to_last()
+        self.assertListEqual([(keys[1], b'run2'), (keys[0], b'run1')], list(reversed(it)))